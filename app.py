@@ -2,17 +2,59 @@
 app.py
 
 Entry point for launching the StoryKeeper application.
+Run with --startup-report to print cold-start timings as JSON and exit.
 """
 
+import time
+
+_LAUNCHED = time.perf_counter()
+
+import json
 import sys
+from PyQt6.QtCore import QEvent, QObject, QTimer
 from PyQt6.QtWidgets import QApplication
 from main_window import StoryKeeper
 
 
+class FirstPaintProbe(QObject):
+    """Application event filter that fires a callback after the first paint."""
+
+    def __init__(self, callback):
+        super().__init__()
+        self.callback = callback
+        self.seen = False
+
+    def eventFilter(self, obj, event):
+        if not self.seen and event.type() == QEvent.Type.Paint:
+            self.seen = True
+            QTimer.singleShot(0, self.callback)  # run once the paint pass has finished
+        return False
+
+
+def elapsed_ms() -> float:
+    """Milliseconds since this module started executing."""
+    return round((time.perf_counter() - _LAUNCHED) * 1000, 1)
+
+
 def main() -> None:
     """Initialize and run the StoryKeeper application."""
     app = QApplication(sys.argv)
     window = StoryKeeper()
+
+    if "--startup-report" in sys.argv:
+        timings = {}
+
+        def record(name):
+            timings[name] = elapsed_ms()
+            if len(timings) == 2:
+                print(json.dumps(timings))
+                app.quit()
+
+        probe = FirstPaintProbe(lambda: record("first_paint_ms"))
+        app.installEventFilter(probe)
+        window.text_edit.service.lexicon_loaded.connect(
+            lambda _: QTimer.singleShot(0, lambda: record("spellcheck_ready_ms")))
+
     window.show()
     sys.exit(app.exec())
 
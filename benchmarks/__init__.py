@@ -0,0 +1,6 @@
+"""
+benchmarks
+
+Reproducible performance benchmarks for StoryKeeper hot paths.
+Run with ``python -m benchmarks.run --help``.
+"""
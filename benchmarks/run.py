@@ -0,0 +1,192 @@
+"""
+run.py
+
+Headless benchmark runner for StoryKeeper hot paths: DictionaryDB CRUD,
+import and export, editor spellcheck and highlighting, the Dictionary
+Manager list and project ZIP round-trips. Results are written as JSON and
+can be compared against a stored baseline; the run fails when any benchmark
+is slower than the baseline by more than the allowed factor.
+
+Usage:
+    python -m benchmarks.run --preset default --output results.json
+    python -m benchmarks.run --preset default --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --preset default --baseline benchmarks/baseline.json --max-slowdown 1.3
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRESETS: Dict[str, Dict[str, Any]] = {
+    "smoke": {"entries": 1_000, "words": 10_000, "repeat": 3},
+    "default": {"entries": 50_000, "words": 100_000, "repeat": 3},
+    "full": {"entries": 500_000, "words": 1_000_000, "repeat": 1},
+}
+
+
+def measure(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Time ``fn`` ``repeat`` times (running ``setup`` untimed before each) and return the median."""
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {"seconds": statistics.median(runs), "runs": runs}
+
+
+def run_benchmarks(entries: int, words: int, repeat: int, misspelling_rate: float = 0.02,
+                   seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """Generate a synthetic world and manuscript, then time every hot path."""
+    from PyQt6.QtWidgets import QApplication
+    from benchmarks.synthetic import synthetic_dictionary, synthetic_manuscript
+    from db import DictionaryDB
+    from managers import DictionaryManager
+    from project import read_project, write_project
+    from spellcheck import load_base_lexicon
+    from widgets import SpellCheckTextEdit
+
+    app = QApplication.instance() or QApplication([])
+    dictionary = synthetic_dictionary(entries, seed)
+    custom_words = sorted({row["word"] for row in dictionary})
+    text = synthetic_manuscript(words, custom_words, misspelling_rate, seed=seed)
+    lexicon = load_base_lexicon()
+    results: Dict[str, Dict[str, Any]] = {}
+    db: DictionaryDB = None
+
+    def fresh_db():
+        nonlocal db
+        db = DictionaryDB(":memory:")
+
+    def loaded_db():
+        fresh_db()
+        db.import_dictionary(dictionary)
+
+    sample = dictionary[:min(1_000, len(dictionary))]
+    results["db_add_entry_1k"] = measure(
+        lambda: [db.add_entry(r["word"], r["category"], r["part_of_speech"], r["definition"],
+                              r["context_hint"], r["sense_number"]) for r in sample],
+        repeat, setup=loaded_db)
+    results["db_delete_entry_1k"] = measure(
+        lambda: [db.delete_entry(r["word"], r["sense_number"]) for r in sample], repeat, setup=loaded_db)
+    results["db_import_merge"] = measure(lambda: db.import_dictionary(dictionary), repeat, setup=fresh_db)
+    results["db_import_replace"] = measure(
+        lambda: db.import_dictionary(dictionary, mode="replace"), repeat, setup=loaded_db)
+    loaded_db()
+    results["db_export"] = measure(db.export_dictionary, repeat)
+    results["db_get_all_entries"] = measure(db.get_all_entries, repeat)
+
+    editor = SpellCheckTextEdit(db)
+    editor.engine.set_lexicon(lexicon)
+    results["editor_load_text"] = measure(lambda: editor.setPlainText(text), repeat)
+    results["run_spellcheck"] = measure(editor.run_spellcheck, repeat)
+    target = custom_words[len(custom_words) // 2]
+    results["highlight_word"] = measure(lambda: editor.highlight_word(target), repeat)
+    prefixes = [w[:3] for w in custom_words[:1_000]]
+    results["completion_lookup_1k"] = measure(
+        lambda: [editor.completions.complete(p, editor.statistics.word_counts) for p in prefixes], repeat)
+    results["add_word_recheck"] = measure(
+        lambda: db.add_entry("zzbenchword", "General", "Noun", "Benchmark.", ""),
+        repeat, setup=lambda: db.delete_entry("zzbenchword"))
+
+    manager = DictionaryManager(db)
+    results["refresh_word_list"] = measure(manager.refresh_word_list, repeat)
+    manager.close()
+
+    exported = db.export_dictionary()
+    contexts = db.export_contexts()
+    with tempfile.TemporaryDirectory(prefix="storykeeper-bench-") as tmpdir:
+        zip_path = os.path.join(tmpdir, "project.zip")
+        results["project_zip_write"] = measure(lambda: write_project(zip_path, text, exported, contexts), repeat)
+        results["project_zip_read"] = measure(lambda: read_project(zip_path), repeat)
+
+    editor.deleteLater()
+    app.processEvents()
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            max_slowdown: float) -> List[str]:
+    """Return a message for every benchmark slower than ``max_slowdown`` x its baseline."""
+    failures = []
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if not base or base["seconds"] <= 0:
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        if ratio > max_slowdown:
+            failures.append(f"{name}: {result['seconds']:.4f}s vs baseline {base['seconds']:.4f}s "
+                            f"({ratio:.2f}x > {max_slowdown:.2f}x)")
+    return failures
+
+
+def main(argv: List[str] = None) -> int:
+    """Run the suite, write results and compare them with a baseline."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)  # lets ``python benchmarks/run.py`` import the app modules
+    from constants import APP_VERSION
+
+    parser = argparse.ArgumentParser(description="Run StoryKeeper performance benchmarks.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="smoke")
+    parser.add_argument("--entries", type=int, help="Dictionary rows (overrides the preset).")
+    parser.add_argument("--words", type=int, help="Manuscript words (overrides the preset).")
+    parser.add_argument("--repeat", type=int, help="Timed runs per benchmark (overrides the preset).")
+    parser.add_argument("--misspelling-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results JSON to this file.")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against.")
+    parser.add_argument("--save-baseline", help="Also write the results as a new baseline.")
+    parser.add_argument("--max-slowdown", type=float, default=1.25,
+                        help="Fail when a benchmark takes more than this multiple of its baseline.")
+    args = parser.parse_args(argv)
+
+    params = dict(PRESETS[args.preset])
+    for key in ("entries", "words", "repeat"):
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+    results = run_benchmarks(params["entries"], params["words"], params["repeat"],
+                             args.misspelling_rate, args.seed)
+    report = {
+        "meta": {
+            "version": APP_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "preset": args.preset,
+            "params": params,
+            "misspelling_rate": args.misspelling_rate,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    for name, result in sorted(results.items()):
+        print(f"{name:<24} {result['seconds'] * 1000:10.2f} ms")
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("params") != params:
+            print("warning: baseline was recorded with different parameters", file=sys.stderr)
+        failures = compare(results, baseline["results"], args.max_slowdown)
+        for failure in failures:
+            print(f"SLOWER: {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
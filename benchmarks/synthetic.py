@@ -0,0 +1,111 @@
+"""
+synthetic.py
+
+Deterministic generators for synthetic worlds (custom dictionaries with
+multi-sense words) and manuscripts with a controlled misspelling rate.
+The same seed always produces the same data, so timings are comparable
+across runs and machines.
+"""
+
+import random
+import string
+from typing import Any, Dict, List
+
+SYLLABLES = [
+    "ka", "ne", "ran", "vel", "lis", "zor", "thi", "mar", "ul", "en", "dra", "quo",
+    "sha", "rin", "tor", "bel", "ix", "ae", "lun", "gar", "os", "py", "ven", "dal",
+]
+
+COMMON_WORDS = (
+    "the of and to in a is that for it as was with be by on not he this are or his "
+    "from at which but have an they you were her she there been one all we their "
+    "has would when if so no what up out said who more them some could time into "
+    "only then two than first other like new its over after also made many way "
+    "before must through back years where much your down should because each just "
+    "those people how too little state good very make world still own see men work "
+    "long here get both between life being under never day same another know while "
+    "last might us great old year off come since against go came right used take "
+    "three ship star light night across river mountain city voice silence hand eyes "
+    "door road fire water stone dark ancient distant quiet storm sky sea wind"
+).split()
+
+POS_OPTIONS = ["Noun", "Verb", "Adjective", "Adverb"]
+CATEGORIES = ["Species", "Planet", "Language", "Culture", "Artifact", "Location"]
+
+
+def invented_words(count: int, seed: int = 0) -> List[str]:
+    """Return ``count`` distinct invented words built from syllables."""
+    rng = random.Random(seed)
+    words, seen = [], set()
+    while len(words) < count:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def synthetic_dictionary(entries: int, seed: int = 0, max_senses: int = 3) -> List[Dict[str, Any]]:
+    """
+    Build about ``entries`` dictionary rows in export format; roughly a third
+    of the words get several senses.
+    """
+    rng = random.Random(seed)
+    rows: List[Dict[str, Any]] = []
+    for word in invented_words(entries, seed):
+        senses = rng.randint(2, max_senses) if rng.random() < 0.33 else 1
+        category = rng.choice(CATEGORIES)
+        for sense in range(1, senses + 1):
+            rows.append({
+                "word": word,
+                "category": category,
+                "part_of_speech": rng.choice(POS_OPTIONS),
+                "definition": f"Synthetic meaning {sense} of {word}.",
+                "context_hint": rng.choice(CATEGORIES),
+                "sense_number": sense,
+            })
+            if len(rows) >= entries:
+                return rows
+    return rows
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """Apply one random edit (delete, swap, replace or insert) to a word."""
+    i = rng.randrange(len(word))
+    op = rng.choice("dsri") if len(word) > 2 else "i"
+    if op == "d":
+        return word[:i] + word[i + 1:]
+    if op == "s" and i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    letter = rng.choice(string.ascii_lowercase)
+    if op == "r":
+        return word[:i] + letter + word[i + 1:]
+    return word[:i] + letter + word[i:]
+
+
+def synthetic_manuscript(words: int, custom_words: List[str], misspelling_rate: float = 0.02,
+                         custom_rate: float = 0.05, seed: int = 0, paragraph_words: int = 120) -> str:
+    """
+    Generate prose of ``words`` words mixing common English, custom
+    dictionary words and deliberate misspellings.
+    """
+    rng = random.Random(seed)
+    paragraphs, sentence, paragraph = [], [], []
+    for n in range(words):
+        roll = rng.random()
+        if custom_words and roll < custom_rate:
+            word = rng.choice(custom_words)
+        else:
+            word = rng.choice(COMMON_WORDS)
+        if rng.random() < misspelling_rate:
+            word = misspell(word, rng)
+        sentence.append(word)
+        if len(sentence) >= rng.randint(6, 18) or n == words - 1:
+            paragraph.append(" ".join(sentence).capitalize() + ".")
+            sentence = []
+        if len(paragraph) * 12 >= paragraph_words and not sentence:
+            paragraphs.append(" ".join(paragraph))
+            paragraph = []
+    if paragraph:
+        paragraphs.append(" ".join(paragraph))
+    return "\n".join(paragraphs)
@@ -0,0 +1,250 @@
+"""
+brains.py
+
+Per-world "brain" dictionaries for the StoryKeeper application. Each world
+keeps its words in its own SQLite file, attached to the main connection on
+demand. The active brains, followed by the main dictionary, are composed
+into one layered lexicon view where earlier brains take precedence. New
+words and imported dictionaries go to the highest-precedence active brain.
+
+Every loaded brain keeps its precomputed word index, so switching worlds only
+swaps already-built objects and never re-queries the database. Each layer
+is also expanded once into a FormLayer of inflected and possessive forms,
+which the InflectionIndex stacks in the same order as the view; the main
+layer's forms are patched per changed word.
+"""
+
+import os
+import re
+import sqlite3
+from collections import ChainMap
+from typing import Dict, List, Optional, Set, Tuple
+
+from constants import BRAIN_DIR
+from db import DictionaryDB, DictionaryListener
+from inflections import FormLayer, InflectionIndex
+
+BRAIN_SUFFIX = ".db"
+ACTIVE_SETTING = "active_brains"
+NAME_PATTERN = re.compile(r"\w[\w .'-]{0,63}")  # no path separators, no leading dot
+
+
+class Brain:
+    """One world's dictionary file and its precomputed word and form indexes."""
+
+    def __init__(self, name: str, path: str, schema: str, db: DictionaryDB, words: Dict[str, Tuple[str, ...]],
+                 parts_of_speech: Dict[str, Tuple[str, ...]], lexicon=None) -> None:
+        self.name = name
+        self.path = path
+        self.schema = schema
+        self.db = db  # own connection, used to add words to this world
+        self.words = words
+        self.parts_of_speech = parts_of_speech
+        self.forms = FormLayer(words, parts_of_speech, lexicon)
+
+
+class BrainSet:
+    """Loads world brains and composes the active ones into a layered lexicon view."""
+
+    def __init__(self, db: DictionaryDB, directory: str = BRAIN_DIR) -> None:
+        """
+        Initialize the brain set.
+
+        Args:
+            db (DictionaryDB): Main database; brains are attached to its connection.
+            directory (str): Folder holding one ``<world>.db`` file per brain.
+        """
+        self.db = db
+        self.directory = directory
+        self.main_words: Dict[str, Tuple[str, ...]] = db.get_word_categories()
+        self.main_pos: Dict[str, Tuple[str, ...]] = db.get_parts_of_speech()
+        self.active: List[str] = []
+        self.view: ChainMap = ChainMap(self.main_words)
+        self.pos_view: ChainMap = ChainMap(self.main_pos)
+        self.lexicon = None
+        self.main_forms = FormLayer(self.main_words, self.main_pos)
+        self.inflections = InflectionIndex(self.view, layers=[self.main_forms])
+        self._loaded: Dict[str, Brain] = {}
+        self._listeners: List[DictionaryListener] = []
+        db.subscribe(self._on_dictionary_changed)
+
+    # ---------------- Change Notification ---------------- #
+
+    def subscribe(self, listener: DictionaryListener) -> None:
+        """Register a callback invoked when the composed view changes."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: DictionaryListener) -> None:
+        """Remove a previously registered callback."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, words: Optional[Set[str]]) -> None:
+        """Tell listeners which lowercase words (lemmas and their forms) changed, None for all."""
+        for listener in list(self._listeners):
+            listener(words)
+
+    def _on_dictionary_changed(self, words: Optional[Set[str]]) -> None:
+        """Patch the main layer and its forms in place for just the words that changed."""
+        self._notify(self._patch(self.db, self.main_words, self.main_pos, self.main_forms, words))
+
+    def _on_brain_changed(self, brain: "Brain", words: Optional[Set[str]]) -> None:
+        """Patch a brain's layer after words were added to or removed from its file."""
+        words = self._patch(brain.db, brain.words, brain.parts_of_speech, brain.forms, words)
+        if brain.name in self.active:
+            self._notify(words)
+
+    @staticmethod
+    def _patch(db: DictionaryDB, layer: Dict[str, Tuple[str, ...]], pos: Dict[str, Tuple[str, ...]],
+               forms: FormLayer, words: Optional[Set[str]]) -> Optional[Set[str]]:
+        """Re-read changed words (None for all) into a layer; returns them plus their touched forms."""
+        if words is None:
+            layer.clear()
+            layer.update(db.get_word_categories())
+            pos.clear()
+            pos.update(db.get_parts_of_speech())
+            forms.rebuild()
+            return None
+        for word in words:
+            layer.pop(word, None)
+            pos.pop(word, None)
+        layer.update(db.get_word_categories(words))
+        pos.update(db.get_parts_of_speech(words))
+        return set(words) | forms.update(words)
+
+    def set_lexicon(self, lexicon) -> None:
+        """Let the inflection index tell invented parts of hyphenated words from ordinary ones."""
+        self.lexicon = lexicon
+        touched = self.main_forms.set_lexicon(lexicon)
+        for brain in self._loaded.values():
+            touched |= brain.forms.set_lexicon(lexicon)
+        if touched:
+            self._notify(touched)
+
+    # ---------------- Brain Files ---------------- #
+
+    def available(self) -> List[str]:
+        """List the names of all brain files in the brain directory."""
+        if not os.path.isdir(self.directory):
+            return []
+        names = (f[:-len(BRAIN_SUFFIX)] for f in os.listdir(self.directory) if f.endswith(BRAIN_SUFFIX))
+        return sorted(name for name in names if NAME_PATTERN.fullmatch(name))
+
+    @staticmethod
+    def validate_name(name: str) -> str:
+        """
+        Check that a world name is safe to use as a file name.
+
+        Raises:
+            ValueError: If the name is empty, too long, starts with a dot or
+                contains path separators or other punctuation.
+        """
+        if not NAME_PATTERN.fullmatch(name):
+            raise ValueError(f"Invalid world name '{name}': use letters, digits, spaces, "
+                             "'.', '-', '_' or apostrophes (at most 64 characters)")
+        return name
+
+    def path_for(self, name: str) -> str:
+        """Return the file path used for a world's brain."""
+        return os.path.join(self.directory, f"{self.validate_name(name)}{BRAIN_SUFFIX}")
+
+    def create(self, name: str) -> str:
+        """Create an empty brain file with the dictionary schema and return its path."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(name)
+        DictionaryDB(path).conn.close()
+        return path
+
+    def load(self, name: str) -> Brain:
+        """Attach a brain and build its word and form indexes, or return the cached one."""
+        brain = self._loaded.get(name)
+        if brain is None:
+            path = self.path_for(name)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No brain named '{name}' in {self.directory}")
+            world = DictionaryDB(path)  # also brings older brain files up to the current schema
+            try:
+                schema = self._attach(name, path)
+            except Exception:
+                world.conn.close()
+                raise
+            brain = Brain(name, path, schema, world, self.db.get_word_categories(schema=schema),
+                          self.db.get_parts_of_speech(schema=schema), self.lexicon)
+            world.subscribe(lambda words, b=brain: self._on_brain_changed(b, words))
+            self._loaded[name] = brain
+        return brain
+
+    def _attach(self, name: str, path: str) -> str:
+        """Attach a brain file under a fresh schema name and return that name."""
+        attached = self.db.attached()
+        number = 1
+        while f"brain_{number}" in attached:
+            number += 1
+        schema = f"brain_{number}"
+        try:
+            self.db.attach(path, schema)
+        except sqlite3.OperationalError as e:
+            if "too many attached" in str(e):
+                raise RuntimeError(f"Cannot load world '{name}': SQLite can only attach "
+                                   f"{len(attached)} world files at once; unload another world first") from e
+            raise
+        return schema
+
+    def unload(self, name: str) -> None:
+        """Detach a brain and drop its index (deactivating it first if needed)."""
+        if name in self.active:
+            self.activate([n for n in self.active if n != name])
+        brain = self._loaded.pop(name, None)
+        if brain is not None:
+            self.db.detach(brain.schema)
+            brain.db.conn.close()
+
+    def reload(self, name: str) -> None:
+        """Rebuild a loaded brain's index after its file was edited elsewhere."""
+        brain = self._loaded.get(name)
+        if brain is not None:
+            brain.words = self.db.get_word_categories(schema=brain.schema)
+            brain.parts_of_speech = self.db.get_parts_of_speech(schema=brain.schema)
+            brain.forms = FormLayer(brain.words, brain.parts_of_speech, self.lexicon)
+            if name in self.active:
+                self.activate(self.active)
+
+    # ---------------- Active Worlds ---------------- #
+
+    def activate(self, names: List[str]) -> ChainMap:
+        """
+        Make ``names`` the active brains, highest precedence first.
+
+        Already loaded brains are reused as-is, word and form indexes
+        included, so switching between worlds that were used before costs no
+        database work and no re-expansion.
+        """
+        brains = [self.load(name) for name in names]
+        self.active = list(names)
+        self.view = ChainMap(*(b.words for b in brains), self.main_words)
+        self.pos_view = ChainMap(*(b.parts_of_speech for b in brains), self.main_pos)
+        self.inflections.stack(self.view, [*(b.forms for b in brains), self.main_forms])
+        self.db.set_setting(ACTIVE_SETTING, ",".join(self.active))
+        self._notify(None)
+        return self.view
+
+    def restore(self) -> ChainMap:
+        """Activate the brains that were active when the app last closed."""
+        saved = self.db.get_setting(ACTIVE_SETTING, "")
+        names = [n for n in saved.split(",") if n and n in self.available()]
+        return self.activate(names) if names else self.view
+
+    def target(self) -> DictionaryDB:
+        """
+        Return the dictionary new words and imports go to: the highest
+        precedence active brain, or the main dictionary when no world is active.
+        """
+        return self._loaded[self.active[0]].db if self.active else self.db
+
+    def source_of(self, word: str) -> Optional[str]:
+        """Return the name of the brain that supplies a word ("main" for the main dictionary)."""
+        key = word.lower()
+        for name in self.active:
+            if key in self._loaded[name].words:
+                return name
+        return "main" if key in self.main_words else None
@@ -0,0 +1,136 @@
+"""
+cli.py
+
+Headless command-line spellchecker for StoryKeeper manuscripts. Checks whole
+folders of chapter files in a process pool against the base language and the
+DictionaryDB custom lexicon, streaming results as JSON Lines. Never imports PyQt6.
+
+Both word lists are compiled into one memory-mapped lexicon file that every
+worker maps read-only, so workers share a single copy of the dictionary.
+
+Usage:
+    python cli.py manuscript/ chapter-extra.txt --db storykeeper_dictionary.db --jobs 8
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from constants import DB_FILE, LEXICON_DIR
+from db import DictionaryDB
+from lexicon import Lexicon, base_language_source, custom_dictionary_source, ensure_lexicon
+from spellcheck import SpellCheckEngine, tokenize
+
+# Per-process engine, built once by the pool initializer.
+_engine: Optional[SpellCheckEngine] = None
+_suggestions: Dict[str, List[str]] = {}
+_with_suggestions = True
+
+
+def _init_worker(lexicon_path: str, with_suggestions: bool) -> None:
+    """Map the shared lexicon and build the spellcheck engine once per worker process."""
+    global _engine, _with_suggestions
+    _engine = SpellCheckEngine(Lexicon(lexicon_path))
+    _with_suggestions = with_suggestions
+    _suggestions.clear()
+
+
+def check_file(path: str) -> List[Dict[str, object]]:
+    """
+    Spellcheck a single file.
+
+    Returns:
+        list: One record per misspelling with file, 1-based line and column,
+        word and suggestions.
+    """
+    results = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line_no, line in enumerate(file, start=1):
+            for token in _engine.unknown_tokens(tokenize(line)):
+                suggestions = []
+                if _with_suggestions:
+                    key = token.word.lower()
+                    if key not in _suggestions:
+                        _suggestions[key] = _engine.suggestions(key)
+                    suggestions = _suggestions[key]
+                results.append({
+                    "file": path,
+                    "line": line_no,
+                    "column": token.start + 1,
+                    "word": token.word,
+                    "suggestions": suggestions,
+                })
+    return results
+
+
+def collect_files(paths: Iterable[str], extensions: Tuple[str, ...]) -> List[str]:
+    """Expand directories recursively, largest files first for better load balancing."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.endswith(extensions))
+        else:
+            files.append(path)
+    return sorted(files, key=os.path.getsize, reverse=True)
+
+
+def build_lexicon(db_file: str, language: str = "en", directory: str = LEXICON_DIR) -> str:
+    """Compile (if stale) the base language plus custom dictionary lexicon; return its path."""
+    db = DictionaryDB(db_file)
+    sources = [base_language_source(language), custom_dictionary_source(db)]
+    db.conn.close()
+    key = hashlib.sha1(os.path.abspath(db_file).encode("utf-8")).hexdigest()[:10]
+    path = os.path.join(directory, f"{language}+{key}.sklx")
+    ensure_lexicon(path, sources).close()
+    return path
+
+
+def run(files: List[str], lexicon_path: str, jobs: int,
+        out=sys.stdout, with_suggestions: bool = True) -> int:
+    """Check files and write JSON Lines to ``out``. Returns the number of misspellings."""
+    total = 0
+
+    def emit(records: List[Dict[str, object]]) -> None:
+        nonlocal total
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        total += len(records)
+
+    if jobs <= 1 or len(files) <= 1:
+        _init_worker(lexicon_path, with_suggestions)
+        for path in files:
+            emit(check_file(path))
+        return total
+
+    with Pool(jobs, initializer=_init_worker, initargs=(lexicon_path, with_suggestions)) as pool:
+        for records in pool.imap_unordered(check_file, files, chunksize=1):
+            emit(records)
+    return total
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and run the batch spellcheck. Exit status 1 if anything was flagged."""
+    parser = argparse.ArgumentParser(description="Spellcheck manuscript files without the GUI.")
+    parser.add_argument("paths", nargs="+", help="Files or folders to check.")
+    parser.add_argument("--db", default=DB_FILE, help="Dictionary database with custom words.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+    parser.add_argument("--ext", default=".txt,.md", help="Comma-separated extensions for folders.")
+    parser.add_argument("--no-suggestions", action="store_true", help="Skip correction lookups.")
+    args = parser.parse_args(argv)
+    if not os.path.isfile(args.db):
+        parser.error(f"dictionary database not found: {args.db}")
+
+    lexicon_path = build_lexicon(args.db)
+    files = collect_files(args.paths, tuple(args.ext.split(",")))
+    found = run(files, lexicon_path, args.jobs, with_suggestions=not args.no_suggestions)
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
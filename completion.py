@@ -0,0 +1,97 @@
+"""
+completion.py
+
+Prefix completion over custom world vocabulary for the StoryKeeper editor.
+
+Words live in one sorted list, so a prefix maps to a contiguous slice found
+with two binary searches. Matches are ranked by how often the manuscript
+already uses them. Dictionary changes insert or delete single words in
+place instead of rebuilding the list.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from typing import Iterable, List, Mapping, Optional, Set
+
+MIN_PREFIX = 3
+PREFIX_END = "\U0010ffff"
+
+
+def match_case(prefix: str, word: str) -> str:
+    """Give a lowercase completion the capitalization the writer started with."""
+    if len(prefix) > 1 and prefix.isupper():
+        return word.upper()
+    if prefix[:1].isupper():
+        return word[:1].upper() + word[1:]
+    return word
+
+
+class CompletionIndex:
+    """Sorted array of lowercase words answering ranked prefix queries."""
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self._words: List[str] = sorted(set(words))
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, word: str) -> bool:
+        i = bisect_left(self._words, word)
+        return i < len(self._words) and self._words[i] == word
+
+    def add(self, word: str) -> None:
+        """Insert a word (no-op if present)."""
+        if word not in self:
+            insort(self._words, word)
+
+    def remove(self, word: str) -> None:
+        """Delete a word (no-op if absent)."""
+        i = bisect_left(self._words, word)
+        if i < len(self._words) and self._words[i] == word:
+            del self._words[i]
+
+    def apply_changes(self, words: Optional[Set[str]], vocabulary: Mapping[str, object]) -> None:
+        """
+        Bring the index in line with ``vocabulary`` after a dictionary change.
+
+        Args:
+            words (set): Lowercase words that changed, or None for everything.
+            vocabulary (Mapping): Current lowercase custom words (e.g. a BrainSet view).
+        """
+        if words is None:
+            self._words = sorted(vocabulary)
+            return
+        for word in words:
+            if word in vocabulary:
+                self.add(word)
+            else:
+                self.remove(word)
+
+    def complete(self, prefix: str, frequencies: Optional[Mapping[str, int]] = None,
+                 limit: int = 8) -> List[str]:
+        """
+        Return up to ``limit`` words starting with ``prefix``.
+
+        Words the manuscript already uses come first, most frequent first;
+        the rest follow alphabetically. Results use the prefix's capitalization.
+
+        Args:
+            prefix (str): Text typed so far.
+            frequencies (Mapping): Lowercase word -> uses in the manuscript
+                (zero-count words must be absent, as in DocumentStatistics.word_counts).
+            limit (int): Maximum number of completions.
+        """
+        key = prefix.lower()
+        lo = bisect_left(self._words, key)
+        hi = bisect_left(self._words, key + PREFIX_END, lo)
+        matches = self._words[lo:hi]
+        if frequencies:
+            # Membership filtering and lookups stay in C; only used words get ranked.
+            used = list(filter(frequencies.__contains__, matches))
+            ranked = heapq.nlargest(limit, used, key=frequencies.__getitem__)
+            if len(ranked) < limit:
+                chosen = set(ranked)
+                ranked += [w for w in matches[:limit + len(ranked)] if w not in chosen][:limit - len(ranked)]
+        else:
+            ranked = matches[:limit]
+        return [match_case(prefix, w) for w in ranked]
@@ -6,3 +6,5 @@ Defines global constants used throughout the StoryKeeper application.
 
 APP_VERSION: str = "v0.9.2"
 DB_FILE: str = "storykeeper_dictionary.db"
+LEXICON_DIR: str = "lexicons"
+BRAIN_DIR: str = "brains"
@@ -4,8 +4,50 @@ db.py
 Handles all database operations for the StoryKeeper application.
 """
 
+import json
 import sqlite3
-from typing import List, Tuple, Dict, Any
+from instrumentation import TracedConnection
+from typing import List, Tuple, Dict, Any, Callable, Iterable, Mapping, Optional, Set
+
+# Listener signature: receives the lowercase words that changed, or None
+# when the whole dictionary may have changed (e.g. after an import).
+DictionaryListener = Callable[[Optional[Set[str]]], None]
+
+# Bumped whenever _create_tables/_migrate_schema change; stored in PRAGMA user_version
+# so an up-to-date database skips all setup work on open.
+SCHEMA_VERSION = 6
+
+DICTIONARY_TABLE = """
+    CREATE TABLE IF NOT EXISTS dictionary (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        word TEXT,
+        category_id INTEGER NOT NULL REFERENCES categories(id),
+        part_of_speech TEXT,
+        definition TEXT,
+        context_id INTEGER REFERENCES contexts(id),
+        sense_number INTEGER DEFAULT 1,
+        UNIQUE(word, category_id, part_of_speech, sense_number)
+    )
+"""
+
+# Columns older dictionary tables may lack, added before they are normalized.
+LEGACY_COLUMNS = {
+    "category": "TEXT DEFAULT 'General'",
+    "context_hint": "TEXT DEFAULT ''",
+    "sense_number": "INTEGER DEFAULT 1",
+}
+
+# Categories and context hints are interned in their own tables and referenced
+# by id from ``dictionary``; this view joins the names back in the original
+# row shape for readers.
+ENTRIES_VIEW = """
+    CREATE VIEW IF NOT EXISTS dictionary_entries AS
+    SELECT d.id, d.word, c.name AS category, d.part_of_speech, d.definition,
+           COALESCE(x.name, '') AS context_hint, d.sense_number
+    FROM dictionary d
+    JOIN categories c ON c.id = d.category_id
+    LEFT JOIN contexts x ON x.id = d.context_id
+"""
 
 
 class DictionaryDB:
@@ -15,56 +57,160 @@ class DictionaryDB:
         """
         Initialize the database connection and create required tables.
 
+        Table creation and migrations only run when the stored schema version
+        is older than SCHEMA_VERSION; default contexts are only added to new
+        (unversioned) databases.
+
         Args:
             db_file (str): Path to the SQLite database file.
         """
-        self.conn = sqlite3.connect(db_file)
-        self._create_tables()
-        self._migrate_schema()
-        self._prepopulate_contexts()
+        self.conn = sqlite3.connect(db_file, factory=TracedConnection)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self._listeners: List[DictionaryListener] = []
+        version = self.schema_version()
+        if version < SCHEMA_VERSION:
+            if version == 0:
+                # Must be chosen before the first table exists; older files switch in _migrate_schema.
+                self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self._create_tables()
+            self._migrate_schema()
+            if version == 0:
+                self._prepopulate_contexts()
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def schema_version(self) -> int:
+        """Return the schema version recorded in the database file."""
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def path(self) -> str:
+        """Return the file path of the main database ('' when in memory)."""
+        return next(path for _, name, path in self.conn.execute("PRAGMA database_list") if name == "main")
 
     def _create_tables(self) -> None:
         """Create the necessary tables if they don't exist."""
         with self.conn:
             self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS dictionary (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    word TEXT,
-                    category TEXT,
-                    part_of_speech TEXT,
-                    definition TEXT,
-                    context_hint TEXT,
-                    sense_number INTEGER DEFAULT 1,
-                    UNIQUE(word, category, part_of_speech, sense_number)
+                CREATE TABLE IF NOT EXISTS categories (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT UNIQUE NOT NULL
                 )
             """)
             self.conn.execute("""
                 CREATE TABLE IF NOT EXISTS contexts (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE
+                    name TEXT UNIQUE,
+                    listed INTEGER NOT NULL DEFAULT 1
                 )
             """)
+            self.conn.execute(DICTIONARY_TABLE)
             self.conn.execute("""
                 CREATE TABLE IF NOT EXISTS settings (
                     key TEXT PRIMARY KEY,
                     value TEXT
                 )
             """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS word_usage (
+                    word TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+            # What each document has already taught word_usage, so reopening it only adds new words.
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS word_usage_sources (
+                    document TEXT NOT NULL,
+                    word TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (document, word)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS chapters (
+                    key TEXT PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    title TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    words TEXT
+                )
+            """)
 
     def _migrate_schema(self) -> None:
-        """Add missing columns if they don't already exist."""
-        cursor = self.conn.cursor()
-        cursor.execute("PRAGMA table_info(dictionary)")
-        existing_cols = {col[1] for col in cursor.fetchall()}
-        required_cols = {
-            "category": "TEXT DEFAULT 'General'",
-            "context_hint": "TEXT DEFAULT ''",
-            "sense_number": "INTEGER DEFAULT 1"
-        }
-        for col, definition in required_cols.items():
-            if col not in existing_cols:
-                self.conn.execute(f"ALTER TABLE dictionary ADD COLUMN {col} {definition}")
-        self.conn.commit()
+        """Bring older databases up to date, then create indexes and views."""
+        # Older files switch to incremental auto_vacuum through a full VACUUM, which the
+        # maintenance scheduler runs in the background rather than here on open.
+        # WAL lets the maintenance worker connection read and checkpoint without blocking the editor.
+        if self.path():
+            self.conn.execute("PRAGMA journal_mode = WAL")
+
+        contexts_cols = {col[1] for col in self.conn.execute("PRAGMA table_info(contexts)")}
+        if "listed" not in contexts_cols:
+            self.conn.execute("ALTER TABLE contexts ADD COLUMN listed INTEGER NOT NULL DEFAULT 1")
+
+        existing_cols = {col[1] for col in self.conn.execute("PRAGMA table_info(dictionary)")}
+        if "category_id" not in existing_cols:
+            self._normalize_dictionary(existing_cols)
+
+        with self.conn:
+            # Category counts and category changes are common enough to index;
+            # context hints are only labels, so they skip the extra index.
+            self.conn.execute("CREATE INDEX IF NOT EXISTS dictionary_category ON dictionary(category_id)")
+            self.conn.execute(ENTRIES_VIEW)
+
+    def _normalize_dictionary(self, existing_cols: Set[str]) -> None:
+        """
+        Move free-text categories and context hints into the interned tables.
+
+        Everything runs in one transaction, so a failure leaves the old table
+        as it was. Rows whose categories were NULL and 'General' were distinct
+        before but both become 'General'; a later colliding row moves to the
+        next free sense number instead of being dropped.
+
+        Args:
+            existing_cols (set): Columns of the legacy ``dictionary`` table.
+        """
+        conn = self.conn
+        conn.execute("BEGIN")
+        try:
+            for col, definition in LEGACY_COLUMNS.items():
+                if col not in existing_cols:
+                    conn.execute(f"ALTER TABLE dictionary ADD COLUMN {col} {definition}")
+            conn.execute("""
+                INSERT OR IGNORE INTO categories (name)
+                SELECT DISTINCT COALESCE(category, 'General') FROM dictionary
+            """)
+            # Hints typed into entries but never added to the managed list stay unlisted.
+            conn.execute("""
+                INSERT OR IGNORE INTO contexts (name, listed)
+                SELECT DISTINCT context_hint, 0 FROM dictionary WHERE COALESCE(context_hint, '') <> ''
+            """)
+            conn.execute("ALTER TABLE dictionary RENAME TO dictionary_legacy")
+            conn.execute(DICTIONARY_TABLE)
+            rows = conn.execute("""
+                SELECT d.id, d.word, c.id, d.part_of_speech, d.definition, x.id, COALESCE(d.sense_number, 1)
+                FROM dictionary_legacy d
+                JOIN categories c ON c.name = COALESCE(d.category, 'General')
+                LEFT JOIN contexts x ON x.name = d.context_hint
+                ORDER BY d.id
+            """).fetchall()
+            used = set()
+            for i, (entry_id, word, category_id, pos, definition, context_id, sense) in enumerate(rows):
+                if word is None or pos is None:
+                    continue  # NULLs never collide in a UNIQUE constraint
+                while (word, category_id, pos, sense) in used:
+                    sense += 1
+                used.add((word, category_id, pos, sense))
+                rows[i] = (entry_id, word, category_id, pos, definition, context_id, sense)
+            conn.executemany("""
+                INSERT INTO dictionary
+                (id, word, category_id, part_of_speech, definition, context_id, sense_number)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.execute("DROP TABLE dictionary_legacy")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
 
     def _prepopulate_contexts(self) -> None:
         """Populate default context values if they don't exist."""
@@ -76,28 +222,70 @@ class DictionaryDB:
             for ctx in defaults:
                 self.conn.execute("INSERT OR IGNORE INTO contexts (name) VALUES (?)", (ctx,))
 
+    # ---------------- Change Notification ---------------- #
+
+    def subscribe(self, listener: DictionaryListener) -> None:
+        """Register a callback invoked after dictionary entries change."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: DictionaryListener) -> None:
+        """Remove a previously registered callback."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, words: Optional[Set[str]]) -> None:
+        """Inform listeners which words changed (None means everything)."""
+        for listener in list(self._listeners):
+            listener(words)
+
     # ---------------- CRUD Methods ---------------- #
 
+    def _insert_entries(self, rows: Iterable[Tuple[str, str, str, str, str, int]]) -> None:
+        """
+        Insert or replace entries given in the (word, category, part_of_speech,
+        definition, context_hint, sense_number) shape, interning names to ids.
+        Must be called inside a transaction.
+        """
+        category_ids: Dict[str, int] = {}
+        context_ids: Dict[str, Optional[int]] = {}
+
+        def category_id(name: str) -> int:
+            if name not in category_ids:
+                self.conn.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (name,))
+                category_ids[name] = self.conn.execute(
+                    "SELECT id FROM categories WHERE name = ?", (name,)).fetchone()[0]
+            return category_ids[name]
+
+        def context_id(name: str) -> Optional[int]:
+            if not name:
+                return None
+            if name not in context_ids:
+                self.conn.execute("INSERT OR IGNORE INTO contexts (name, listed) VALUES (?, 0)", (name,))
+                context_ids[name] = self.conn.execute(
+                    "SELECT id FROM contexts WHERE name = ?", (name,)).fetchone()[0]
+            return context_ids[name]
+
+        self.conn.executemany("""
+            INSERT OR REPLACE INTO dictionary
+            (word, category_id, part_of_speech, definition, context_id, sense_number)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(word, category_id(category or "General"), pos, definition, context_id(context), sense)
+              for word, category, pos, definition, context, sense in rows])
+
     def add_entry(self, word: str, category: str, pos: str, definition: str,
                   context: str, sense_number: int = 1) -> None:
         """Add or update a single dictionary entry with a specific meaning."""
         with self.conn:
-            self.conn.execute("""
-                INSERT OR REPLACE INTO dictionary
-                (word, category, part_of_speech, definition, context_hint, sense_number)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (word.lower(), category, pos, definition, context, sense_number))
+            self._insert_entries([(word.lower(), category, pos, definition, context, sense_number)])
+        self._notify({word.lower()})
 
     def add_multiple_entries(self, word: str, category: str,
                              entries: List[Tuple[str, str, str, int]]) -> None:
         """Add multiple meanings for a word."""
         with self.conn:
-            for pos, definition, context, sense_number in entries:
-                self.conn.execute("""
-                    INSERT OR REPLACE INTO dictionary
-                    (word, category, part_of_speech, definition, context_hint, sense_number)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (word.lower(), category, pos, definition, context, sense_number))
+            self._insert_entries([(word.lower(), category, pos, definition, context, sense_number)
+                                  for pos, definition, context, sense_number in entries])
+        self._notify({word.lower()})
 
     def delete_entry(self, word: str, sense_number: int = None) -> None:
         """Delete a word or a specific meaning from the dictionary."""
@@ -107,16 +295,23 @@ class DictionaryDB:
                                   (word.lower(), sense_number))
             else:
                 self.conn.execute("DELETE FROM dictionary WHERE word = ?", (word.lower(),))
+        self._notify({word.lower()})
 
     def get_all_entries(self) -> List[Tuple[str, str, str, str, str, int]]:
         """Fetch all dictionary entries with meanings."""
+        categories, contexts = self._names("categories"), self._names("contexts")
         cursor = self.conn.cursor()
         cursor.execute("""
-            SELECT word, category, part_of_speech, definition, context_hint, sense_number
+            SELECT word, category_id, part_of_speech, definition, context_id, sense_number
             FROM dictionary
             ORDER BY word, sense_number
         """)
-        return cursor.fetchall()
+        return [(word, categories[category], pos, definition, contexts.get(context, ""), sense)
+                for word, category, pos, definition, context, sense in cursor.fetchall()]
+
+    def _names(self, table: str, schema: str = "main") -> Dict[Optional[int], str]:
+        """Map the ids of an interned name table (categories or contexts) to names."""
+        return dict(self.conn.execute(f"SELECT id, name FROM {schema}.{table}"))
 
     def get_words_list(self) -> List[str]:
         """Get a list of all distinct words."""
@@ -124,26 +319,273 @@ class DictionaryDB:
         cursor.execute("SELECT DISTINCT word FROM dictionary")
         return [row[0] for row in cursor.fetchall()]
 
+    def get_word_frequencies(self) -> List[Tuple[str, int]]:
+        """Get every lowercase word with its number of senses, sorted by word."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT lower(word), COUNT(*) FROM dictionary GROUP BY lower(word) ORDER BY 1")
+        return cursor.fetchall()
+
+    def get_category_counts(self) -> Dict[str, int]:
+        """Count dictionary entries per category."""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT c.name, n FROM categories c
+            JOIN (SELECT category_id, COUNT(*) AS n FROM dictionary GROUP BY category_id) d
+            ON d.category_id = c.id
+        """)
+        return dict(cursor.fetchall())
+
+    def get_word_categories(self, words: Optional[Iterable[str]] = None,
+                            schema: str = "main") -> Dict[str, Tuple[str, ...]]:
+        """
+        Map lowercase words to the categories they are filed under.
+
+        Args:
+            words: Only look up these words (all words when None).
+            schema (str): Database to read, e.g. an attached brain's schema name.
+        """
+        return self._word_map("category_id", words, schema, self._names("categories", schema))
+
+    def get_parts_of_speech(self, words: Optional[Iterable[str]] = None,
+                            schema: str = "main") -> Dict[str, Tuple[str, ...]]:
+        """Map lowercase words to the parts of speech they are defined as."""
+        return self._word_map("part_of_speech", words, schema)
+
+    def _word_map(self, column: str, words: Optional[Iterable[str]], schema: str,
+                  names: Optional[Mapping[int, str]] = None) -> Dict[str, Tuple[str, ...]]:
+        """
+        Group the distinct values of a dictionary column by lowercase word,
+        sorted per word. Id columns are translated through ``names``.
+        """
+        query = f"SELECT DISTINCT lower(word), {column} FROM {schema}.dictionary"
+        params: List[str] = []
+        if words is not None:
+            params = sorted({w.lower() for w in words})
+            if not params:
+                return {}
+            query += f" WHERE lower(word) IN ({','.join('?' * len(params))})"
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        grouped: Dict[str, List[str]] = {}
+        for word, value in cursor.fetchall():
+            grouped.setdefault(word, []).append(names[value] if names is not None else value)
+        return {word: tuple(sorted(values, key=lambda v: v or "")) if len(values) > 1 else tuple(values)
+                for word, values in grouped.items()}
+
+    def get_senses(self, words: Iterable[str],
+                   schema: str = "main") -> Dict[str, List[Tuple[str, str, str, int]]]:
+        """
+        Fetch the meanings of several words with a single query.
+
+        Args:
+            words: Words to look up (case-insensitive).
+            schema (str): Database to read, e.g. an attached brain's schema name.
+
+        Returns:
+            dict: Lowercase word -> [(part_of_speech, definition, context_hint,
+            sense_number)] ordered by sense number.
+        """
+        params = sorted({w.lower() for w in words})
+        if not params:
+            return {}
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT lower(word), part_of_speech, definition, context_hint, sense_number
+            FROM {schema}.dictionary_entries
+            WHERE lower(word) IN ({','.join('?' * len(params))})
+            ORDER BY sense_number, part_of_speech
+        """, params)
+        senses: Dict[str, List[Tuple[str, str, str, int]]] = {}
+        for word, *sense in cursor.fetchall():
+            senses.setdefault(word, []).append(tuple(sense))
+        return senses
+
+    # ---------------- Word Usage ---------------- #
+
+    def get_word_usage(self) -> Dict[str, int]:
+        """Load the learned manuscript word counts (lowercase word -> count)."""
+        return dict(self.conn.execute("SELECT word, count FROM word_usage").fetchall())
+
+    def get_document_usage(self, document: str) -> Dict[str, int]:
+        """Load how many of each word a document has contributed to the learned counts."""
+        return dict(self.conn.execute("SELECT word, count FROM word_usage_sources WHERE document = ?",
+                                      (document,)).fetchall())
+
+    def save_word_usage(self, counts: Iterable[Tuple[str, int]],
+                        sources: Iterable[Tuple[str, str, int]] = ()) -> None:
+        """
+        Store learned word counts in one transaction.
+
+        Args:
+            counts: (lowercase word, count) pairs; a count of 0 deletes the word.
+            sources: (document, lowercase word, count) pairs recording what each
+                document has contributed so far.
+        """
+        rows = list(counts)
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO word_usage_sources (document, word, count) VALUES (?, ?, ?)
+                ON CONFLICT(document, word) DO UPDATE SET count = excluded.count
+            """, sources)
+            self.conn.executemany("""
+                INSERT INTO word_usage (word, count) VALUES (?, ?)
+                ON CONFLICT(word) DO UPDATE SET count = excluded.count
+            """, [row for row in rows if row[1] > 0])
+            self.conn.executemany("DELETE FROM word_usage WHERE word = ?",
+                                  [(word,) for word, count in rows if count <= 0])
+
+    # ---------------- Chapters ---------------- #
+
+    def get_chapters(self) -> List[Tuple[str, str, str, Optional[Dict[str, int]]]]:
+        """
+        List the manuscript chapters in order, without their text.
+
+        Returns:
+            list: (key, title, digest, cached word counts or None) tuples.
+        """
+        rows = self.conn.execute("SELECT key, title, digest, words FROM chapters ORDER BY position")
+        return [(key, title, digest, json.loads(words) if words else None)
+                for key, title, digest, words in rows.fetchall()]
+
+    def get_chapter_text(self, key: str) -> str:
+        """Load the text of one chapter."""
+        row = self.conn.execute("SELECT body FROM chapters WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return row[0]
+
+    def save_chapters(self, chapters: List[Tuple[str, str, str, Optional[Dict[str, int]]]],
+                      texts: Mapping[str, str]) -> None:
+        """
+        Store the chapter list in one transaction.
+
+        Args:
+            chapters: (key, title, digest, cached word counts) in manuscript order;
+                chapters missing from the list are deleted. Word counts of None
+                keep the stored cache of a chapter whose text is unchanged.
+            texts (Mapping): New text of each added or edited chapter; other
+                chapters keep their stored text.
+        """
+        with self.conn:
+            keys = [chapter[0] for chapter in chapters]
+            self.conn.execute(f"DELETE FROM chapters WHERE key NOT IN ({','.join('?' * len(keys))})", keys)
+            for position, (key, title, digest, words) in enumerate(chapters):
+                cached = json.dumps(words) if words is not None else None
+                if key in texts:
+                    self.conn.execute("""
+                        INSERT INTO chapters (key, position, title, body, digest, words)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(key) DO UPDATE SET position = excluded.position, title = excluded.title,
+                            body = excluded.body, digest = excluded.digest, words = excluded.words
+                    """, (key, position, title, texts[key], digest, cached))
+                else:
+                    self.conn.execute("""
+                        UPDATE chapters SET position = ?, title = ?, words = COALESCE(?, words) WHERE key = ?
+                    """, (position, title, cached, key))
+
+    # ---------------- Attached Databases ---------------- #
+
+    def attach(self, path: str, schema: str) -> None:
+        """Attach another dictionary file under a schema name."""
+        self.conn.execute(f'ATTACH DATABASE ? AS "{schema}"', (path,))
+
+    def attached(self) -> Dict[str, str]:
+        """Map attached schema names to their file paths (excluding main and temp)."""
+        rows = self.conn.execute("PRAGMA database_list").fetchall()
+        return {name: path for _, name, path in rows if name not in ("main", "temp")}
+
+    def detach(self, schema: str) -> None:
+        """Detach a previously attached dictionary file."""
+        self.conn.execute(f'DETACH DATABASE "{schema}"')
+
     def get_contexts(self) -> List[str]:
-        """Get all contexts."""
+        """Get all managed contexts."""
         cursor = self.conn.cursor()
-        cursor.execute("SELECT name FROM contexts ORDER BY name")
+        cursor.execute("SELECT name FROM contexts WHERE listed ORDER BY name")
         return [row[0] for row in cursor.fetchall()]
 
     def add_context(self, name: str) -> None:
-        """Add a new context."""
+        """Add a new context (or list a hint that entries already use)."""
         with self.conn:
-            self.conn.execute("INSERT OR IGNORE INTO contexts (name) VALUES (?)", (name,))
+            self.conn.execute("""
+                INSERT INTO contexts (name, listed) VALUES (?, 1)
+                ON CONFLICT(name) DO UPDATE SET listed = 1
+            """, (name,))
 
     def delete_context(self, name: str) -> None:
-        """Delete a context."""
+        """Delete a context; entries that still use it keep it as their hint."""
         with self.conn:
-            self.conn.execute("DELETE FROM contexts WHERE name = ?", (name,))
+            self.conn.execute("UPDATE contexts SET listed = 0 WHERE name = ?", (name,))
+            self.conn.execute("""
+                DELETE FROM contexts WHERE name = ?
+                AND NOT EXISTS (SELECT 1 FROM dictionary WHERE context_id = contexts.id)
+            """, (name,))
 
     def rename_context(self, old_name: str, new_name: str) -> None:
-        """Rename a context."""
+        """Rename a context everywhere, including the hints of every entry using it."""
+        self._rename("contexts", "context_id", old_name, new_name)
+
+    def get_categories(self) -> List[str]:
+        """Get all category names."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT name FROM categories ORDER BY name")
+        return [row[0] for row in cursor.fetchall()]
+
+    def rename_category(self, old_name: str, new_name: str) -> None:
+        """Rename a category for every entry filed under it."""
+        self._rename("categories", "category_id", old_name, new_name)
+
+    def _rename(self, table: str, column: str, old_name: str, new_name: str) -> None:
+        """
+        Rename an interned name: a single-row update, or a merge into an
+        existing row of that name (colliding category senses are renumbered,
+        never replaced). Listeners hear about the affected words.
+        """
+        if old_name == new_name:
+            return
+        row = self.conn.execute(f"SELECT id FROM {table} WHERE name = ?", (old_name,)).fetchone()
+        if row is None:
+            return
+        old_id = row[0]
+        words: Set[str] = set()
+        if self._listeners:
+            words = {w for (w,) in self.conn.execute(
+                f"SELECT DISTINCT lower(word) FROM dictionary WHERE {column} = ?", (old_id,))}
+        target = self.conn.execute(f"SELECT id FROM {table} WHERE name = ?", (new_name,)).fetchone()
         with self.conn:
-            self.conn.execute("UPDATE contexts SET name = ? WHERE name = ?", (new_name, old_name))
+            if target is None:
+                self.conn.execute(f"UPDATE {table} SET name = ? WHERE id = ?", (new_name, old_id))
+            else:
+                if table == "categories":
+                    self._merge_category(old_id, target[0])
+                else:
+                    self.conn.execute(f"UPDATE dictionary SET {column} = ? WHERE {column} = ?",
+                                      (target[0], old_id))
+                    self.conn.execute("UPDATE contexts SET listed = max(listed, (SELECT listed FROM "
+                                      "contexts WHERE id = ?)) WHERE id = ?", (old_id, target[0]))
+                self.conn.execute(f"DELETE FROM {table} WHERE id = ?", (old_id,))
+        if words:
+            self._notify(words)
+
+    def _merge_category(self, old_id: int, target_id: int) -> None:
+        """
+        Refile every entry of a category under another one. A sense that
+        already exists there moves to the next free sense number, the way
+        _normalize_dictionary resolves collisions, so both definitions survive.
+        Must be called inside a transaction.
+        """
+        used = set(self.conn.execute(
+            "SELECT word, part_of_speech, sense_number FROM dictionary WHERE category_id = ?", (target_id,)))
+        moves = []
+        for entry_id, word, pos, sense in self.conn.execute(
+                "SELECT id, word, part_of_speech, sense_number FROM dictionary WHERE category_id = ? ORDER BY id",
+                (old_id,)).fetchall():
+            if None not in (word, pos, sense):  # NULLs never collide in a UNIQUE constraint
+                while (word, pos, sense) in used:
+                    sense += 1
+                used.add((word, pos, sense))
+            moves.append((target_id, sense, entry_id))
+        self.conn.executemany("UPDATE dictionary SET category_id = ?, sense_number = ? WHERE id = ?", moves)
 
     def get_setting(self, key: str, default: str = "false") -> str:
         """Retrieve a setting value."""
@@ -182,19 +624,30 @@ class DictionaryDB:
         with self.conn:
             if mode == "replace":
                 self.conn.execute("DELETE FROM dictionary")
-            for entry in data:
-                self.conn.execute("""
-                    INSERT OR REPLACE INTO dictionary
-                    (word, category, part_of_speech, definition, context_hint, sense_number)
-                    VALUES (?, ?, ?, ?, ?, ?)""",
-                    (entry["word"], entry["category"], entry["part_of_speech"],
-                     entry["definition"], entry["context_hint"], entry.get("sense_number", 1))
-                )
+                self._prune_names()
+            self._insert_entries((entry["word"], entry["category"], entry["part_of_speech"],
+                                  entry["definition"], entry["context_hint"], entry.get("sense_number", 1))
+                                 for entry in data)
+        self._notify(None)
 
     def import_contexts(self, data: List[Dict[str, str]], mode: str = "merge") -> None:
         """Import contexts data."""
         with self.conn:
             if mode == "replace":
-                self.conn.execute("DELETE FROM contexts")
-            for entry in data:
-                self.conn.execute("INSERT OR IGNORE INTO contexts (name) VALUES (?)", (entry["name"],))
+                self.conn.execute("UPDATE contexts SET listed = 0")
+                self._prune_names()
+            self.conn.executemany("""
+                INSERT INTO contexts (name, listed) VALUES (?, 1)
+                ON CONFLICT(name) DO UPDATE SET listed = 1
+            """, [(entry["name"],) for entry in data])
+
+    def _prune_names(self) -> None:
+        """Drop categories and unlisted contexts that no entry refers to."""
+        self.conn.execute("""
+            DELETE FROM categories
+            WHERE NOT EXISTS (SELECT 1 FROM dictionary WHERE category_id = categories.id)
+        """)
+        self.conn.execute("""
+            DELETE FROM contexts WHERE NOT listed
+            AND NOT EXISTS (SELECT 1 FROM dictionary WHERE context_id = contexts.id)
+        """)
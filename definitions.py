@@ -0,0 +1,119 @@
+"""
+definitions.py
+
+Definition lookups for hover tooltips in the StoryKeeper editor.
+
+The hover path only reads an in-memory LRU cache of ``word -> senses``.
+The cache is filled ahead of time by ``prefetch``, which fetches every
+missing word with one ``IN (...)`` query per dictionary layer (the main
+dictionary or an active world brain), and entries are dropped as soon as
+the dictionary reports that a word changed. Inflected forms ("Kanerans")
+share the cached senses of their dictionary word.
+"""
+
+import html
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional, Set, Tuple
+
+from brains import BrainSet
+
+
+class Sense(NamedTuple):
+    """One meaning of a custom word."""
+
+    part_of_speech: str
+    definition: str
+    context_hint: str
+    sense_number: int
+
+
+Senses = Tuple[Sense, ...]
+
+
+def format_tooltip(word: str, senses: Senses) -> str:
+    """Render a word's senses as rich-text tooltip HTML."""
+    lines = [f"<b>{html.escape(word)}</b>"]
+    for sense in senses:
+        line = f"{sense.sense_number}. <i>{html.escape(sense.part_of_speech)}</i> — {html.escape(sense.definition)}"
+        if sense.context_hint:
+            line += f" <span style='color:gray'>({html.escape(sense.context_hint)})</span>"
+        lines.append(line)
+    return "<br>".join(lines)
+
+
+class DefinitionService:
+    """LRU cache of custom-word senses, filled in batches and invalidated on dictionary changes."""
+
+    def __init__(self, brains: BrainSet, capacity: int = 4096) -> None:
+        """
+        Initialize the service.
+
+        Args:
+            brains (BrainSet): Supplies the layered dictionary and change notifications.
+            capacity (int): Maximum number of cached words.
+        """
+        self.brains = brains
+        self.capacity = capacity
+        self.queries = 0
+        self._cache: "OrderedDict[str, Senses]" = OrderedDict()
+        brains.subscribe(self._on_dictionary_changed)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, word: str) -> Optional[Senses]:
+        """Return cached senses of a word, or None if they have not been prefetched."""
+        key = self.brains.inflections.lemma(word) or word.lower()
+        senses = self._cache.get(key)
+        if senses is not None:
+            self._cache.move_to_end(key)
+        return senses
+
+    def prefetch(self, words: Iterable[str]) -> int:
+        """
+        Load the senses of any uncached custom words among ``words``.
+
+        Returns:
+            int: Number of words fetched from the database.
+        """
+        inflections = self.brains.inflections
+        missing: Set[str] = set()
+        for word in words:
+            key = inflections.lemma(word)
+            if key is None:
+                continue
+            if key in self._cache:
+                self._cache.move_to_end(key)
+            else:
+                missing.add(key)
+        if not missing:
+            return 0
+
+        by_schema = {}
+        for key in missing:
+            source = self.brains.source_of(key)
+            schema = "main" if source == "main" else self.brains.load(source).schema
+            by_schema.setdefault(schema, []).append(key)
+        for schema, keys in by_schema.items():
+            self.queries += 1
+            rows = self.brains.db.get_senses(keys, schema=schema)
+            for key in keys:
+                self._store(key, tuple(Sense(*row) for row in rows.get(key, ())))
+        return len(missing)
+
+    def _store(self, key: str, senses: Senses) -> None:
+        self._cache[key] = senses
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, words: Optional[Iterable[str]] = None) -> None:
+        """Forget cached senses of ``words`` (all words when None)."""
+        if words is None:
+            self._cache.clear()
+            return
+        for word in words:
+            self._cache.pop(word.lower(), None)
+
+    def _on_dictionary_changed(self, words: Optional[Set[str]]) -> None:
+        self.invalidate(words)
@@ -1,17 +1,19 @@
 """
 dialogs.py
 
-Contains all QDialog-based components for exporting, importing, 
-and managing parts of speech with support for multiple meanings.
+Contains all QDialog-based components for exporting, importing,
+managing parts of speech with support for multiple meanings and
+reviewing likely duplicate words.
 """
 
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QPushButton, QComboBox,
-    QCheckBox, QWidget, QHBoxLayout, QTextEdit, QFrame, QSpinBox
+    QCheckBox, QWidget, QHBoxLayout, QTextEdit, QFrame, QSpinBox, QListWidget
 )
 from PyQt6.QtCore import Qt
 from typing import List
 from db import DictionaryDB
+from similarity import SimilarWordIndex
 
 
 class ExportDialog(QDialog):
@@ -87,6 +89,18 @@ class MultiPOSDialog(QDialog):
         cat_layout.addWidget(self.category_input)
         main_layout.addLayout(cat_layout)
 
+        # Near-duplicate warning
+        self.similar_words = [w for _, w in SimilarWordIndex.for_db(db).similar(word)]
+        self.similar_label = QLabel()
+        self.similar_label.setWordWrap(True)
+        self.similar_label.setStyleSheet("color: #b35900;")
+        if self.similar_words:
+            self.similar_label.setText("Similar words already in the dictionary: "
+                                       + ", ".join(self.similar_words))
+        else:
+            self.similar_label.hide()
+        main_layout.addWidget(self.similar_label)
+
         # Part of speech checkboxes
         self.checkboxes = []
         main_layout.addWidget(QLabel("Select Parts of Speech:"))
@@ -169,3 +183,30 @@ class MultiPOSDialog(QDialog):
                     self.db.add_context(context)
         if self.entries:
             self.accept()
+
+
+class DuplicateReportDialog(QDialog):
+    """Lists clusters of dictionary words that are probably spelling variants."""
+
+    def __init__(self, clusters: List[List[str]], max_distance: int, parent: QWidget = None):
+        super().__init__(parent)
+        self.setWindowTitle("Likely Duplicates")
+        self.setGeometry(300, 300, 450, 400)
+
+        layout = QVBoxLayout()
+        if clusters:
+            summary = f"{len(clusters)} group(s) of words within edit distance {max_distance}:"
+        else:
+            summary = f"No words within edit distance {max_distance} of each other."
+        layout.addWidget(QLabel(summary))
+
+        self.cluster_list = QListWidget()
+        for cluster in clusters:
+            self.cluster_list.addItem(", ".join(cluster))
+        layout.addWidget(self.cluster_list)
+
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        layout.addWidget(close_btn)
+
+        self.setLayout(layout)
@@ -0,0 +1,195 @@
+"""
+grammar.py
+
+Incremental rule-based grammar checking for the StoryKeeper application.
+
+Rules are precompiled regular expressions evaluated one sentence at a time.
+Results are cached per block (keyed by a hash of the block text) and per
+sentence (keyed by the sentence text), so editing one sentence re-evaluates
+only that sentence. Dictionary-aware rules use the ``part_of_speech`` of
+custom words.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+WORD = r"[^\W\d_]+(?:['’][^\W\d_]+)*"
+
+SENTENCE_PATTERN = re.compile(r"\S.*?(?:[.!?]+[\"'”’)\]]*(?=\s|$)|$)", re.S)
+ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "st.", "prof.", "sr.", "jr.", "vs.", "etc.", "e.g.", "i.e."}
+INITIALISM = re.compile(r"(?:[^\W\d_]\.){2,}")  # "U.S.", "a.m."
+CLOSING_QUOTES = "\"'”’)]"
+
+REPEATED_WORD = re.compile(rf"\b({WORD})\s+(\1)\b", re.IGNORECASE)
+ARTICLE_A_AN = re.compile(rf"\b(a|an)\s+({WORD})", re.IGNORECASE)
+ARTICLE_WORD = re.compile(rf"\b(a|an|the)\s+({WORD})(\s*[.!?,;:]|\s*$)?", re.IGNORECASE)
+FIRST_LETTER = re.compile(r"[\"'“‘(\[]*([^\W\d_])")
+
+SILENT_H = ("hour", "honest", "honor", "honour", "heir", "herb")
+# "uni" alone is too broad: "unidentified" and "unimportant" start with a vowel sound.
+CONSONANT_SOUND = ("unic", "unif", "unil", "unio", "uniq", "unis", "unit", "univ",
+                   "use", "usu", "uti", "ure", "uro", "one", "once", "eu", "ewe", "ubiq")
+NOUN_LIKE = {"Noun", "Pronoun", "Adjective", "Other"}
+
+
+class GrammarIssue(NamedTuple):
+    """A grammar problem; ``start`` is relative to the sentence or block it was found in."""
+
+    start: int
+    length: int
+    rule: str
+    message: str
+    suggestion: Optional[str] = None
+
+
+PartsOfSpeech = Mapping[str, Tuple[str, ...]]
+Rule = Callable[[str, PartsOfSpeech], Iterable[GrammarIssue]]
+
+
+def split_sentences(text: str) -> List[Tuple[int, str]]:
+    """
+    Split a block into (offset, sentence) pairs, keeping common abbreviations
+    and dotted initialisms intact. A quotation ending in a period does not end
+    the sentence when the narration continues in lowercase.
+    """
+    sentences: List[Tuple[int, str]] = []
+    pending: Optional[Tuple[int, int]] = None
+    for match in SENTENCE_PATTERN.finditer(text):
+        start = pending[0] if pending else match.start()
+        end = match.end()
+        last_word = text[match.start():end].rsplit(None, 1)[-1].lower()
+        if end < len(text) and (last_word in ABBREVIATIONS or INITIALISM.fullmatch(last_word)
+                                or (last_word[-1] in CLOSING_QUOTES and text[end:].lstrip()[:1].islower())):
+            pending = (start, end)
+            continue
+        pending = None
+        sentences.append((start, text[start:end]))
+    if pending:
+        sentences.append((pending[0], text[pending[0]:pending[1]]))
+    return sentences
+
+
+def wants_an(word: str) -> bool:
+    """Guess whether ``word`` starts with a vowel sound."""
+    lower = word.lower()
+    if lower.startswith(SILENT_H):
+        return True
+    if lower.startswith(CONSONANT_SOUND):
+        return False
+    return lower[0] in "aeiou"
+
+
+def repeated_words(sentence: str, pos: PartsOfSpeech) -> Iterable[GrammarIssue]:
+    """Flag immediately repeated words ("the the")."""
+    for match in REPEATED_WORD.finditer(sentence):
+        yield GrammarIssue(match.start(2), len(match.group(2)), "repeated-word",
+                           f"Repeated word '{match.group(2)}'.", match.group(1))
+
+
+def article_agreement(sentence: str, pos: PartsOfSpeech) -> Iterable[GrammarIssue]:
+    """Flag 'a' before vowel sounds and 'an' before consonant sounds."""
+    for match in ARTICLE_A_AN.finditer(sentence):
+        article, word = match.group(1), match.group(2)
+        if len(word) > 1 and word.isupper():
+            continue  # acronyms depend on how they are read aloud
+        expected = "an" if wants_an(word) else "a"
+        if article.lower() != expected:
+            fixed = expected.capitalize() if article[0].isupper() else expected
+            yield GrammarIssue(match.start(1), len(article), "a-an",
+                               f"Use '{fixed}' before '{word}'.", fixed)
+
+
+def sentence_capitalization(sentence: str, pos: PartsOfSpeech) -> Iterable[GrammarIssue]:
+    """Flag sentences that start with a lowercase letter."""
+    match = FIRST_LETTER.match(sentence)
+    if match and match.group(1).islower():
+        yield GrammarIssue(match.start(1), 1, "capitalization",
+                           "Sentences should start with a capital letter.", match.group(1).upper())
+
+
+def article_before_custom_word(sentence: str, pos: PartsOfSpeech) -> Iterable[GrammarIssue]:
+    """
+    Dictionary-aware: an article followed by a custom word that is only
+    defined as a verb or adverb, or by an adjective-only word that ends the phrase.
+    """
+    for match in ARTICLE_WORD.finditer(sentence):
+        word = match.group(2)
+        senses = set(pos.get(word.lower(), ()))
+        if not senses:
+            continue
+        if not senses & NOUN_LIKE:
+            kinds = " or ".join(sorted(s.lower() for s in senses))
+            yield GrammarIssue(match.start(2), len(word), "pos-after-article",
+                               f"'{word}' is only defined as a {kinds}, but follows '{match.group(1)}'.")
+        elif senses == {"Adjective"} and match.group(3) is not None:
+            yield GrammarIssue(match.start(2), len(word), "adjective-without-noun",
+                               f"'{word}' is only defined as an adjective; a noun may be missing.")
+
+
+RULES: List[Rule] = [repeated_words, article_agreement, sentence_capitalization, article_before_custom_word]
+
+
+class GrammarEngine:
+    """Runs the rule set per sentence with block- and sentence-level result caches."""
+
+    def __init__(self, parts_of_speech: Optional[PartsOfSpeech] = None,
+                 rules: Optional[List[Rule]] = None, cache_size: int = 20_000) -> None:
+        """
+        Initialize the engine.
+
+        Args:
+            parts_of_speech (Mapping): Lowercase custom word -> parts of speech.
+            rules (list): Rule functions; defaults to RULES.
+            cache_size (int): Maximum cached blocks and sentences (each).
+        """
+        self.parts_of_speech: PartsOfSpeech = parts_of_speech if parts_of_speech is not None else {}
+        self.rules = rules if rules is not None else list(RULES)
+        self.cache_size = cache_size
+        self.sentences_evaluated = 0
+        self._blocks: "OrderedDict[bytes, Tuple[GrammarIssue, ...]]" = OrderedDict()
+        self._sentences: "OrderedDict[str, Tuple[GrammarIssue, ...]]" = OrderedDict()
+
+    def set_parts_of_speech(self, parts_of_speech: PartsOfSpeech) -> None:
+        """Use a new part-of-speech mapping and drop cached results."""
+        self.parts_of_speech = parts_of_speech
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Forget all cached results (e.g. after dictionary changes)."""
+        self._blocks.clear()
+        self._sentences.clear()
+
+    def check_sentence(self, sentence: str) -> Tuple[GrammarIssue, ...]:
+        """Return issues for one sentence, offsets relative to the sentence."""
+        issues = self._cached(self._sentences, sentence)
+        if issues is None:
+            self.sentences_evaluated += 1
+            issues = tuple(sorted(issue for rule in self.rules
+                                  for issue in rule(sentence, self.parts_of_speech)))
+            self._store(self._sentences, sentence, issues)
+        return issues
+
+    def check_block(self, text: str) -> Tuple[GrammarIssue, ...]:
+        """Return issues for a block of text, offsets relative to the block."""
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        issues = self._cached(self._blocks, key)
+        if issues is None:
+            issues = tuple(issue._replace(start=offset + issue.start)
+                           for offset, sentence in split_sentences(text)
+                           for issue in self.check_sentence(sentence))
+            self._store(self._blocks, key, issues)
+        return issues
+
+    @staticmethod
+    def _cached(cache: OrderedDict, key):
+        issues = cache.get(key)
+        if issues is not None:
+            cache.move_to_end(key)
+        return issues
+
+    def _store(self, cache: OrderedDict, key, issues: Tuple[GrammarIssue, ...]) -> None:
+        cache[key] = issues
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
@@ -0,0 +1,275 @@
+"""
+inflections.py
+
+Inflected forms of custom dictionary words for the StoryKeeper application.
+
+Each custom word (lemma) is expanded once, from its ``part_of_speech``, into
+the surface forms a manuscript uses:
+- nouns: plural
+- verbs: -s, -ed and -ing
+- adjectives: comparative and superlative
+- every word: possessive ('s with either apostrophe)
+- hyphenated entries: each invented part (one missing from the base
+  lexicon) with its forms, since the tokenizer splits at hyphens
+
+Ordinary parts such as "born" in "kaneran-born" are left to the base lexicon,
+so they never pick up the entry's categories. Until the lexicon has loaded no
+part is registered. Compounds formed with a custom word ("Kaneran-born") need
+nothing extra, because each part is checked on its own.
+
+Each vocabulary layer keeps its forms in a flat ``surface -> lemma`` dict
+(a FormLayer), so recognizing a token is one hash probe per layer.
+Dictionary changes regenerate only the forms of the changed lemmas, and
+the layers are stacked like the vocabulary itself.
+"""
+
+from collections import ChainMap
+from collections.abc import Mapping
+from typing import Container, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+VOWELS = "aeiou"
+APOSTROPHES = ("'", "’")
+
+
+def _plural(word: str) -> str:
+    if word.endswith(("s", "x", "z", "ch", "sh")):
+        return word + "es"
+    if len(word) > 1 and word.endswith("y") and word[-2] not in VOWELS:
+        return word[:-1] + "ies"
+    return word + "s"
+
+
+def _suffixed(word: str, suffix: str) -> Set[str]:
+    """Attach a vowel-initial suffix (-ed, -ing, -er, -est) with the usual spelling changes."""
+    if word.endswith("e"):
+        if suffix == "ing" and word.endswith(("ee", "ye", "oe")):
+            return {word + suffix}
+        return {word[:-1] + suffix}
+    if suffix != "ing" and len(word) > 1 and word.endswith("y") and word[-2] not in VOWELS:
+        return {word[:-1] + "i" + suffix}
+    forms = {word + suffix}
+    # Consonant doubling ("plan" -> "planned") depends on stress, so invented words get both spellings.
+    if (len(word) >= 3 and word[-1] not in VOWELS + "wxy"
+            and word[-2] in VOWELS and word[-3] not in VOWELS):
+        forms.add(word + word[-1] + suffix)
+    return forms
+
+
+def inflect(lemma: str, parts_of_speech: Tuple[Optional[str], ...] = (),
+            lexicon: Optional[Container[str]] = None) -> Set[str]:
+    """
+    Generate the lowercase surface forms of a custom word, including the word itself.
+
+    Args:
+        lemma (str): Lowercase dictionary word.
+        parts_of_speech (tuple): The word's parts of speech ("Noun", "Verb", ...).
+        lexicon (Container): Base language words; parts of a hyphenated lemma
+            are only registered when they are missing from it (never when None).
+    """
+    forms = {lemma}
+    head = lemma
+    if "-" in lemma:
+        parts = [part for part in lemma.split("-") if part]
+        invented = [part for part in parts if lexicon is not None and part not in lexicon]
+        forms.update(invented)
+        if not parts or parts[-1] not in invented:
+            return forms  # an ordinary last word inflects through the base lexicon
+        head = parts[-1]
+    for pos in parts_of_speech:
+        if pos == "Noun":
+            forms.add(_plural(head))
+        elif pos == "Verb":
+            forms.add(_plural(head))
+            forms.update(_suffixed(head, "ed"))
+            forms.update(_suffixed(head, "ing"))
+        elif pos == "Adjective":
+            forms.update(_suffixed(head, "er"))
+            forms.update(_suffixed(head, "est"))
+    for apostrophe in APOSTROPHES:
+        forms.add(head + apostrophe + "s")
+    return forms
+
+
+class FormLayer:
+    """
+    Surface forms of one vocabulary layer (the main dictionary or one world
+    brain), built once and patched per changed word.
+    """
+
+    def __init__(self, vocabulary: Mapping, parts_of_speech: Mapping,
+                 lexicon: Optional[Container[str]] = None) -> None:
+        """
+        Expand every word of a layer.
+
+        Args:
+            vocabulary (Mapping): Lowercase lemma -> categories of this layer only.
+            parts_of_speech (Mapping): Lowercase lemma -> parts of speech.
+            lexicon (Container): Base language words, when already loaded.
+        """
+        self.vocabulary = vocabulary
+        self.parts_of_speech = parts_of_speech
+        self.lexicon = lexicon
+        self.lemmas: Dict[str, Tuple[str, ...]] = {}   # surface -> lemmas, the preferred one first
+        self.forms: Dict[str, FrozenSet[str]] = {}     # lemma -> surfaces
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Re-expand the whole layer."""
+        forms = {lemma: frozenset(inflect(lemma, tuple(self.parts_of_speech.get(lemma, ())), self.lexicon))
+                 for lemma in self.vocabulary}
+        # Lemmas go in first, so a word's own entry always comes before other words' forms.
+        lemmas: Dict[str, Tuple[str, ...]] = {lemma: (lemma,) for lemma in forms}
+        for lemma, surfaces in forms.items():
+            for surface in surfaces:
+                current = lemmas.get(surface)
+                if current is None:
+                    lemmas[surface] = (lemma,)
+                elif current[0] != lemma:
+                    lemmas[surface] = current + (lemma,)
+        self.forms = forms
+        self.lemmas = lemmas
+
+    def update(self, words: Set[str]) -> Set[str]:
+        """
+        Regenerate the forms of lemmas that were added, changed or deleted.
+
+        Returns:
+            set: Every surface form whose lemma may have changed (old and new forms).
+        """
+        touched: Set[str] = set()
+        for word in words:
+            touched.update(self._remove(word))
+            if word in self.vocabulary:
+                touched.update(self._add(word))
+        return touched
+
+    def set_lexicon(self, lexicon: Container[str]) -> Set[str]:
+        """
+        Attach the base language lexicon and re-expand the hyphenated lemmas, the
+        only ones whose forms depend on it.
+
+        Returns:
+            set: Surface forms that were added or removed.
+        """
+        self.lexicon = lexicon
+        return self.update({lemma for lemma in self.forms if "-" in lemma})
+
+    def _add(self, lemma: str) -> FrozenSet[str]:
+        forms = frozenset(inflect(lemma, tuple(self.parts_of_speech.get(lemma, ())), self.lexicon))
+        self.forms[lemma] = forms
+        lemmas = self.lemmas
+        for surface in forms:
+            current = lemmas.get(surface)
+            if current is None:
+                lemmas[surface] = (lemma,)
+            elif surface == lemma:
+                lemmas[surface] = (lemma,) + current  # a word's own entry beats anyone's inflection
+            else:
+                lemmas[surface] = current + (lemma,)
+        return forms
+
+    def _remove(self, lemma: str) -> FrozenSet[str]:
+        forms = self.forms.pop(lemma, frozenset())
+        for surface in forms:
+            remaining = tuple(w for w in self.lemmas[surface] if w != lemma)
+            if remaining:
+                self.lemmas[surface] = remaining
+            else:
+                del self.lemmas[surface]
+        return forms
+
+
+class InflectionIndex(Mapping):
+    """
+    Read-only mapping of every surface form of the custom words to its lemma's
+    categories, usable anywhere a lowercase ``word -> categories`` mapping is.
+
+    The index stacks prebuilt FormLayers, highest precedence first, the same
+    way the layered vocabulary view stacks its dictionaries, so switching
+    layers never re-expands a word.
+    """
+
+    def __init__(self, vocabulary: Mapping, parts_of_speech: Optional[Mapping] = None,
+                 layers: Optional[List[FormLayer]] = None) -> None:
+        """
+        Index a vocabulary.
+
+        Args:
+            vocabulary (Mapping): Lowercase lemma -> categories of every layer
+                (e.g. ``BrainSet.view``).
+            parts_of_speech (Mapping): Lowercase lemma -> parts of speech; used
+                to build a single layer when ``layers`` is not given.
+            layers (list): Prebuilt form layers, highest precedence first.
+        """
+        self.vocabulary = vocabulary
+        self.layers: List[FormLayer] = []
+        self._lemmas: ChainMap = ChainMap()
+        self.stack(vocabulary, layers if layers is not None else [FormLayer(vocabulary, parts_of_speech or {})])
+
+    def stack(self, vocabulary: Mapping, layers: List[FormLayer]) -> None:
+        """Switch to another composed vocabulary and its already-built layers."""
+        self.vocabulary = vocabulary
+        self.layers = list(layers)
+        self._lemmas = ChainMap(*(layer.lemmas for layer in self.layers))
+
+    def update(self, words: Set[str]) -> Set[str]:
+        """
+        Regenerate the forms of changed lemmas in every layer.
+
+        Returns:
+            set: Every surface form whose lemma may have changed (old and new forms).
+        """
+        touched: Set[str] = set()
+        for layer in self.layers:
+            touched |= layer.update(words)
+        return touched
+
+    def set_lexicon(self, lexicon: Container[str]) -> Set[str]:
+        """
+        Attach the base language lexicon to every layer.
+
+        Returns:
+            set: Surface forms that were added or removed.
+        """
+        touched: Set[str] = set()
+        for layer in self.layers:
+            touched |= layer.set_lexicon(lexicon)
+        return touched
+
+    def _lemma(self, key: str) -> Optional[str]:
+        if key in self.vocabulary:
+            return key  # a word's own entry beats any layer's inflection
+        lemmas = self._lemmas.get(key)
+        return lemmas[0] if lemmas else None
+
+    def lemma(self, word: str) -> Optional[str]:
+        """Return the dictionary word a surface form belongs to, or None."""
+        return self._lemma(word.lower())
+
+    def forms(self, lemma: str) -> FrozenSet[str]:
+        """Return every surface form generated for a lemma (empty if it is not a custom word)."""
+        key = lemma.lower()
+        for layer in self.layers:
+            forms = layer.forms.get(key)
+            if forms is not None:
+                return forms
+        return frozenset()
+
+    def __contains__(self, word: object) -> bool:
+        return word in self._lemmas
+
+    def __getitem__(self, word: str) -> Tuple[str, ...]:
+        lemma = self._lemma(word)
+        if lemma is None:
+            raise KeyError(word)
+        return self.vocabulary[lemma]
+
+    def get(self, word: str, default=None):
+        lemma = self._lemma(word)
+        return default if lemma is None else self.vocabulary.get(lemma, default)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._lemmas)
+
+    def __len__(self) -> int:
+        return len(self._lemmas)
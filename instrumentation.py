@@ -0,0 +1,245 @@
+"""
+instrumentation.py
+
+Hot-path timers and counters for the StoryKeeper application. Spans record
+rolling latency windows (for the performance dock) and, when tracing,
+Chrome trace-event JSON that can be opened in chrome://tracing or Perfetto.
+
+Everything is off by default and a disabled span is a shared no-op object,
+so instrumented code costs about one function call. Set the environment
+variable STORYKEEPER_TRACE to a file path to enable instrumentation at
+startup and write the trace there when the process exits.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+TRACE_ENV = "STORYKEEPER_TRACE"
+WINDOW = 500            # samples kept per span name for percentiles
+MAX_TRACE_EVENTS = 250_000
+
+_enabled = False
+_tracing = False
+_lock = threading.Lock()
+_samples: Dict[str, Deque[float]] = {}
+_counts: Dict[str, int] = {}
+_counters: Dict[str, int] = {}
+_events: List[Dict[str, Any]] = []
+_pid = os.getpid()
+_origin = time.perf_counter()
+
+
+def enabled() -> bool:
+    """Return True while instrumentation is collecting data."""
+    return _enabled
+
+
+def enable(trace: bool = False) -> None:
+    """Start collecting latencies (and trace events if ``trace``)."""
+    global _enabled, _tracing
+    _enabled = True
+    _tracing = _tracing or trace
+
+
+def disable() -> None:
+    """Stop collecting; already gathered data is kept."""
+    global _enabled, _tracing
+    _enabled = False
+    _tracing = False
+
+
+def reset() -> None:
+    """Discard all collected samples, counters and trace events."""
+    with _lock:
+        _samples.clear()
+        _counts.clear()
+        _counters.clear()
+        _events.clear()
+
+
+def _now_us() -> float:
+    return (time.perf_counter() - _origin) * 1_000_000
+
+
+def record(name: str, start_us: float, duration_us: float, args: Optional[Dict[str, Any]] = None) -> Dict:
+    """Store one completed span and return its trace event (also when not tracing)."""
+    event = {"name": name, "ph": "X", "ts": start_us, "dur": duration_us,
+             "pid": _pid, "tid": threading.get_ident(), "args": args or {}}
+    with _lock:
+        window = _samples.get(name)
+        if window is None:
+            window = _samples[name] = deque(maxlen=WINDOW)
+        window.append(duration_us / 1000)
+        _counts[name] = _counts.get(name, 0) + 1
+        if _tracing and len(_events) < MAX_TRACE_EVENTS:
+            _events.append(event)
+    return event
+
+
+class _Span:
+    """Times a ``with`` block."""
+
+    __slots__ = ("name", "args", "start", "event")
+
+    def __init__(self, name: str, args: Dict[str, Any]) -> None:
+        self.name = name
+        self.args = args
+        self.event = None
+
+    def __enter__(self) -> "_Span":
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.event = record(self.name, self.start, _now_us() - self.start, self.args)
+        return False
+
+
+class _NullSpan:
+    """Shared do-nothing span returned while instrumentation is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **args: Any):
+    """Return a context manager that times its block under ``name``."""
+    if not _enabled:
+        return NULL_SPAN
+    return _Span(name, args)
+
+
+def timed(name: str) -> Callable:
+    """Decorator form of ``span``."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Increment a named counter."""
+    if not _enabled:
+        return
+    with _lock:
+        value = _counters[name] = _counters.get(name, 0) + amount
+        if _tracing and len(_events) < MAX_TRACE_EVENTS:
+            _events.append({"name": name, "ph": "C", "ts": _now_us(), "pid": _pid,
+                            "tid": threading.get_ident(), "args": {"value": value}})
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def snapshot() -> List[Tuple[str, int, float, float, float]]:
+    """Return (name, total count, p50 ms, p95 ms, max ms) per span over the rolling window."""
+    with _lock:
+        windows = {name: sorted(samples) for name, samples in _samples.items()}
+        counts = dict(_counts)
+    return [(name, counts[name], _percentile(s, 0.5), _percentile(s, 0.95), s[-1])
+            for name, s in sorted(windows.items()) if s]
+
+
+def counters() -> Dict[str, int]:
+    """Return a copy of all counters."""
+    with _lock:
+        return dict(_counters)
+
+
+def dump_trace(path: str) -> None:
+    """Write the collected trace events as Chrome trace-event JSON."""
+    with _lock:
+        events = list(_events)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+# ---------------- SQLite ---------------- #
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that records each statement's SQL, duration and rows fetched."""
+
+    _event: Optional[Dict[str, Any]] = None
+
+    def execute(self, sql, parameters=()):
+        if not _enabled:
+            return super().execute(sql, parameters)
+        with _Span("db.query", {"sql": " ".join(sql.split()), "rows": 0}) as s:
+            result = super().execute(sql, parameters)
+        self._event = s.event
+        return result
+
+    def executemany(self, sql, seq_of_parameters):
+        if not _enabled:
+            return super().executemany(sql, seq_of_parameters)
+        with _Span("db.query", {"sql": " ".join(sql.split()), "rows": 0}) as s:
+            result = super().executemany(sql, seq_of_parameters)
+        self._event = s.event
+        return result
+
+    def _add_rows(self, rows: int) -> None:
+        if self._event is not None:
+            self._event["args"]["rows"] += rows
+
+    def fetchone(self):
+        row = super().fetchone()
+        self._add_rows(row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._add_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._add_rows(len(rows))
+        return rows
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection that hands out TracedCursors while instrumentation is enabled."""
+
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = TracedCursor if _enabled else sqlite3.Cursor
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        if not _enabled:
+            return super().execute(sql, parameters)
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not _enabled:
+            return super().executemany(sql, seq_of_parameters)
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# ---------------- Startup ---------------- #
+
+TRACE_ENV_ACTIVE = bool(os.environ.get(TRACE_ENV))
+if TRACE_ENV_ACTIVE:
+    enable(trace=True)
+    atexit.register(dump_trace, os.environ[TRACE_ENV])
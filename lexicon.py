@@ -0,0 +1,221 @@
+"""
+lexicon.py
+
+Compact memory-mapped word-frequency lexicons for the StoryKeeper application.
+
+Frequency lists (the base language list shipped with pyspellchecker and,
+for headless runs, the custom ``dictionary`` table) are compiled once into a
+sorted binary file. Lookups read the mapped file directly, so no per-word
+Python objects live on the heap and several processes share one read-only
+copy through the OS page cache. A file is only recompiled when the
+fingerprint of its sources changes.
+
+File layout (little-endian, uint32 unless noted):
+    header   magic "SKLX", format version, word count, hash slot count,
+             alphabet byte length, 32-byte SHA-256 source fingerprint
+    letters  UTF-8 alphabet of the lexicon, padded to 4 bytes
+    offsets  (count + 1) byte offsets of each word in the word blob
+    freqs    count word frequencies
+    slots    hash table of word index + 1 (0 = empty), crc32 with linear probing
+    words    concatenated UTF-8 words, sorted bytewise
+"""
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+from constants import LEXICON_DIR
+
+MAGIC = b"SKLX"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIIII32s")
+MAX_FREQUENCY = 0xFFFFFFFF
+
+
+class LexiconSource(NamedTuple):
+    """A frequency list to compile: a cheap fingerprint plus a loader for its entries."""
+
+    fingerprint: str
+    load: Callable[[], Iterable[Tuple[str, int]]]
+
+
+class Lexicon:
+    """Read-only view of a compiled lexicon file."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Map a compiled lexicon file.
+
+        Args:
+            path (str): Path to a file written by ``compile_lexicon``.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, slot_count, letters_len, fingerprint = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a StoryKeeper lexicon (format {FORMAT_VERSION})")
+        self.fingerprint: bytes = fingerprint
+        pos = HEADER.size
+        self.letters: str = self._mm[pos:pos + letters_len].decode("utf-8")
+        pos += _pad4(letters_len)
+
+        view = memoryview(self._mm)
+        self._offsets = view[pos:pos + 4 * (count + 1)].cast("I")
+        pos += 4 * (count + 1)
+        self._freqs = view[pos:pos + 4 * count].cast("I")
+        pos += 4 * count
+        self._slots = view[pos:pos + 4 * slot_count].cast("I")
+        pos += 4 * slot_count
+        self._words = pos
+        self._count = count
+        self._mask = slot_count - 1
+        self._total = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, word: str) -> bool:
+        return self._index(word.encode("utf-8")) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self.word(i)
+
+    def word(self, index: int) -> str:
+        """Return the word stored at a sorted position."""
+        return self._word_bytes(index).decode("utf-8")
+
+    def frequency(self, word: str) -> int:
+        """Return the word's frequency, or 0 if it is not in the lexicon."""
+        index = self._index(word.encode("utf-8"))
+        return self._freqs[index] if index >= 0 else 0
+
+    @property
+    def total_frequency(self) -> int:
+        """Sum of all word frequencies (computed on first use)."""
+        if self._total is None:
+            self._total = sum(self._freqs)
+        return self._total
+
+    def close(self) -> None:
+        """Release the mapping."""
+        for view in (self._offsets, self._freqs, self._slots):
+            view.release()
+        self._mm.close()
+
+    def _word_bytes(self, index: int) -> bytes:
+        start = self._words + self._offsets[index]
+        return self._mm[start:self._words + self._offsets[index + 1]]
+
+    def _index(self, key: bytes) -> int:
+        if not self._count:
+            return -1
+        slot = zlib.crc32(key) & self._mask
+        while True:
+            entry = self._slots[slot]
+            if entry == 0:
+                return -1
+            if self._word_bytes(entry - 1) == key:
+                return entry - 1
+            slot = (slot + 1) & self._mask
+
+
+def _pad4(size: int) -> int:
+    return (size + 3) & ~3
+
+
+def compile_lexicon(path: str, entries: Iterable[Tuple[str, int]], fingerprint: bytes) -> None:
+    """
+    Write a lexicon file from (word, frequency) pairs.
+
+    Duplicate words keep their highest frequency. The file is written next to
+    ``path`` and moved into place, so readers never see a partial file.
+    """
+    merged: Dict[bytes, int] = {}
+    for word, freq in entries:
+        key = word.lower().encode("utf-8")
+        merged[key] = min(max(merged.get(key, 0), int(freq)), MAX_FREQUENCY)
+    words = sorted(merged)
+    letters = "".join(sorted({ch for w in words for ch in w.decode("utf-8")})).encode("utf-8")
+
+    offsets = array("I", [0])
+    for w in words:
+        offsets.append(offsets[-1] + len(w))
+    freqs = array("I", (merged[w] for w in words))
+    slot_count = 1
+    while slot_count < 2 * len(words):
+        slot_count <<= 1
+    slots = array("I", bytes(4 * slot_count))
+    mask = slot_count - 1
+    for index, w in enumerate(words):
+        slot = zlib.crc32(w) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = index + 1
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(words), slot_count, len(letters), fingerprint))
+        file.write(letters.ljust(_pad4(len(letters)), b"\0"))
+        for table in (offsets, freqs, slots):
+            file.write(table.tobytes())
+        file.write(b"".join(words))
+    os.replace(tmp_path, path)
+
+
+def read_fingerprint(path: str) -> bytes:
+    """Return the source fingerprint stored in a lexicon file (empty if unreadable)."""
+    try:
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+        magic, version, *_, fingerprint = HEADER.unpack(header)
+    except (OSError, struct.error):
+        return b""
+    return fingerprint if magic == MAGIC and version == FORMAT_VERSION else b""
+
+
+def ensure_lexicon(path: str, sources: List[LexiconSource]) -> Lexicon:
+    """Open the lexicon at ``path``, recompiling it first if its sources changed."""
+    digest = hashlib.sha256()
+    for source in sources:
+        digest.update(source.fingerprint.encode("utf-8") + b"\0")
+    fingerprint = digest.digest()
+    if read_fingerprint(path) != fingerprint:
+        compile_lexicon(path, (entry for source in sources for entry in source.load()), fingerprint)
+    return Lexicon(path)
+
+
+def base_language_source(language: str = "en") -> LexiconSource:
+    """Source for pyspellchecker's bundled word-frequency list of a language."""
+    import spellchecker
+    resource = os.path.join(os.path.dirname(spellchecker.__file__), "resources", f"{language}.json.gz")
+    stat = os.stat(resource)
+
+    def load() -> Iterable[Tuple[str, int]]:
+        with gzip.open(resource, "rt", encoding="utf-8") as file:
+            return json.load(file).items()
+
+    return LexiconSource(f"base:{resource}:{stat.st_size}:{stat.st_mtime_ns}", load)
+
+
+def custom_dictionary_source(db) -> LexiconSource:
+    """Source for the words of a DictionaryDB (frequency = number of senses)."""
+    rows = db.get_word_frequencies()
+    digest = hashlib.sha256(repr(rows).encode("utf-8")).hexdigest()
+    return LexiconSource(f"custom:{digest}", lambda: rows)
+
+
+def open_base_lexicon(language: str = "en", directory: str = LEXICON_DIR) -> Lexicon:
+    """Open (compiling on first use) the base language lexicon."""
+    return ensure_lexicon(os.path.join(directory, f"{language}.sklx"), [base_language_source(language)])
@@ -5,18 +5,18 @@ Main application window for StoryKeeper, including menus, toolbar,
 dockable widgets, and import/export functionality.
 """
 
-import os
-import json
-import zipfile
-import tempfile
 from PyQt6.QtWidgets import (
-    QMainWindow, QFileDialog, QStatusBar, QDockWidget, QMessageBox
+    QMainWindow, QFileDialog, QStatusBar, QDockWidget, QMessageBox, QLabel, QInputDialog
 )
-from PyQt6.QtGui import QAction
+from PyQt6.QtGui import QAction, QKeySequence
 from PyQt6.QtCore import Qt
+import instrumentation
 from db import DictionaryDB
-from widgets import Sidebar, SpellCheckTextEdit
-from dialogs import ExportDialog, ImportDialog
+from brains import BrainSet
+from maintenance import MaintenanceScheduler
+from widgets import ChapterPanel, Sidebar, SpellCheckTextEdit, PerformanceDock
+from project import ZipChapterStore, read_project, write_project
+from workspace import DBChapterStore, Workspace, copy_chapters
 from constants import APP_VERSION
 
 
@@ -29,14 +29,26 @@ class StoryKeeper(QMainWindow):
         self.setGeometry(100, 100, 1000, 600)
 
         self.db = DictionaryDB()
-        self.text_edit = SpellCheckTextEdit(self.db)
+        self.brains = BrainSet(self.db)
+        self.text_edit = SpellCheckTextEdit(self.db, self.brains)
         self.setCentralWidget(self.text_edit)
 
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
+        self.stats_label = QLabel()
+        self.status_bar.addPermanentWidget(self.stats_label)
+        self.text_edit.statistics_changed.connect(self.update_statistics)
+
+        self.maintenance = MaintenanceScheduler(self.db, parent=self)
+        self.text_edit.textChanged.connect(self.maintenance.user_active)
 
         self.create_menu()
         self.create_sidebar()
+        self.create_chapter_dock()
+        self.set_workspace(Workspace(DBChapterStore(self.db)))
+        self.brains.subscribe(self.on_dictionary_changed)
+        self.text_edit.service.lexicon_loaded.connect(lambda _: self.refresh_chapters())
+        self.brains.restore()
 
     def create_menu(self):
         """Create the menu bar."""
@@ -63,6 +75,26 @@ class StoryKeeper(QMainWindow):
         import_action.triggered.connect(self.import_project)
         file_menu.addAction(import_action)
 
+        project_menu = menu.addMenu("Project")
+        add_chapter_action = QAction("New Chapter...", self)
+        add_chapter_action.triggered.connect(self.add_chapter)
+        project_menu.addAction(add_chapter_action)
+
+        find_action = QAction("Find in Project...", self)
+        find_action.setShortcut(QKeySequence("Ctrl+Shift+F"))
+        find_action.triggered.connect(self.find_in_project)
+        project_menu.addAction(find_action)
+
+        self.world_menu = menu.addMenu("World")
+        self.world_menu.aboutToShow.connect(self.populate_world_menu)
+
+        view_menu = menu.addMenu("View")
+        self.perf_action = QAction("Performance Overlay", self)
+        self.perf_action.setCheckable(True)
+        self.perf_action.setShortcut(QKeySequence("Ctrl+Shift+P"))
+        self.perf_action.toggled.connect(self.toggle_performance_overlay)
+        view_menu.addAction(self.perf_action)
+
     def create_sidebar(self):
         """Create the right-side dockable tools panel."""
         dock = QDockWidget("Tools", self)
@@ -70,6 +102,149 @@ class StoryKeeper(QMainWindow):
         dock.setFeatures(QDockWidget.DockWidgetFeature.NoDockWidgetFeatures)
         self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, dock)
 
+    def create_chapter_dock(self):
+        """Create the left-side chapter list."""
+        dock = QDockWidget("Chapters", self)
+        self.chapter_panel = ChapterPanel(self)
+        self.chapter_panel.chapter_selected.connect(self.open_chapter)
+        self.chapter_panel.add_requested.connect(self.add_chapter)
+        dock.setWidget(self.chapter_panel)
+        dock.setFeatures(QDockWidget.DockWidgetFeature.NoDockWidgetFeatures)
+        self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, dock)
+
+    def set_workspace(self, workspace: Workspace):
+        """Switch to another project and open its first chapter (only that chapter is read)."""
+        self.workspace = workspace
+        if not len(workspace):
+            workspace.add_chapter("Chapter 1")
+        self.current_chapter = workspace.chapters[0].key
+        self.text_edit.set_document(self.current_chapter)
+        self.text_edit.setPlainText(workspace.text(self.current_chapter))
+        self.refresh_chapters()
+
+    def store_current_chapter(self):
+        """Hand the editor's text back to the workspace so its cache is current."""
+        self.workspace.set_text(self.current_chapter, self.text_edit.toPlainText())
+
+    def open_chapter(self, key: str):
+        """Show another chapter in the editor; its text is paged in from the project store."""
+        if key == self.current_chapter:
+            return
+        self.store_current_chapter()
+        self.current_chapter = key
+        with instrumentation.span("chapter.open"):
+            self.text_edit.set_document(key)
+            self.text_edit.setPlainText(self.workspace.text(key))
+        self.refresh_chapters()
+
+    def add_chapter(self):
+        """Append a new, empty chapter and open it."""
+        title, ok = QInputDialog.getText(self, "New Chapter", "Chapter title:",
+                                         text=f"Chapter {len(self.workspace) + 1}")
+        if ok and title.strip():
+            self.open_chapter(self.workspace.add_chapter(title.strip()))
+
+    def refresh_chapters(self):
+        """Relabel the chapter list with word and misspelling counts from the chapter caches."""
+        self.store_current_chapter()
+        engine = self.text_edit.engine
+        rows = []
+        for record in self.workspace.chapters:
+            label = f"{record.title} — {sum(self.workspace.words(record.key).values())} words"
+            if engine.ready:
+                label += f", {sum(self.workspace.unknown_words(record.key, engine).values())} unknown"
+            rows.append((record.key, label))
+        self.chapter_panel.set_chapters(rows, self.current_chapter)
+
+    def on_dictionary_changed(self, words):
+        """Forget chapter spellcheck results the change affects and update the counts."""
+        self.workspace.dictionary_changed(words)
+        self.refresh_chapters()
+
+    def find_in_project(self):
+        """
+        Search every chapter's cached vocabulary. A custom word is counted with
+        all its inflected forms; anything else matches words starting with the text.
+        """
+        query, ok = QInputDialog.getText(self, "Find in Project", "Word or beginning of a word:")
+        if not ok or not query.strip():
+            return
+        self.store_current_chapter()
+        lemma = self.brains.inflections.lemma(query.strip())
+        with instrumentation.span("project.search"):
+            if lemma is not None:
+                results = [(key, {lemma: count}) for key, count
+                           in self.workspace.occurrences(lemma, self.brains.inflections)]
+            else:
+                results = self.workspace.search(query.strip())
+        if not results:
+            QMessageBox.information(self, "Find in Project", f"No chapter uses '{query.strip()}'.")
+            return
+        lines = []
+        for key, matches in results:
+            found = ", ".join(f"{word} ×{count}" for word, count in sorted(matches.items()))
+            lines.append(f"{self.workspace.record(key).title}: {found}")
+        QMessageBox.information(self, "Find in Project", "\n".join(lines))
+
+    def toggle_performance_overlay(self, checked: bool):
+        """Show or hide the developer performance dock."""
+        if checked and not hasattr(self, "perf_dock"):
+            self.perf_dock = PerformanceDock(self)
+            self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.perf_dock)
+            self.perf_dock.visibilityChanged.connect(self.perf_action.setChecked)
+        if hasattr(self, "perf_dock"):
+            self.perf_dock.setVisible(checked)
+
+    def populate_world_menu(self):
+        """List the available world brains as toggles."""
+        self.world_menu.clear()
+        for name in self.brains.available():
+            action = QAction(name, self)
+            action.setCheckable(True)
+            action.setChecked(name in self.brains.active)
+            action.toggled.connect(lambda checked, n=name: self.toggle_world(n, checked))
+            self.world_menu.addAction(action)
+        self.world_menu.addSeparator()
+        new_action = QAction("New World...", self)
+        new_action.triggered.connect(self.new_world)
+        self.world_menu.addAction(new_action)
+
+    def toggle_world(self, name: str, checked: bool):
+        """Activate or deactivate a world brain; newly enabled worlds take precedence."""
+        names = [n for n in self.brains.active if n != name]
+        if checked:
+            names.insert(0, name)
+        try:
+            self.brains.activate(names)
+        except (RuntimeError, ValueError, FileNotFoundError) as e:
+            QMessageBox.warning(self, "Worlds", str(e))
+            self.populate_world_menu()
+            return
+        self.status_bar.showMessage(f"Active worlds: {', '.join(names) or 'none'}", 3000)
+
+    def new_world(self):
+        """Create a new, empty world brain and activate it."""
+        name, ok = QInputDialog.getText(self, "New World", "World name:")
+        if ok and name.strip():
+            try:
+                self.brains.create(name.strip())
+            except ValueError as e:
+                QMessageBox.warning(self, "New World", str(e))
+                return
+            self.toggle_world(name.strip(), True)
+
+    def closeEvent(self, event):
+        """Save the chapters and learned word usage, then stop maintenance."""
+        self.store_current_chapter()
+        self.workspace.save()
+        self.text_edit.save_usage()
+        self.maintenance.shutdown()
+        super().closeEvent(event)
+
+    def update_statistics(self, statistics):
+        """Show the latest document statistics in the status bar."""
+        self.stats_label.setText(statistics.summary())
+
     def new_file(self):
         """Create a new file."""
         self.text_edit.clear()
@@ -93,37 +268,29 @@ class StoryKeeper(QMainWindow):
 
     def export_project(self):
         """Export the current project to a ZIP file."""
-        dialog = ExportDialog()
+        from dialogs import ExportDialog
+        with instrumentation.span("dialog.open", dialog="ExportDialog"):
+            dialog = ExportDialog()
         if dialog.exec():
             file_path, _ = QFileDialog.getSaveFileName(self, "Save Project", "", "Zip Files (*.zip)")
             if not file_path:
                 return
 
-            dictionary_data = self.db.export_dictionary() if dialog.include_dict_cb.isChecked() else None
-            context_data = self.db.export_contexts() if dialog.include_ctx_cb.isChecked() else None
-            text_data = self.text_edit.toPlainText()
-
-            with tempfile.TemporaryDirectory() as tmpdir:
-                if dictionary_data:
-                    with open(os.path.join(tmpdir, "dictionary.json"), 'w', encoding='utf-8') as f:
-                        json.dump(dictionary_data, f, indent=2)
-
-                if context_data:
-                    with open(os.path.join(tmpdir, "contexts.json"), 'w', encoding='utf-8') as f:
-                        json.dump(context_data, f, indent=2)
-
-                with open(os.path.join(tmpdir, "content.txt"), 'w', encoding='utf-8') as f:
-                    f.write(text_data)
-
-                with zipfile.ZipFile(file_path, 'w') as zipf:
-                    for filename in os.listdir(tmpdir):
-                        zipf.write(os.path.join(tmpdir, filename), filename)
+            with instrumentation.span("export.collect"):
+                dictionary_data = self.db.export_dictionary() if dialog.include_dict_cb.isChecked() else None
+                context_data = self.db.export_contexts() if dialog.include_ctx_cb.isChecked() else None
+                self.store_current_chapter()
+            with instrumentation.span("export.write"):
+                write_project(file_path, None, dictionary_data, context_data,
+                              chapters=self.workspace.iter_texts())
 
             QMessageBox.information(self, "Export", "Project exported successfully!")
 
     def import_project(self):
         """Import a project from a ZIP file."""
-        dialog = ImportDialog()
+        from dialogs import ImportDialog
+        with instrumentation.span("dialog.open", dialog="ImportDialog"):
+            dialog = ImportDialog()
         if dialog.exec():
             file_path, _ = QFileDialog.getOpenFileName(self, "Import Project", "", "Zip Files (*.zip)")
             if not file_path:
@@ -132,26 +299,22 @@ class StoryKeeper(QMainWindow):
             dict_mode = dialog.dict_mode.currentText().lower()
             ctx_mode = dialog.ctx_mode.currentText().lower()
 
-            with tempfile.TemporaryDirectory() as tmpdir:
-                with zipfile.ZipFile(file_path, 'r') as zipf:
-                    zipf.extractall(tmpdir)
-
-                dict_file = os.path.join(tmpdir, "dictionary.json")
-                ctx_file = os.path.join(tmpdir, "contexts.json")
-                content_file = os.path.join(tmpdir, "content.txt")
-
-                if os.path.exists(dict_file) and dict_mode != "skip":
-                    with open(dict_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        self.db.import_dictionary(data, mode=dict_mode)
-
-                if os.path.exists(ctx_file) and ctx_mode != "skip":
-                    with open(ctx_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        self.db.import_contexts(data, mode=ctx_mode)
-
-                if os.path.exists(content_file):
-                    with open(content_file, 'r', encoding='utf-8') as f:
-                        self.text_edit.setText(f.read())
+            with instrumentation.span("import.read"):
+                _, dictionary_data, context_data = read_project(file_path)
+            if dictionary_data is not None and dict_mode != "skip":
+                with instrumentation.span("import.dictionary", rows=len(dictionary_data)):
+                    self.brains.target().import_dictionary(dictionary_data, mode=dict_mode)
+            if context_data is not None and ctx_mode != "skip":
+                with instrumentation.span("import.contexts", rows=len(context_data)):
+                    self.db.import_contexts(context_data, mode=ctx_mode)
+            # Chapters are copied into the database project; the archive itself is never written.
+            archive = ZipChapterStore(file_path)
+            if archive.records():
+                self.store_current_chapter()
+                self.workspace.save()
+                with instrumentation.span("import.text"):
+                    store = DBChapterStore(self.db)
+                    copy_chapters(archive, store)
+                    self.set_workspace(Workspace(store))
 
             QMessageBox.information(self, "Import", "Project imported successfully!")
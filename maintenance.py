@@ -0,0 +1,288 @@
+"""
+maintenance.py
+
+Idle-time database maintenance for the StoryKeeper application.
+
+Import/replace cycles leave free pages behind, and the query planner has
+no statistics until ANALYZE runs. Once the user has stopped typing for a
+while, the scheduler runs one due task at a time on a worker thread with
+its own connection:
+- planner statistics (ANALYZE with a sampling limit, later PRAGMA optimize)
+- an incremental vacuum of free pages (older files are first converted to
+  incremental auto_vacuum by one full VACUUM)
+- a WAL checkpoint
+- a quick integrity check
+
+SQLite's progress handler enforces a deadline on every statement, so a
+step never holds the database for long, and typing interrupts a step that
+is still running. Each run is recorded in a diagnostics history and as an
+instrumentation span. The time a task last finished is kept in
+``settings``, so task intervals carry over between sessions.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+import instrumentation
+from db import DictionaryDB
+
+IDLE_MS = 3000          # quiet time after the last keystroke before maintenance starts
+POLL_MS = 60_000        # how often to look for due tasks while nothing is due
+STEP_MS = 50            # wall-clock budget of one maintenance step
+MAX_STEP_MS = 2000      # budgets of steps cut off by their deadline grow up to this
+VACUUM_PAGES = 64       # pages released per incremental_vacuum statement
+CONVERT_MS = 60_000     # budget of the one-off full VACUUM; typing still interrupts it
+ANALYSIS_LIMIT = 400    # rows sampled per index by ANALYZE
+
+# Task name -> seconds between successful runs.
+TASKS: Tuple[Tuple[str, float], ...] = (
+    ("optimize", 3600.0),
+    ("vacuum", 60.0),
+    ("checkpoint", 300.0),
+    ("integrity", 86400.0),
+)
+
+
+class MaintenanceRecord(NamedTuple):
+    """One maintenance step, kept for diagnostics."""
+
+    task: str
+    started: float       # time.time() when the step began
+    duration_ms: float
+    outcome: str         # "ok", "partial", "interrupted", "busy" or "error"
+    detail: str
+
+
+class DatabaseMaintenance:
+    """Runs time-boxed maintenance tasks on a private connection to a database file."""
+
+    def __init__(self, path: str, step_ms: float = STEP_MS) -> None:
+        """
+        Prepare the runner; the connection is opened lazily by the thread that runs steps.
+
+        Args:
+            path (str): Database file (in-memory databases cannot be maintained).
+            step_ms (float): Wall-clock budget of one step.
+        """
+        self.path = path
+        self.step_ms = step_ms
+        self.history: Deque[MaintenanceRecord] = deque(maxlen=200)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_run: Dict[str, float] = {}
+        self._budget_ms: Dict[str, float] = {}
+        self._interrupt = threading.Event()
+        self._deadline = 0.0
+
+    def connection(self) -> sqlite3.Connection:
+        """Open the worker connection (autocommit, short busy timeout) on first use."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=0.05, isolation_level=None)
+            try:
+                # Read before the deadline handler is installed, so this cannot be cut short.
+                rows = conn.execute("SELECT key, value FROM settings WHERE key LIKE 'maintenance.%'").fetchall()
+            except sqlite3.Error:
+                conn.close()
+                raise
+            self._last_run = {key[len("maintenance."):]: float(value) for key, value in rows}
+            conn.set_progress_handler(self._should_abort, 1000)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Close the worker connection (call from the thread that ran the steps)."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def interrupt(self) -> None:
+        """Ask the running step to stop as soon as possible."""
+        self._interrupt.set()
+
+    def _should_abort(self) -> int:
+        return int(self._interrupt.is_set() or time.perf_counter() > self._deadline)
+
+    def last_run(self, task: str) -> float:
+        """Return when a task last finished (0 if never)."""
+        return self._last_run.get(task, 0.0)
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Return the tasks whose interval has elapsed, in priority order."""
+        now = time.time() if now is None else now
+        self.connection()
+        return [task for task, interval in TASKS if now - self.last_run(task) >= interval]
+
+    def run_next(self, now: Optional[float] = None) -> Optional[MaintenanceRecord]:
+        """
+        Run one step of the first due task.
+
+        Returns:
+            MaintenanceRecord: What was done, or None if no task is due.
+        """
+        self._interrupt.clear()
+        try:
+            due = self.due(now)
+        except sqlite3.OperationalError:
+            return None  # database briefly locked; try again at the next idle period
+        if not due:
+            return None
+        task = due[0]
+        step: Callable[[sqlite3.Connection], Tuple[bool, str]] = getattr(self, "_" + task)
+        started = time.time()
+        start = time.perf_counter()
+        budget = self._budget_ms.get(task, self.step_ms)
+        self._deadline = start + budget / 1000
+        finished = False
+        try:
+            with instrumentation.span("maintenance." + task):
+                finished, detail = step(self.connection())
+            outcome = "ok" if finished else "partial"
+        except sqlite3.OperationalError as e:
+            if "interrupt" in str(e):
+                if self._interrupt.is_set():
+                    outcome, detail = "interrupted", "user activity"
+                else:
+                    # Statements like ANALYZE cannot resume; give the next attempt more time.
+                    self._budget_ms[task] = min(max(budget, 1) * 4, MAX_STEP_MS)
+                    outcome, detail = "interrupted", f"over the {budget:.0f} ms budget"
+            elif "locked" in str(e) or "busy" in str(e):
+                outcome, detail = "busy", str(e)
+            else:
+                outcome, detail = "error", str(e)
+        except sqlite3.DatabaseError as e:
+            outcome, detail = "error", str(e)
+        if self._conn is not None and self._conn.in_transaction:
+            self._conn.rollback()
+        instrumentation.count("maintenance." + outcome)
+        if finished or outcome == "error":  # errors are retried after the task's interval
+            self._mark_done(task, time.time() if now is None else now)
+        record = MaintenanceRecord(task, started, (time.perf_counter() - start) * 1000, outcome, detail)
+        self.history.append(record)
+        return record
+
+    def _mark_done(self, task: str, when: float) -> None:
+        self._last_run[task] = when
+        self._deadline = time.perf_counter() + self.step_ms / 1000
+        try:
+            self.connection().execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                                      ("maintenance." + task, repr(when)))
+        except sqlite3.OperationalError:
+            pass  # remembered for this session; persisted after the next run
+
+    # ---------------- Tasks ---------------- #
+    # Each returns (finished, detail); an unfinished task continues in the next step.
+
+    def _optimize(self, conn: sqlite3.Connection) -> Tuple[bool, str]:
+        conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is None:
+            conn.execute("ANALYZE")
+            return True, "analyzed all tables"
+        conn.execute("PRAGMA optimize")
+        return True, "optimized"
+
+    def _vacuum(self, conn: sqlite3.Connection) -> Tuple[bool, str]:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # A file's auto_vacuum mode only changes through a full VACUUM, which cannot
+            # resume, so it gets one long step.
+            self._deadline = time.perf_counter() + CONVERT_MS / 1000
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            return True, "converted to incremental auto_vacuum"
+        initial = free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        while free:
+            if self._should_abort():
+                return False, f"released {initial - free} pages, {free} left"
+            # executescript steps the pragma to completion; execute() frees a single page.
+            conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_PAGES})")
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return True, f"released {initial} pages"
+
+    def _checkpoint(self, conn: sqlite3.Connection) -> Tuple[bool, str]:
+        if conn.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+            return True, "not in WAL mode"
+        busy, log, done = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        return not busy and done == log, f"checkpointed {done} of {log} frames"
+
+    def _integrity(self, conn: sqlite3.Connection) -> Tuple[bool, str]:
+        problems = [row[0] for row in conn.execute("PRAGMA quick_check")]
+        if problems != ["ok"]:
+            instrumentation.count("maintenance.integrity_errors")
+            return True, "; ".join(problems[:5])
+        return True, "ok"
+
+
+class MaintenanceScheduler(QObject):
+    """Runs DatabaseMaintenance steps on a worker thread whenever the user is idle."""
+
+    step_finished = pyqtSignal(object)  # MaintenanceRecord, on the GUI thread
+    _step_done = pyqtSignal(object)
+
+    def __init__(self, db: DictionaryDB, idle_ms: int = IDLE_MS, parent=None) -> None:
+        """
+        Start waiting for an idle period.
+
+        Args:
+            db (DictionaryDB): Database to maintain; in-memory databases are left alone.
+            idle_ms (int): Quiet time after the last user activity before a step runs.
+        """
+        super().__init__(parent)
+        path = db.path()
+        self.maintenance = DatabaseMaintenance(path) if path else None
+        self.idle_ms = idle_ms
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="maintenance")
+        self._running = False
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.timeout.connect(self._run_next)
+        self._step_done.connect(self._on_step_done)
+        if self.maintenance is not None:
+            self._idle_timer.start(idle_ms)
+
+    @property
+    def history(self) -> List[MaintenanceRecord]:
+        """Recent maintenance steps, oldest first."""
+        return list(self.maintenance.history) if self.maintenance is not None else []
+
+    def user_active(self) -> None:
+        """Postpone maintenance, interrupting a running step, while the user is typing."""
+        if self.maintenance is None:
+            return
+        if self._running:
+            self.maintenance.interrupt()
+        self._idle_timer.start(self.idle_ms)
+
+    def _run_next(self) -> None:
+        if self._running or self.maintenance is None:
+            return
+        self._running = True
+        self.pool.submit(self._work)
+
+    def _work(self) -> None:
+        record = self.maintenance.run_next()
+        try:
+            self._step_done.emit(record)
+        except RuntimeError:
+            pass  # Scheduler was destroyed during the step.
+
+    def _on_step_done(self, record: Optional[MaintenanceRecord]) -> None:
+        self._running = False
+        if record is None:
+            self._idle_timer.start(POLL_MS)
+            return
+        self.step_finished.emit(record)
+        if not self._idle_timer.isActive():
+            # Still idle: continue at once, or after a quiet period if the step was cut short.
+            self._idle_timer.start(0 if record.outcome in ("ok", "partial") else self.idle_ms)
+
+    def shutdown(self) -> None:
+        """Stop scheduling, interrupt any running step and close the worker connection."""
+        self._idle_timer.stop()
+        if self.maintenance is not None:
+            self.maintenance.interrupt()
+            self.pool.submit(self.maintenance.close)
+        self.pool.shutdown(wait=True)
@@ -11,6 +11,10 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from db import DictionaryDB
+from dialogs import DuplicateReportDialog
+from similarity import find_duplicate_clusters
+
+DUPLICATE_DISTANCE = 1
 
 
 class ContextManager(QDialog):
@@ -109,6 +113,10 @@ class DictionaryManager(QDialog):
         delete_btn.clicked.connect(self.delete_selected)
         layout.addWidget(delete_btn)
 
+        duplicates_btn = QPushButton("Find Likely Duplicates")
+        duplicates_btn.clicked.connect(self.find_duplicates)
+        layout.addWidget(duplicates_btn)
+
         close_btn = QPushButton("Close")
         close_btn.clicked.connect(self.close)
         layout.addWidget(close_btn)
@@ -160,6 +168,12 @@ class DictionaryManager(QDialog):
                         self.db.delete_entry(word)
             self.refresh_word_list()
 
+    def find_duplicates(self):
+        """Show groups of words that are likely spelling variants of each other."""
+        clusters = find_duplicate_clusters(self.db.get_word_categories(), DUPLICATE_DISTANCE)
+        self.duplicate_report = DuplicateReportDialog(clusters, DUPLICATE_DISTANCE, self)
+        self.duplicate_report.exec()
+
     def open_context_menu(self, position):
         """Open a right-click context menu for deletion."""
         menu = QMenu()
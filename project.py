@@ -0,0 +1,174 @@
+"""
+project.py
+
+Reading and writing StoryKeeper project archives. A project is a ZIP file
+holding the manuscript and, optionally, the dictionary (dictionary.json)
+and contexts (contexts.json).
+
+The manuscript is either a single content.txt or, for chaptered projects,
+one member per chapter under chapters/ listed in chapters.json. The
+manifest also caches each chapter's word counts together with the CRC-32
+of the text they were computed from. ZIP records that same checksum for
+every member, so a stale cache is detected without decompressing anything.
+"""
+
+import json
+import os
+import tempfile
+import zipfile
+import zlib
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+CONTENT_FILE = "content.txt"
+DICTIONARY_FILE = "dictionary.json"
+CONTEXTS_FILE = "contexts.json"
+CHAPTERS_FILE = "chapters.json"
+CHAPTER_DIR = "chapters/"
+LEGACY_CHAPTER = "content"  # key under which a single-text project's content.txt is exposed
+
+
+class ChapterRecord(NamedTuple):
+    """A chapter as listed in a project, without its text."""
+
+    key: str
+    title: str
+    digest: str
+    words: Optional[Dict[str, int]] = None  # lowercase word counts of the text with this digest
+
+
+def text_digest(text: str) -> str:
+    """Return the CRC-32 of a chapter's UTF-8 text (the checksum ZIP stores per member)."""
+    return f"{zlib.crc32(text.encode('utf-8')):08x}"
+
+
+def chapter_member(key: str) -> str:
+    """Archive member name of a chapter."""
+    return CONTENT_FILE if key == LEGACY_CHAPTER else f"{CHAPTER_DIR}{key}.txt"
+
+
+def write_project(path: str, text: Optional[str],
+                  dictionary_data: Optional[List[Dict[str, Any]]] = None,
+                  context_data: Optional[List[Dict[str, str]]] = None,
+                  chapters: Optional[Iterable[Tuple[ChapterRecord, str]]] = None) -> None:
+    """
+    Write a project archive; empty or missing dictionary/context data is left out.
+
+    Args:
+        path (str): Archive to create.
+        text (str): Manuscript written as content.txt (ignored when ``chapters`` is given).
+        dictionary_data (list): Exported dictionary entries.
+        context_data (list): Exported contexts.
+        chapters: (record, text) pairs written as chapter members plus a
+            manifest; consumed lazily, so only one chapter's text is held at a time.
+    """
+    with zipfile.ZipFile(path, 'w') as zipf:
+        if dictionary_data:
+            zipf.writestr(DICTIONARY_FILE, json.dumps(dictionary_data, indent=2))
+        if context_data:
+            zipf.writestr(CONTEXTS_FILE, json.dumps(context_data, indent=2))
+        if chapters is None:
+            zipf.writestr(CONTENT_FILE, text)
+            return
+        manifest = []
+        for record, chapter_text in chapters:
+            zipf.writestr(chapter_member(record.key), chapter_text)
+            manifest.append({"key": record.key, "title": record.title,
+                             "digest": text_digest(chapter_text), "words": record.words})
+        zipf.writestr(CHAPTERS_FILE, json.dumps(manifest))
+
+
+def read_project(path: str) -> Tuple[Optional[str], Optional[List[Dict[str, Any]]],
+                                     Optional[List[Dict[str, str]]]]:
+    """
+    Read a project archive.
+
+    Returns:
+        tuple: (text, dictionary data, context data); each is None when the
+        archive does not contain it. Chaptered manuscripts are not read here
+        (see ZipChapterStore).
+    """
+    with zipfile.ZipFile(path, 'r') as zipf:
+        names = set(zipf.namelist())
+
+        def load(name: str):
+            if name not in names:
+                return None
+            return json.loads(zipf.read(name).decode('utf-8'))
+
+        text = zipf.read(CONTENT_FILE).decode('utf-8') if CONTENT_FILE in names else None
+        return text, load(DICTIONARY_FILE), load(CONTEXTS_FILE)
+
+
+class ZipChapterStore:
+    """Chapters kept as members of a project archive and read one at a time."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def records(self) -> List[ChapterRecord]:
+        """
+        List the chapters from the manifest and the archive directory only.
+
+        Cached word counts are dropped for members whose checksum no longer
+        matches the manifest. A single-text project appears as one chapter,
+        and an archive that does not exist yet has none.
+        """
+        if not os.path.exists(self.path):
+            return []
+        with zipfile.ZipFile(self.path, 'r') as zipf:
+            infos = {info.filename: info for info in zipf.infolist()}
+            if CHAPTERS_FILE not in infos:
+                if CONTENT_FILE not in infos:
+                    return []
+                return [ChapterRecord(LEGACY_CHAPTER, "Manuscript", f"{infos[CONTENT_FILE].CRC:08x}")]
+            records = []
+            for entry in json.loads(zipf.read(CHAPTERS_FILE).decode('utf-8')):
+                info = infos.get(chapter_member(entry["key"]))
+                if info is None:
+                    continue
+                digest = f"{info.CRC:08x}"
+                words = entry.get("words") if entry.get("digest") == digest else None
+                records.append(ChapterRecord(entry["key"], entry["title"], digest, words))
+            return records
+
+    def read(self, key: str) -> str:
+        """Decompress the text of one chapter."""
+        with zipfile.ZipFile(self.path, 'r') as zipf:
+            return zipf.read(chapter_member(key)).decode('utf-8')
+
+    def save(self, records: List[ChapterRecord], texts: Mapping[str, str]) -> None:
+        """
+        Rewrite the archive with the given chapters, keeping its dictionary and contexts.
+
+        Args:
+            records: Chapters in manuscript order; word counts of None keep
+                the archive's cache of a chapter whose text is unchanged.
+            texts (Mapping): New text of added or edited chapters; the others
+                are copied from the current archive one at a time.
+        """
+        dictionary_data = context_data = None
+        previous: Dict[str, ChapterRecord] = {}
+        if os.path.exists(self.path):
+            previous = {record.key: record for record in self.records()}
+            with zipfile.ZipFile(self.path, 'r') as zipf:
+                names = set(zipf.namelist())
+                if DICTIONARY_FILE in names:
+                    dictionary_data = json.loads(zipf.read(DICTIONARY_FILE).decode('utf-8'))
+                if CONTEXTS_FILE in names:
+                    context_data = json.loads(zipf.read(CONTEXTS_FILE).decode('utf-8'))
+
+        def chapters():
+            for record in records:
+                old = previous.get(record.key)
+                if record.words is None and old is not None and old.digest == record.digest:
+                    record = record._replace(words=old.words)
+                yield record, texts[record.key] if record.key in texts else self.read(record.key)
+
+        fd, tmp_path = tempfile.mkstemp(suffix=".zip", dir=os.path.dirname(os.path.abspath(self.path)))
+        os.close(fd)
+        try:
+            write_project(tmp_path, None, dictionary_data, context_data, chapters())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
@@ -0,0 +1,234 @@
+"""
+similarity.py
+
+Near-duplicate detection for custom dictionary words ("kaneran" vs
+"kanneran" vs "kaneren").
+
+``SimilarWordIndex`` answers "which existing words are within edit distance
+k of this one?" interactively. It is a bigram count filter: every edit
+destroys at most two of a word's bigrams, so only words of similar length
+sharing enough bigrams with the query are compared exactly. The index is
+kept up to date from dictionary change notifications.
+
+``find_duplicate_clusters`` groups a whole word list using deletion
+neighbourhoods (words that become equal after removing up to k letters),
+which avoids comparing every pair.
+"""
+
+import weakref
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def _pattern(word: str) -> Dict[str, int]:
+    """Per-letter position bitmasks of ``word`` for the bit-parallel distance."""
+    peq: Dict[str, int] = {}
+    for i, ch in enumerate(word):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    return peq
+
+
+def _distance(peq: Dict[str, int], m: int, text: str) -> int:
+    """Edit distance between a prepared pattern of length ``m`` and ``text`` (Myers/Hyyrö)."""
+    if m == 0:
+        return len(text)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for ch in text:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        pv = (((mh << 1) & mask) | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Edit distance between two strings."""
+    if a == b:
+        return 0
+    return _distance(_pattern(a), len(a), b)
+
+
+def bigrams(word: str) -> Set[str]:
+    """Distinct bigrams of ``word`` padded with start/end markers."""
+    padded = f"^{word}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def default_distance(word: str) -> int:
+    """Edit distance worth warning about: 1 for short words, 2 for longer ones."""
+    return 1 if len(word) <= 5 else 2
+
+
+class SimilarWordIndex:
+    """Bigram index over lowercase words supporting edit-distance queries."""
+
+    _instances: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def __init__(self, words: Iterable[str] = (), db=None) -> None:
+        """
+        Build the index.
+
+        Args:
+            words (Iterable[str]): Lowercase words to index.
+            db (DictionaryDB): Keep the index in sync with this database's changes.
+        """
+        # Weak, so the shared index cached per database does not keep its database alive.
+        self._db = weakref.ref(db) if db is not None else None
+        self._load(words)
+        if db is not None:
+            db.subscribe(self._on_dictionary_changed)
+
+    @property
+    def db(self):
+        """The database this index follows, or None."""
+        return self._db() if self._db is not None else None
+
+    def _load(self, words: Iterable[str]) -> None:
+        self._words: List[Optional[str]] = []          # id -> word (None once removed)
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[Tuple[str, int], List[int]] = {}   # (bigram, length) -> ids
+        self._by_length: Dict[int, List[int]] = {}
+        for word in words:
+            self.add(word)
+
+    @classmethod
+    def for_db(cls, db) -> "SimilarWordIndex":
+        """Return the shared index of a DictionaryDB, building it on first use."""
+        index = cls._instances.get(db)
+        if index is None:
+            index = cls._instances[db] = cls(db.get_word_categories(), db)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._ids
+
+    def add(self, word: str) -> None:
+        """Index a word (no-op if present)."""
+        if word in self._ids:
+            return
+        word_id = self._ids[word] = len(self._words)
+        self._words.append(word)
+        length = len(word)
+        self._by_length.setdefault(length, []).append(word_id)
+        for gram in bigrams(word):
+            self._postings.setdefault((gram, length), []).append(word_id)
+
+    def remove(self, word: str) -> None:
+        """Drop a word; its stale postings are skipped and compacted away later."""
+        word_id = self._ids.pop(word, None)
+        if word_id is None:
+            return
+        self._words[word_id] = None
+        if len(self._words) > 2 * len(self._ids) + 64:
+            self._load(list(self._ids))
+
+    def _on_dictionary_changed(self, words: Optional[Set[str]]) -> None:
+        if words is None:
+            self._load(self.db.get_word_categories())
+            return
+        present = self.db.get_word_categories(words)
+        for word in words:
+            if word in present:
+                self.add(word)
+            else:
+                self.remove(word)
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[int, str]]:
+        """Return (distance, word) pairs within ``max_distance``, closest first."""
+        length = len(word)
+        lengths = range(length - max_distance, length + max_distance + 1)
+        grams = bigrams(word)
+        needed = len(grams) - 2 * max_distance
+        if needed <= 0:
+            candidates: Iterable[int] = [i for n in lengths for i in self._by_length.get(n, ())]
+        else:
+            shared: Counter = Counter()
+            for gram in grams:
+                for n in lengths:
+                    ids = self._postings.get((gram, n))
+                    if ids:
+                        shared.update(ids)
+            candidates = [i for i, hits in shared.items() if hits >= needed]
+
+        peq = _pattern(word)
+        results = []
+        for word_id in candidates:
+            other = self._words[word_id]
+            if other is not None:
+                distance = _distance(peq, length, other)
+                if distance <= max_distance:
+                    results.append((distance, other))
+        return sorted(results)
+
+    def similar(self, word: str, max_distance: Optional[int] = None) -> List[Tuple[int, str]]:
+        """
+        Indexed words close to ``word``, excluding the word itself.
+
+        Args:
+            word (str): Word to look up (case-insensitive).
+            max_distance (int): Largest edit distance to report; defaults to
+                ``default_distance(word)``.
+        """
+        key = word.lower()
+        if max_distance is None:
+            max_distance = default_distance(key)
+        return [(d, w) for d, w in self.search(key, max_distance) if w != key]
+
+
+def deletion_keys(word: str, max_distance: int) -> Set[str]:
+    """All strings obtained by deleting up to ``max_distance`` letters from ``word``."""
+    keys = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        keys |= frontier
+    return keys
+
+
+def find_duplicate_clusters(words: Iterable[str], max_distance: int = 1) -> List[List[str]]:
+    """
+    Group words connected by edit distance <= ``max_distance``.
+
+    Two such words always share a deletion key, so only words within the
+    same key bucket are ever compared.
+
+    Returns:
+        list: Clusters of two or more words, largest first.
+    """
+    unique = sorted(set(words))
+    buckets: Dict[str, List[int]] = {}
+    for index, word in enumerate(unique):
+        for key in deletion_keys(word, max_distance):
+            buckets.setdefault(key, []).append(index)
+
+    parent = list(range(len(unique)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for members in buckets.values():
+        for pos, i in enumerate(members):
+            for j in members[pos + 1:]:
+                if find(i) != find(j) and levenshtein(unique[i], unique[j]) <= max_distance:
+                    parent[find(j)] = find(i)
+
+    clusters: Dict[int, List[str]] = {}
+    for index, word in enumerate(unique):
+        clusters.setdefault(find(index), []).append(word)
+    return sorted((c for c in clusters.values() if len(c) > 1), key=lambda c: (-len(c), c))
@@ -0,0 +1,154 @@
+"""
+spellcheck.py
+
+Qt-free spellchecking pipeline for the StoryKeeper application:
+tokenization plus known/unknown verdicts against the base language
+and the custom dictionary. Shared by the editor and the statistics service.
+"""
+
+import re
+import time
+from typing import TYPE_CHECKING, Dict, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from usage import UsageModel
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+
+USAGE_WEIGHT = 0.5    # share of a candidate's score taken from the author's own word usage
+CUSTOM_PRIOR = 0.01   # base probability given to custom words, about that of a very common word
+MENU_BUDGET = 0.05    # seconds a context-menu lookup may spend on distance-2 candidates
+
+
+class Token(NamedTuple):
+    """A word found in a block of text, with its offset inside that block."""
+
+    start: int
+    word: str
+
+
+def tokenize(text: str) -> List[Token]:
+    """Split text into word tokens, keeping the start offset of each token."""
+    return [Token(match.start(), match.group()) for match in WORD_PATTERN.finditer(text)]
+
+
+def load_base_lexicon(language: str = "en"):
+    """
+    Open the memory-mapped base language lexicon. The first call compiles it
+    from pyspellchecker's frequency list, so the GUI calls this off the main thread.
+    """
+    from lexicon import open_base_lexicon
+    return open_base_lexicon(language)
+
+
+def edits1(word: str, letters: str) -> Set[str]:
+    """All strings one delete, transpose, replace or insert away from ``word``."""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    deletes = [left + right[1:] for left, right in splits if right]
+    transposes = [left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1]
+    replaces = [left + c + right[1:] for left, right in splits if right for c in letters]
+    inserts = [left + c + right for left, right in splits for c in letters]
+    return set(deletes + transposes + replaces + inserts)
+
+
+class SpellCheckEngine:
+    """Classifies words as known or unknown against a base lexicon and custom words."""
+
+    def __init__(self, lexicon=None, custom_words: Optional[Mapping[str, Tuple[str, ...]]] = None) -> None:
+        """
+        Initialize the engine.
+
+        Args:
+            lexicon: A ``lexicon.Lexicon`` for the base language, or None while
+                it is still loading (every word counts as known).
+            custom_words (Mapping): Lowercase custom word mapped to its categories.
+        """
+        self.lexicon = lexicon
+        self.custom_words: Mapping[str, Tuple[str, ...]] = custom_words if custom_words is not None else {}
+        self.usage: Optional["UsageModel"] = None
+        self._verdicts: Dict[str, bool] = {}
+
+    @property
+    def ready(self) -> bool:
+        """True once a base language lexicon is attached."""
+        return self.lexicon is not None
+
+    def set_lexicon(self, lexicon) -> None:
+        """Attach the base language lexicon and drop cached verdicts."""
+        self.lexicon = lexicon
+        self._verdicts.clear()
+
+    def set_custom_words(self, custom_words: Mapping[str, Tuple[str, ...]]) -> None:
+        """
+        Replace the custom word mapping (lowercase word -> categories).
+
+        The mapping is used as-is, not copied, so a layered view such as
+        ``BrainSet.view`` can be swapped in without rebuilding anything.
+        """
+        self.custom_words = custom_words
+
+    def set_usage(self, usage: Optional["UsageModel"]) -> None:
+        """Blend the author's learned word counts into suggestion ranking."""
+        self.usage = usage
+
+    def is_custom(self, word: str) -> bool:
+        """Return True if the word is in the custom dictionary."""
+        return word.lower() in self.custom_words
+
+    def categories(self, word: str) -> Tuple[str, ...]:
+        """Return the custom dictionary categories of a word (empty if none)."""
+        return self.custom_words.get(word.lower(), ())
+
+    def is_known(self, word: str) -> bool:
+        """Return True if the word is spelled correctly."""
+        key = word.lower()
+        if key in self.custom_words or self.lexicon is None:
+            return True
+        verdict = self._verdicts.get(key)
+        if verdict is None:
+            verdict = key in self.lexicon
+            self._verdicts[key] = verdict
+        return verdict
+
+    def suggestions(self, word: str, limit: int = 5, budget: Optional[float] = None) -> List[str]:
+        """
+        Return likely corrections for a misspelled word, best first.
+
+        Candidates are ranked by a blend of their base language probability
+        (custom words count as very common) and how often the author uses them.
+
+        Args:
+            word (str): The misspelled word.
+            limit (int): Maximum number of suggestions.
+            budget (float): Seconds the distance-2 fallback may take; it keeps
+                the candidates found so far once they run out (None for no limit).
+        """
+        if self.lexicon is None:
+            return []
+        key = word.lower()
+        near = edits1(key, self.lexicon.letters)
+        custom = {w for w in near if w in self.custom_words}
+        base = {w for w in near if w in self.lexicon}
+        if not base:
+            deadline = None if budget is None else time.perf_counter() + budget
+            for w1 in near:
+                base.update(w2 for w2 in edits1(w1, self.lexicon.letters) if w2 in self.lexicon)
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+        candidates = (custom | base) - {key}
+        return sorted(candidates, key=lambda w: (-self.score(w), w))[:limit]
+
+    def score(self, word: str) -> float:
+        """Probability-like ranking score of a lowercase candidate word."""
+        base_total = self.lexicon.total_frequency if self.lexicon is not None else 0
+        base = self.lexicon.frequency(word) / base_total if base_total else 0.0
+        if word in self.custom_words:
+            base = max(base, CUSTOM_PRIOR)
+        usage_total = self.usage.total if self.usage is not None else 0
+        if not usage_total:
+            return base
+        return (1 - USAGE_WEIGHT) * base + USAGE_WEIGHT * self.usage.get(word) / usage_total
+
+    def unknown_tokens(self, tokens: List[Token]) -> List[Token]:
+        """Return the tokens that are misspelled."""
+        return [token for token in tokens if not self.is_known(token.word)]
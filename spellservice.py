@@ -0,0 +1,198 @@
+"""
+spellservice.py
+
+Process-wide spellchecking service for the StoryKeeper editors.
+
+One service per dictionary owns everything that does not depend on a
+particular document: the base language lexicon and its verdict cache, the
+grammar caches, learned word usage and the definition and completion
+indexes. Each open editor registers with the service and keeps only its
+per-document state (highlighter, block tallies, viewport).
+
+Whole-document re-checks (after the lexicon loads or the dictionary is
+replaced) are queued here and run on the GUI thread in short time slices,
+the focused editor first and the others round-robin, so many open chapters
+never freeze typing in the one being edited.
+"""
+
+import threading
+import time
+import weakref
+from collections import deque
+from typing import TYPE_CHECKING, Deque, List, Optional, Set
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+import instrumentation
+from brains import BrainSet
+from completion import CompletionIndex
+from db import DictionaryDB
+from definitions import DefinitionService
+from grammar import GrammarEngine
+from spellcheck import SpellCheckEngine, load_base_lexicon
+from usage import UsageModel
+
+if TYPE_CHECKING:
+    from widgets import SpellCheckTextEdit
+
+TIME_SLICE_MS = 8       # GUI time one scheduler tick may spend re-checking blocks
+USAGE_FLUSH_MS = 5000   # throttle for writing learned word usage
+
+
+class SpellCheckService(QObject):
+    """Shared spellcheck state and a fair scheduler for every editor of one dictionary."""
+
+    lexicon_loaded = pyqtSignal(object)   # emitted on the GUI thread once checking is enabled
+    _lexicon_opened = pyqtSignal(object)
+
+    # Keyed by id(db): a service references its database, so a weak-keyed cache would
+    # never let either go. A live service keeps its database (and so its id) alive.
+    _shared: "weakref.WeakValueDictionary[int, SpellCheckService]" = weakref.WeakValueDictionary()
+
+    def __init__(self, brains: BrainSet) -> None:
+        """
+        Build the shared indexes and start loading the base lexicon.
+
+        Args:
+            brains (BrainSet): Layered dictionary all registered editors check against.
+        """
+        super().__init__()
+        self.brains = brains
+        self.db = brains.db
+        self.engine = SpellCheckEngine(None, brains.inflections)
+        self.grammar = GrammarEngine(brains.pos_view)
+        self.usage = UsageModel(self.db)
+        self.engine.set_usage(self.usage)
+        self.definitions = DefinitionService(brains)
+        self.completions = CompletionIndex(brains.view)
+        self.time_slice_ms = TIME_SLICE_MS
+        self.editors: List["SpellCheckTextEdit"] = []
+        self.focused: Optional["SpellCheckTextEdit"] = None
+        self._pending: Deque["SpellCheckTextEdit"] = deque()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.process_pending)
+        self.usage_timer = QTimer(self)
+        self.usage_timer.setSingleShot(True)
+        self.usage_timer.setInterval(USAGE_FLUSH_MS)
+        self.usage_timer.timeout.connect(self.save_usage)
+        brains.subscribe(self._on_dictionary_changed)
+        self._lexicon_opened.connect(self._enable_lexicon)
+        threading.Thread(target=self._load_lexicon, name="spellcheck-lexicon", daemon=True).start()
+
+    @classmethod
+    def for_db(cls, db: DictionaryDB, brains: Optional[BrainSet] = None) -> "SpellCheckService":
+        """
+        Return the process-wide service for a database, creating it on first use.
+
+        Args:
+            db (DictionaryDB): The main dictionary.
+            brains (BrainSet): Layered view to use when the service is created
+                (a new ``BrainSet(db)`` when None).
+
+        Raises:
+            ValueError: If the database already has a service built on different brains.
+        """
+        service = cls._shared.get(id(db))
+        if service is None:
+            service = cls(brains if brains is not None else BrainSet(db))
+            cls._shared[id(db)] = service
+        elif brains is not None and brains is not service.brains:
+            raise ValueError("This database already has a spellcheck service using another BrainSet")
+        return service
+
+    def _load_lexicon(self) -> None:
+        """Open the base language lexicon on a worker thread."""
+        lexicon = load_base_lexicon()
+        try:
+            self._lexicon_opened.emit(lexicon)
+        except RuntimeError:
+            pass  # Service was destroyed while the dictionary was loading.
+
+    def _enable_lexicon(self, lexicon) -> None:
+        self.engine.set_lexicon(lexicon)
+        self.brains.set_lexicon(lexicon)
+        for editor in self.editors:
+            self.schedule(editor)
+        self.lexicon_loaded.emit(lexicon)
+
+    # ---------------- Editors ---------------- #
+
+    def register(self, editor: "SpellCheckTextEdit") -> None:
+        """Start serving an editor; it is queued for a full check if the lexicon is ready."""
+        self.editors.append(editor)
+        editor.destroyed.connect(lambda _=None, e=editor: self.unregister(e))
+        if self.engine.ready:
+            self.schedule(editor)
+
+    def unregister(self, editor: "SpellCheckTextEdit") -> None:
+        """Stop serving an editor and drop its queued work."""
+        if editor in self.editors:
+            self.editors.remove(editor)
+        if editor in self._pending:
+            self._pending.remove(editor)
+        if self.focused is editor:
+            self.focused = None
+
+    def set_focused(self, editor: "SpellCheckTextEdit") -> None:
+        """Give an editor's queued work priority over the other documents."""
+        self.focused = editor
+
+    def schedule(self, editor: "SpellCheckTextEdit") -> None:
+        """Queue a whole-document re-check of an editor."""
+        editor.restart_recheck()
+        if editor not in self._pending:
+            self._pending.append(editor)
+        if not self._timer.isActive():
+            self._timer.start(0)
+
+    @property
+    def pending(self) -> int:
+        """Number of editors with a queued re-check."""
+        return len(self._pending)
+
+    def process_pending(self) -> bool:
+        """
+        Spend one time slice on queued re-checks: the focused editor if it has
+        work, otherwise the next editor in round-robin order.
+
+        Returns:
+            bool: True if work remains (another slice is scheduled).
+        """
+        if not self._pending:
+            return False
+        if self.focused in self._pending:
+            editor = self.focused
+        else:
+            editor = self._pending[0]
+        with instrumentation.span("spellcheck.slice"):
+            done = editor.recheck_step(time.perf_counter() + self.time_slice_ms / 1000)
+        self._pending.remove(editor)
+        if not done:
+            self._pending.append(editor)
+        if self._pending:
+            self._timer.start(0)
+        return bool(self._pending)
+
+    def _on_dictionary_changed(self, words: Optional[Set[str]]) -> None:
+        """Update the shared indexes once, then re-check each editor."""
+        self.engine.set_custom_words(self.brains.inflections)
+        self.completions.apply_changes(words, self.brains.view)
+        self.grammar.set_parts_of_speech(self.brains.pos_view)
+        for editor in list(self.editors):
+            if words is None:
+                self.schedule(editor)
+            else:
+                editor.highlight_words(words)
+
+    # ---------------- Usage ---------------- #
+
+    def usage_changed(self) -> None:
+        """Schedule a throttled write of learned word usage."""
+        if self.usage.dirty and not self.usage_timer.isActive():
+            self.usage_timer.start()
+
+    def save_usage(self) -> None:
+        """Write learned word counts to the database."""
+        with instrumentation.span("usage.flush"):
+            self.usage.flush()
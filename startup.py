@@ -0,0 +1,91 @@
+"""
+startup.py
+
+Measures StoryKeeper cold start. Launches ``app.py --startup-report`` under
+``python -X importtime`` and reports time-to-first-paint, time until
+spellchecking is ready and the slowest imports as JSON, so startup cost can
+be tracked across releases.
+
+Usage:
+    python startup.py --runs 5 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+from constants import APP_VERSION
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        list: One dict per imported module with ``module``, ``depth`` (0 for
+        imports not triggered by another timed import), ``self_us`` and
+        ``cumulative_us``, in import order.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        name = module[1:]  # single separator space after the bar
+        imports.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return imports
+
+
+def measure_once(top: int = 15) -> Dict[str, Any]:
+    """Run the GUI once with import timing and return its startup breakdown."""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", APP_SCRIPT, "--startup-report"],
+        capture_output=True, text=True, env=env, timeout=120, check=True,
+    )
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(proc.stderr)
+    top_level = [i for i in imports if i["depth"] == 0]
+    timings["import_total_ms"] = round(sum(i["cumulative_us"] for i in top_level) / 1000, 1)
+    slowest = sorted(top_level, key=lambda i: i["cumulative_us"], reverse=True)[:top]
+    timings["slowest_imports"] = [
+        {"module": i["module"], "cumulative_ms": round(i["cumulative_us"] / 1000, 1)} for i in slowest
+    ]
+    return timings
+
+
+def main(argv: List[str] = None) -> None:
+    """Measure several cold starts and print (or save) the median timings."""
+    parser = argparse.ArgumentParser(description="Measure StoryKeeper cold-start time.")
+    parser.add_argument("--runs", type=int, default=3, help="Number of cold starts to measure.")
+    parser.add_argument("--top", type=int, default=15, help="How many slow imports to list.")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    args = parser.parse_args(argv)
+
+    runs = [measure_once(args.top) for _ in range(args.runs)]
+    report = {"version": APP_VERSION, "runs": args.runs}
+    for key in ("first_paint_ms", "spellcheck_ready_ms", "import_total_ms"):
+        report[key] = statistics.median(run[key] for run in runs)
+    report["slowest_imports"] = runs[-1]["slowest_imports"]
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+stats.py
+
+Incrementally maintained document statistics for the StoryKeeper application.
+Every text block contributes a tally; totals are kept up to date by subtracting
+a block's previous tally and adding its new one, so only changed blocks are
+ever re-examined.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from spellcheck import SpellCheckEngine, Token
+from usage import UsageModel
+
+
+class BlockTally:
+    """Word statistics for a single block of text."""
+
+    __slots__ = ("words", "unknown", "categories")
+
+    def __init__(self, words: Counter, unknown: int = 0, categories: Counter = None) -> None:
+        self.words = words
+        self.unknown = unknown
+        self.categories = categories if categories is not None else Counter()
+
+    @classmethod
+    def from_tokens(cls, tokens: List[Token], engine: SpellCheckEngine) -> "BlockTally":
+        """Build a tally from already tokenized text."""
+        words = Counter(token.word.lower() for token in tokens)
+        unknown = 0
+        categories: Counter = Counter()
+        for word, count in words.items():
+            if not engine.is_known(word):
+                unknown += count
+            for category in engine.categories(word):
+                categories[category] += count
+        return cls(words, unknown, categories)
+
+    @property
+    def total(self) -> int:
+        """Number of words in the block."""
+        return sum(self.words.values())
+
+
+class DocumentStatistics:
+    """Running totals over all block tallies of a document."""
+
+    def __init__(self, usage: Optional[UsageModel] = None, document: Optional[str] = None) -> None:
+        """
+        Initialize empty statistics.
+
+        Args:
+            usage (UsageModel): Optional model that learns from each block's net word changes.
+            document (str): Key the usage model files those changes under.
+        """
+        self.usage = usage
+        self.document = document
+        self._blocks: Dict[int, BlockTally] = {}
+        self.word_count = 0
+        self.unknown_count = 0
+        self.word_counts: Counter = Counter()
+        self.category_counts: Counter = Counter()
+
+    def __len__(self) -> int:
+        """Number of blocks currently tracked."""
+        return len(self._blocks)
+
+    @property
+    def unique_word_count(self) -> int:
+        """Number of distinct (case-insensitive) words."""
+        return len(self.word_counts)
+
+    def update_block(self, key: int, tally: BlockTally) -> None:
+        """Replace the tally recorded for a block."""
+        old = self._forget(key)
+        self._blocks[key] = tally
+        self.word_count += tally.total
+        self.unknown_count += tally.unknown
+        self.word_counts.update(tally.words)
+        self.category_counts.update(tally.categories)
+        if self.usage is not None and (old is None or old.words != tally.words):
+            delta = Counter(tally.words)
+            if old is not None:
+                delta.subtract(old.words)
+            self.usage.apply(delta, self.document)
+
+    def remove_block(self, key: int) -> None:
+        """Forget a block and subtract its tally from the totals."""
+        old = self._forget(key)
+        if old is not None and self.usage is not None:
+            self.usage.apply({word: -count for word, count in old.words.items()}, self.document)
+
+    def _forget(self, key: int) -> Optional[BlockTally]:
+        """Drop a block's tally from the totals and return it."""
+        old = self._blocks.pop(key, None)
+        if old is not None:
+            self.word_count -= old.total
+            self.unknown_count -= old.unknown
+            self._subtract(self.word_counts, old.words)
+            self._subtract(self.category_counts, old.categories)
+        return old
+
+    def retain_blocks(self, keys: Iterable[int]) -> None:
+        """Drop every block whose key is not in ``keys``."""
+        live = set(keys)
+        for key in [k for k in self._blocks if k not in live]:
+            self.remove_block(key)
+
+    def clear(self) -> None:
+        """Reset all statistics."""
+        for key in list(self._blocks):
+            self.remove_block(key)
+
+    def set_document(self, document: Optional[str]) -> None:
+        """
+        Forget the current document's blocks and file later changes under
+        another key. The usage model keeps what the old document taught.
+        """
+        for key in list(self._blocks):
+            self._forget(key)
+        if self.usage is not None:
+            self.usage.close(self.document)
+        self.document = document
+
+    def summary(self) -> str:
+        """Return a one-line description for the status bar."""
+        parts = [
+            f"Words: {self.word_count}",
+            f"Unique: {self.unique_word_count}",
+            f"Unknown: {self.unknown_count}",
+        ]
+        parts += [f"{cat}: {count}" for cat, count in sorted(self.category_counts.items())]
+        return " | ".join(parts)
+
+    @staticmethod
+    def _subtract(totals: Counter, delta: Counter) -> None:
+        for key, count in delta.items():
+            remaining = totals[key] - count
+            if remaining > 0:
+                totals[key] = remaining
+            else:
+                del totals[key]
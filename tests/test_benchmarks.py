@@ -0,0 +1,29 @@
+"""
+test_benchmarks.py
+
+Sanity checks for the synthetic data generators and baseline comparison
+used by the benchmark suite.
+"""
+
+from benchmarks.run import compare
+from benchmarks.synthetic import synthetic_dictionary, synthetic_manuscript
+
+
+def test_synthetic_data_is_deterministic():
+    first = synthetic_dictionary(300, seed=7)
+    assert first == synthetic_dictionary(300, seed=7)
+    assert len(first) == 300
+    assert any(row["sense_number"] > 1 for row in first)
+
+    words = sorted({row["word"] for row in first})
+    text = synthetic_manuscript(2_000, words, misspelling_rate=0.0, custom_rate=0.1, seed=7)
+    assert text == synthetic_manuscript(2_000, words, misspelling_rate=0.0, custom_rate=0.1, seed=7)
+    assert len(text.split()) == 2_000
+    assert any(word in text for word in words)
+
+
+def test_compare_flags_only_slowdowns_over_limit():
+    baseline = {"a": {"seconds": 1.0}, "b": {"seconds": 1.0}, "c": {"seconds": 1.0}}
+    results = {"a": {"seconds": 1.2}, "b": {"seconds": 1.4}, "new": {"seconds": 9.0}}
+    failures = compare(results, baseline, max_slowdown=1.25)
+    assert len(failures) == 1 and failures[0].startswith("b:")
@@ -0,0 +1,137 @@
+"""
+test_brains.py
+
+Tests for per-world brain dictionaries and the layered lexicon view.
+"""
+
+import time
+
+import pytest
+from brains import BrainSet
+from db import DictionaryDB
+
+
+@pytest.fixture
+def brains(tmp_path) -> BrainSet:
+    """Main in-memory DB with two world brains on disk."""
+    db = DictionaryDB(":memory:")
+    db.add_entry("kaneran", "Species", "Noun", "Main meaning.", "Species")
+    brain_set = BrainSet(db, directory=str(tmp_path))
+    for name, category in (("vellis", "Planet"), ("aurora", "Artifact")):
+        world = DictionaryDB(brain_set.create(name))
+        world.add_entry("kaneran", category, "Noun", f"{name} meaning.", category)
+        world.add_entry(f"{name}word", category, "Noun", "Local word.", category)
+        world.conn.close()
+    return brain_set
+
+
+def test_available_and_layered_precedence(brains: BrainSet):
+    assert brains.available() == ["aurora", "vellis"]
+    assert "vellisword" not in brains.view
+
+    view = brains.activate(["vellis", "aurora"])
+    assert view["kaneran"] == ("Planet",)
+    assert "aurorsword" not in view and "auroraword" in view
+    assert brains.source_of("kaneran") == "vellis"
+
+    view = brains.activate(["aurora", "vellis"])
+    assert view["kaneran"] == ("Artifact",)
+
+    view = brains.activate([])
+    assert view["kaneran"] == ("Species",)
+    assert brains.source_of("vellisword") is None
+
+
+def test_switching_reuses_loaded_indexes(brains: BrainSet):
+    brains.activate(["vellis", "aurora"])
+    vellis = brains.load("vellis").words
+    start = time.perf_counter()
+    for _ in range(20):
+        brains.activate(["aurora"])
+        brains.activate(["vellis", "aurora"])
+    assert (time.perf_counter() - start) / 40 < 0.1
+    assert brains.load("vellis").words is vellis
+
+
+def test_main_layer_updates_incrementally(brains: BrainSet):
+    changes = []
+    brains.subscribe(changes.append)
+    brains.activate(["vellis"])
+    brains.db.add_entry("zorani", "Culture", "Noun", "A culture.", "Culture")
+    assert brains.view["zorani"] == ("Culture",)
+    brains.db.delete_entry("zorani")
+    assert "zorani" not in brains.view
+    forms = {"zorani", "zoranis", "zorani's", "zorani’s"}
+    assert changes == [None, forms, forms]
+    assert "zoranis" not in brains.inflections
+
+
+def test_restore_and_unload(brains: BrainSet):
+    brains.activate(["aurora"])
+    restored = BrainSet(brains.db, directory=brains.directory)
+    assert restored.active == []
+    restored.restore()
+    assert restored.active == ["aurora"]
+
+    brains.unload("aurora")
+    assert brains.active == []
+    assert "auroraword" not in brains.view
+
+
+def test_world_names_and_schemas(tmp_path):
+    db = DictionaryDB(":memory:")
+    brains = BrainSet(db, directory=str(tmp_path / "worlds"))
+    for bad in ("../escape", "a/b", ".hidden", ""):
+        with pytest.raises(ValueError):
+            brains.create(bad)
+    for name, word in (("a-b", "dashword"), ("a b", "spaceword")):
+        world = DictionaryDB(brains.create(name))
+        world.add_entry(word, "General", "Noun", "", "")
+        world.conn.close()
+    assert "dashword" in brains.load("a-b").words
+    assert "spaceword" in brains.load("a b").words
+    assert brains.load("a-b").schema != brains.load("a b").schema
+
+
+def test_attach_limit_is_reported(tmp_path):
+    brains = BrainSet(DictionaryDB(":memory:"), directory=str(tmp_path))
+    with pytest.raises(RuntimeError, match="unload another world"):
+        for i in range(20):
+            brains.create(f"world{i}")
+            brains.load(f"world{i}")
+
+
+def test_switching_large_brains_does_not_re_expand_forms(tmp_path):
+    db = DictionaryDB(":memory:")
+    brains = BrainSet(db, directory=str(tmp_path))
+    for name in ("a", "b", "c"):
+        world = DictionaryDB(brains.create(name))
+        world.import_dictionary([{"word": f"{name}word{i}", "category": "Species", "part_of_speech": "Noun",
+                                  "definition": "", "context_hint": ""} for i in range(50000)])
+        world.conn.close()
+        brains.load(name)
+    start = time.perf_counter()
+    for names in (["a"], ["b", "c"], ["a", "b", "c"], []):
+        brains.activate(names)
+    assert (time.perf_counter() - start) / 4 < 0.1
+    brains.activate(["c", "a"])
+    assert brains.inflections.get("cword7s") == ("Species",)
+    assert brains.inflections.lemma("aword12's") == "aword12"
+    assert "bword3s" not in brains.inflections
+
+
+def test_new_words_go_to_the_highest_precedence_world(brains: BrainSet):
+    assert brains.target() is brains.db
+    changes = []
+    brains.subscribe(changes.append)
+    brains.activate(["vellis", "aurora"])
+    brains.target().add_entry("zorani", "Culture", "Noun", "A culture.", "Culture")
+    assert brains.source_of("zorani") == "vellis"
+    assert brains.inflections.get("zoranis") == ("Culture",)
+    assert "zorani" in changes[-1] and "zorani" not in brains.main_words
+
+    brains.unload("vellis")
+    world = DictionaryDB(brains.path_for("vellis"))
+    assert "zorani" in world.get_word_categories()
+    world.conn.close()
+    assert brains.target() is brains.load("aurora").db
@@ -0,0 +1,55 @@
+"""
+test_cli.py
+
+Tests for the headless batch spellcheck command line.
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from cli import build_lexicon, collect_files, main, run
+from db import DictionaryDB
+
+
+def test_import_does_not_load_qt():
+    code = "import sys, cli; print(any(m.startswith('PyQt6') for m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_run_streams_json_lines(tmp_path):
+    (tmp_path / "ch1.txt").write_text("The kaneran ship\nlanded on Vellis qwzx\n", encoding="utf-8")
+    (tmp_path / "ch2.txt").write_text("All is wel.\n", encoding="utf-8")
+    (tmp_path / "notes.bin").write_text("ignored zzzq\n", encoding="utf-8")
+
+    files = collect_files([str(tmp_path)], (".txt",))
+    assert len(files) == 2
+
+    db_file = str(tmp_path / "brain.db")
+    DictionaryDB(db_file).add_entry("kaneran", "Species", "Noun", "An alien species.", "Species")
+    lexicon_path = build_lexicon(db_file, directory=str(tmp_path / "lexicons"))
+
+    out = io.StringIO()
+    found = run(files, lexicon_path, jobs=2, out=out)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert found == len(records)
+    words = {(r["word"], r["line"], r["column"]) for r in records}
+    assert ("Vellis", 2, 11) in words
+    assert ("qwzx", 2, 18) in words
+    assert ("wel", 1, 8) in words
+    assert not any(r["word"] == "kaneran" for r in records)
+    wel = next(r for r in records if r["word"] == "wel")
+    assert "well" in wel["suggestions"]
+
+
+def test_missing_database_is_an_error(tmp_path, capsys):
+    missing = str(tmp_path / "typo.db")
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--db", missing, str(tmp_path)])
+    assert exit_info.value.code == 2
+    assert "not found" in capsys.readouterr().err
+    assert not os.path.exists(missing)
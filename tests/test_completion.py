@@ -0,0 +1,42 @@
+"""
+test_completion.py
+
+Tests for ranked prefix completion over custom words.
+"""
+
+from collections import Counter
+
+from completion import CompletionIndex, match_case
+
+
+def test_prefix_matches_ranked_by_manuscript_usage():
+    index = CompletionIndex(["kaneran", "kanerath", "kanos", "vellis", "kan"])
+    assert index.complete("kane") == ["kaneran", "kanerath"]
+    assert index.complete("kan", limit=3) == ["kan", "kaneran", "kanerath"]
+
+    usage = Counter({"kanos": 5, "kanerath": 2, "vellis": 9})
+    assert index.complete("kan", usage) == ["kanos", "kanerath", "kan", "kaneran"]
+    assert index.complete("kan", usage, limit=2) == ["kanos", "kanerath"]
+    assert index.complete("zzz", usage) == []
+
+
+def test_completions_follow_typed_capitalization():
+    index = CompletionIndex(["kaneran"])
+    assert index.complete("Kan") == ["Kaneran"]
+    assert index.complete("KAN") == ["KANERAN"]
+    assert match_case("k", "kaneran") == "kaneran"
+
+
+def test_incremental_updates():
+    vocabulary = {"kaneran": ("Species",)}
+    index = CompletionIndex(vocabulary)
+    vocabulary["kanos"] = ("Place",)
+    index.apply_changes({"kanos"}, vocabulary)
+    assert index.complete("kan") == ["kaneran", "kanos"]
+
+    del vocabulary["kaneran"]
+    index.apply_changes({"kaneran"}, vocabulary)
+    assert "kaneran" not in index and len(index) == 1
+
+    index.apply_changes(None, {"vellis": ()})
+    assert index.complete("vel") == ["vellis"] and len(index) == 1
@@ -6,7 +6,7 @@ Ensures multi-meaning (sense_number) support works as expected.
 """
 
 import pytest
-from db import DictionaryDB
+from db import DictionaryDB, SCHEMA_VERSION
 
 
 @pytest.fixture
@@ -25,6 +25,15 @@ def test_create_tables(db: DictionaryDB):
     assert "settings" in tables
 
 
+def test_schema_setup_skipped_when_current(tmp_path):
+    """Test that reopening an up-to-date database skips setup work."""
+    path = str(tmp_path / "brain.db")
+    DictionaryDB(path).delete_context("Species")
+    reopened = DictionaryDB(path)
+    assert reopened.schema_version() == SCHEMA_VERSION
+    assert "Species" not in reopened.get_contexts()
+
+
 def test_add_and_get_single_entry(db: DictionaryDB):
     """Test adding and retrieving a single entry."""
     db.add_entry("kaneran", "Species", "Noun", "An alien species.", "Sci-fi context", 1)
@@ -106,3 +115,118 @@ def test_export_and_import_dictionary(db: DictionaryDB):
     new_db.import_dictionary(exported, mode="merge")
     results = new_db.get_all_entries()
     assert len(results) == 2
+
+
+def test_rename_context_updates_entries(db: DictionaryDB):
+    """Test that renaming a context renames the hint of every entry using it."""
+    db.add_entry("kaneran", "Species", "Noun", "An alien species.", "Species")
+    db.rename_context("Species", "Race")
+    assert db.get_all_entries()[0][4] == "Race"
+    assert "Race" in db.get_contexts()
+
+    db.rename_context("Race", "Planet")  # merges into an existing context
+    assert db.get_all_entries()[0][4] == "Planet"
+    assert "Race" not in db.get_contexts()
+
+
+def test_delete_context_keeps_entry_hints(db: DictionaryDB):
+    """Test that deleting a listed context leaves entries that use it intact."""
+    db.add_entry("kaneran", "Species", "Noun", "An alien species.", "Species")
+    db.delete_context("Species")
+    assert "Species" not in db.get_contexts()
+    assert db.get_all_entries()[0][4] == "Species"
+
+
+def test_rename_category_and_counts(db: DictionaryDB):
+    """Test category renames and per-category counts."""
+    db.add_entry("kaneran", "Species", "Noun", "An alien species.", "")
+    db.add_entry("velis", "Places", "Noun", "A moon.", "")
+    db.rename_category("Species", "Peoples")
+    assert db.get_word_categories() == {"kaneran": ("Peoples",), "velis": ("Places",)}
+    assert db.get_category_counts() == {"Peoples": 1, "Places": 1}
+
+
+def test_category_merge_keeps_colliding_senses(db: DictionaryDB):
+    """Test that merging into an existing category renumbers senses instead of replacing them."""
+    db.add_entry("kaneran", "Species", "Noun", "An alien species.", "")
+    db.add_entry("kaneran", "Peoples", "Noun", "A people of Vellis.", "")
+    db.rename_category("Species", "Peoples")
+    assert [(e[1], e[3], e[5]) for e in db.get_all_entries()] == [
+        ("Peoples", "A people of Vellis.", 1), ("Peoples", "An alien species.", 2)]
+    assert "Species" not in db.get_categories()
+
+
+def test_legacy_schema_is_normalized(tmp_path):
+    """Test that a version 2 database with text categories and hints is migrated."""
+    import sqlite3
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE contexts (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE);
+        CREATE TABLE dictionary (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, word TEXT, category TEXT DEFAULT 'General',
+            part_of_speech TEXT, definition TEXT, context_hint TEXT DEFAULT '',
+            sense_number INTEGER DEFAULT 1, UNIQUE(word, category, part_of_speech, sense_number));
+        INSERT INTO contexts (name) VALUES ('Species');
+        INSERT INTO dictionary (word, category, part_of_speech, definition, context_hint)
+        VALUES ('kaneran', 'Species', 'Noun', 'An alien species.', 'Species'),
+               ('velis', NULL, 'Noun', 'A moon.', 'Moons');
+        PRAGMA user_version = 2;
+    """)
+    conn.close()
+
+    db = DictionaryDB(path)
+    assert db.schema_version() == SCHEMA_VERSION
+    assert db.get_all_entries() == [
+        ("kaneran", "Species", "Noun", "An alien species.", "Species", 1),
+        ("velis", "General", "Noun", "A moon.", "Moons", 1),
+    ]
+    assert db.get_contexts() == ["Species"]
+    view = db.conn.execute("SELECT word, category, context_hint FROM dictionary_entries ORDER BY word")
+    assert view.fetchall() == [("kaneran", "Species", "Species"), ("velis", "General", "Moons")]
+
+
+def test_migration_keeps_rows_that_collide_once_normalized(tmp_path):
+    """Test that NULL and 'General' category rows both survive normalization."""
+    import sqlite3
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE contexts (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE);
+        CREATE TABLE dictionary (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, word TEXT, category TEXT DEFAULT 'General',
+            part_of_speech TEXT, definition TEXT, context_hint TEXT DEFAULT '',
+            sense_number INTEGER DEFAULT 1, UNIQUE(word, category, part_of_speech, sense_number));
+        INSERT INTO dictionary (word, category, part_of_speech, definition, sense_number)
+        VALUES ('velis', NULL, 'Noun', 'A moon.', 1),
+               ('velis', 'General', 'Noun', 'A river.', 1),
+               ('velis', 'General', 'Noun', 'A song.', 2);
+        PRAGMA user_version = 3;
+    """)
+    conn.close()
+
+    db = DictionaryDB(path)
+    assert db.schema_version() == SCHEMA_VERSION
+    assert sorted(db.get_all_entries()) == [
+        ("velis", "General", "Noun", "A moon.", "", 1),
+        ("velis", "General", "Noun", "A river.", "", 2),
+        ("velis", "General", "Noun", "A song.", "", 3),
+    ]
+    tables = {row[0] for row in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "dictionary_legacy" not in tables
+
+
+def test_files_use_incremental_vacuum_and_wal(tmp_path):
+    """Test that new and migrated files are set up for background maintenance."""
+    import sqlite3
+    legacy = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(legacy)
+    conn.executescript("CREATE TABLE contexts (id INTEGER PRIMARY KEY, name TEXT UNIQUE); PRAGMA user_version = 3;")
+    conn.close()
+    for path, auto_vacuum in ((str(tmp_path / "new.db"), 2), (legacy, 0)):
+        db = DictionaryDB(path)
+        assert db.path() == path
+        # Older files are converted by the maintenance scheduler, not on open.
+        assert db.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == auto_vacuum
+        assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert DictionaryDB(":memory:").path() == ""
@@ -0,0 +1,68 @@
+"""
+test_definitions.py
+
+Tests for the batched, cached definition lookups behind hover tooltips.
+"""
+
+import pytest
+from brains import BrainSet
+from db import DictionaryDB
+from definitions import DefinitionService, Sense, format_tooltip
+
+
+@pytest.fixture
+def service(tmp_path) -> DefinitionService:
+    db = DictionaryDB(":memory:")
+    db.add_multiple_entries("kaneran", "Species", [("Noun", "A people.", "Species", 1),
+                                                   ("Verb", "To wander.", "", 2)])
+    db.add_entry("vellis", "Planet", "Noun", "A world.", "Planet")
+    return DefinitionService(BrainSet(db, directory=str(tmp_path)), capacity=3)
+
+
+def test_prefetch_batches_and_hover_reads_cache_only(service: DefinitionService):
+    assert service.get("kaneran") is None
+    assert service.prefetch(["Kaneran", "vellis", "the", "kaneran"]) == 2
+    assert service.queries == 1
+
+    assert service.get("KANERAN") == (Sense("Noun", "A people.", "Species", 1),
+                                      Sense("Verb", "To wander.", "", 2))
+    assert service.prefetch(["vellis"]) == 0 and service.queries == 1
+    assert "<b>Kaneran</b>" in format_tooltip("Kaneran", service.get("kaneran"))
+
+
+def test_dictionary_changes_invalidate_entries(service: DefinitionService):
+    db = service.brains.db
+    service.prefetch(["kaneran", "vellis"])
+    db.add_entry("vellis", "Planet", "Noun", "A second world.", "Planet", 2)
+    assert service.get("vellis") is None and service.get("kaneran") is not None
+
+    service.prefetch(["vellis"])
+    assert [s.definition for s in service.get("vellis")] == ["A world.", "A second world."]
+
+    db.import_dictionary([], mode="merge")
+    assert len(service) == 0
+
+
+def test_least_recently_used_words_are_evicted(service: DefinitionService):
+    db = service.brains.db
+    for word in ("aurora", "dragon"):
+        db.add_entry(word, "General", "Noun", "Thing.", "")
+    for word in ("kaneran", "vellis", "aurora"):
+        service.prefetch([word])
+    service.get("kaneran")
+    service.prefetch(["dragon"])
+    assert service.get("vellis") is None
+    assert service.get("kaneran") is not None
+
+
+def test_active_brain_definitions_take_precedence(service: DefinitionService):
+    brains = service.brains
+    world = DictionaryDB(brains.create("aurora"))
+    world.add_entry("kaneran", "Species", "Noun", "Aurora's kaneran.", "")
+    world.conn.close()
+    brains.activate(["aurora"])
+
+    service.prefetch(["kaneran", "vellis"])
+    assert service.queries == 2
+    assert service.get("kaneran")[0].definition == "Aurora's kaneran."
+    assert service.get("vellis")[0].definition == "A world."
@@ -40,3 +40,16 @@ def test_multipos_dialog_add_entry(app, qtbot, db):
 
     assert dialog.entries[0] == ("Noun", "A test definition.", "Test Context", 1)
     dialog.close()
+
+
+def test_multipos_dialog_warns_about_similar_words(app, qtbot, db):
+    """The add dialog lists existing near-duplicate spellings."""
+    db.add_entry("kaneran", "Species", "Noun", "A people.", "Species")
+    dialog = MultiPOSDialog("Kanneran", db)
+    qtbot.addWidget(dialog)
+    assert dialog.similar_words == ["kaneran"]
+    assert "kaneran" in dialog.similar_label.text()
+
+    other = MultiPOSDialog("dragon", db)
+    qtbot.addWidget(other)
+    assert other.similar_words == [] and other.similar_label.isHidden()
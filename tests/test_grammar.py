@@ -0,0 +1,58 @@
+"""
+test_grammar.py
+
+Unit tests for the incremental rule-based GrammarEngine.
+"""
+
+from grammar import GrammarEngine, split_sentences
+
+
+def rules_found(engine, text):
+    return [(issue.rule, text[issue.start:issue.start + issue.length]) for issue in engine.check_block(text)]
+
+
+def test_split_sentences_keeps_abbreviations():
+    text = "Mr. Vell arrived. Was it late? yes!"
+    assert split_sentences(text) == [(0, "Mr. Vell arrived."), (18, "Was it late?"), (31, "yes!")]
+
+
+def test_initialisms_and_quoted_periods_do_not_end_sentences():
+    engine = GrammarEngine()
+    assert rules_found(engine, "The U.S. army landed.") == []
+    assert rules_found(engine, 'He said "no." then left.') == []
+    assert split_sentences('He said "no." Then he left.') == [(0, 'He said "no."'), (14, "Then he left.")]
+    assert rules_found(engine, 'He said "no." then left. it rained.') == [("capitalization", "i")]
+
+
+def test_core_rules():
+    engine = GrammarEngine()
+    assert rules_found(engine, "The ship landed on the the moon.") == [("repeated-word", "the")]
+    assert rules_found(engine, "It took a hour and an ship.") == [("a-an", "a"), ("a-an", "an")]
+    assert rules_found(engine, "She saw an honest man and a unicorn.") == []
+    assert rules_found(engine, "An unidentified ship, an unimportant detail, a uniform and a unit.") == []
+    assert rules_found(engine, "It was a unimportant detail.") == [("a-an", "a")]
+    assert rules_found(engine, "It rained. then it stopped.") == [("capitalization", "t")]
+
+
+def test_dictionary_aware_rules():
+    engine = GrammarEngine({"skarn": ("Verb",), "vellish": ("Adjective",), "kaneran": ("Noun", "Verb")})
+    assert rules_found(engine, "The skarn was loud.") == [("pos-after-article", "skarn")]
+    assert rules_found(engine, "She met a vellish.") == [("adjective-without-noun", "vellish")]
+    assert rules_found(engine, "A vellish ship and a kaneran.") == []
+
+    engine.set_parts_of_speech({})
+    assert rules_found(engine, "The skarn was loud.") == []
+
+
+def test_only_edited_sentence_is_reevaluated():
+    engine = GrammarEngine()
+    engine.check_block("One sentence here. Another one there. A third.")
+    assert engine.sentences_evaluated == 3
+
+    issues = engine.check_block("One sentence here. Another one one there. A third.")
+    assert engine.sentences_evaluated == 4
+    assert [i.rule for i in issues] == ["repeated-word"]
+    assert issues[0].start == len("One sentence here. Another one ")
+
+    engine.check_block("One sentence here. Another one one there. A third.")
+    assert engine.sentences_evaluated == 4
@@ -0,0 +1,69 @@
+"""
+test_inflections.py
+
+Tests for inflected forms of custom words and their surface -> lemma index.
+"""
+
+from brains import BrainSet
+from db import DictionaryDB
+from inflections import InflectionIndex, inflect
+from spellcheck import SpellCheckEngine
+from workspace import DBChapterStore, Workspace
+
+
+def test_forms_follow_part_of_speech():
+    assert inflect("kaneran", ("Noun",)) == {"kaneran", "kanerans", "kaneran's", "kaneran’s"}
+    assert {"zorify", "zorifies", "zorified", "zorifying"} <= inflect("zorify", ("Verb",))
+    assert {"vorat", "vorated", "voratted", "vorating", "voratting"} <= inflect("vorat", ("Verb",))
+    assert {"glimmer", "glimmerer", "glimmerest"} <= inflect("glimmer", ("Adjective",))
+    assert {"vale", "valer", "valest"} <= inflect("vale", ("Adjective",))
+    assert "velises" in inflect("velis", ("Noun",))
+
+    lexicon = {"sky", "tree", "born", "vel"}
+    assert inflect("sky-tree", ("Noun",), lexicon) == {"sky-tree"}
+    assert inflect("vel-tarrin", ("Noun",), lexicon) == {"vel-tarrin", "tarrin", "tarrins", "tarrin's", "tarrin’s"}
+    assert inflect("vel-tarrin", ("Noun",)) == {"vel-tarrin"}  # no parts before the lexicon loads
+
+
+def test_index_maps_forms_to_lemma_categories():
+    vocabulary = {"kaneran": ("Species",), "kanerans": ("Culture",)}
+    index = InflectionIndex(vocabulary, {"kaneran": ("Noun",), "kanerans": ("Noun",)})
+    assert index.lemma("Kaneran’s") == "kaneran"
+    assert index["kanerans"] == ("Culture",)  # a word's own entry beats another word's plural
+    assert index.get("missing") is None
+
+    del vocabulary["kanerans"]
+    assert index.update({"kanerans"}) >= {"kanerans", "kanerans's"}
+    assert index["kanerans"] == ("Species",)
+
+    engine = SpellCheckEngine(set(), index)
+    assert engine.is_known("Kanerans") and engine.categories("kaneran's") == ("Species",)
+    assert not engine.is_known("kaneranz")
+
+
+def test_only_invented_parts_of_compounds_are_registered():
+    vocabulary = {"kaneran-born": ("Culture",)}
+    index = InflectionIndex(vocabulary, {"kaneran-born": ("Adjective",)})
+    assert "kaneran" not in index
+    assert index.set_lexicon({"born"}) >= {"kaneran"}
+    assert index.get("kaneran") == ("Culture",)
+    assert index.get("born") is None and "born's" not in index
+
+
+def test_dictionary_changes_update_forms(tmp_path):
+    db = DictionaryDB(":memory:")
+    brains = BrainSet(db, directory=str(tmp_path))
+    db.add_entry("kaneran", "Species", "Noun", "A species.", "Species")
+    assert "kanerans" in brains.inflections
+    db.delete_entry("kaneran")
+    assert "kanerans" not in brains.inflections
+
+
+def test_occurrences_count_inflected_forms():
+    db = DictionaryDB(":memory:")
+    brains = BrainSet(db)
+    db.add_entry("kaneran", "Species", "Noun", "A species.", "Species")
+    workspace = Workspace(DBChapterStore(db))
+    key = workspace.add_chapter("One", "The Kanerans met a kaneran's envoy, Kaneran-born.")
+    assert workspace.occurrences("kaneran") == [(key, 1)]
+    assert workspace.occurrences("Kanerans", brains.inflections) == [(key, 3)]
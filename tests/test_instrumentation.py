@@ -0,0 +1,62 @@
+"""
+test_instrumentation.py
+
+Tests for hot-path spans, counters, DB query tracing and trace export.
+"""
+
+import json
+
+import pytest
+import instrumentation
+from db import DictionaryDB
+
+
+@pytest.fixture
+def tracing():
+    """Enable instrumentation with tracing for one test, then restore the default."""
+    instrumentation.reset()
+    instrumentation.enable(trace=True)
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disabled_spans_record_nothing():
+    instrumentation.reset()
+    assert instrumentation.span("noop") is instrumentation.NULL_SPAN
+    with instrumentation.span("noop"):
+        pass
+    instrumentation.count("noop")
+    assert instrumentation.snapshot() == []
+    assert instrumentation.counters() == {}
+
+
+def test_spans_and_counters(tracing):
+    for _ in range(3):
+        with instrumentation.span("work", size=1):
+            pass
+
+    @instrumentation.timed("decorated")
+    def add(a, b):
+        return a + b
+
+    assert add(2, 3) == 5
+    instrumentation.count("hits", 2)
+    rows = {row[0]: row for row in instrumentation.snapshot()}
+    assert rows["work"][1] == 3
+    assert rows["decorated"][1] == 1
+    assert rows["work"][2] <= rows["work"][3] <= rows["work"][4]
+    assert instrumentation.counters() == {"hits": 2}
+
+
+def test_db_queries_are_traced_with_rows(tracing, tmp_path):
+    db = DictionaryDB(":memory:")
+    db.add_entry("kaneran", "Species", "Noun", "An alien species.", "Species")
+    db.get_all_entries()
+
+    path = tmp_path / "trace.json"
+    instrumentation.dump_trace(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+    selects = [e for e in events if e["name"] == "db.query" and "FROM dictionary ORDER BY" in e["args"]["sql"]]
+    assert selects and selects[-1]["args"]["rows"] == 1
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in selects)
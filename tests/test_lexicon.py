@@ -0,0 +1,55 @@
+"""
+test_lexicon.py
+
+Tests for compiling and reading memory-mapped lexicon files.
+"""
+
+import os
+
+from lexicon import Lexicon, LexiconSource, ensure_lexicon
+
+
+def make_source(entries, tag="v1"):
+    return LexiconSource(f"test:{tag}", lambda: entries)
+
+
+def test_lookup_and_frequency(tmp_path):
+    path = str(tmp_path / "words.sklx")
+    lexicon = ensure_lexicon(path, [make_source([("ship", 40), ("Kaneran", 2), ("café", 7), ("ship", 3)])])
+    assert len(lexicon) == 3
+    assert "ship" in lexicon
+    assert "kaneran" in lexicon
+    assert "café" in lexicon
+    assert "shi" not in lexicon
+    assert lexicon.frequency("ship") == 40
+    assert lexicon.frequency("missing") == 0
+    assert list(lexicon) == sorted(["ship", "kaneran", "café"], key=lambda w: w.encode("utf-8"))
+    assert set("shipkaneracfé") == set(lexicon.letters)
+    lexicon.close()
+
+
+def test_recompiles_only_when_sources_change(tmp_path):
+    path = str(tmp_path / "words.sklx")
+    ensure_lexicon(path, [make_source([("ship", 1)])]).close()
+    mtime = os.stat(path).st_mtime_ns
+
+    def fail():
+        raise AssertionError("unchanged sources must not be reloaded")
+
+    reopened = ensure_lexicon(path, [LexiconSource("test:v1", fail)])
+    assert "ship" in reopened
+    reopened.close()
+    assert os.stat(path).st_mtime_ns == mtime
+
+    changed = ensure_lexicon(path, [make_source([("boat", 1)], tag="v2")])
+    assert "boat" in changed and "ship" not in changed
+    changed.close()
+
+
+def test_empty_lexicon(tmp_path):
+    lexicon = ensure_lexicon(str(tmp_path / "empty.sklx"), [make_source([])])
+    assert len(lexicon) == 0
+    reopened = Lexicon(lexicon.path)
+    assert "anything" not in reopened
+    reopened.close()
+    lexicon.close()
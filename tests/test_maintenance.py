@@ -0,0 +1,77 @@
+"""
+test_maintenance.py
+
+Tests for idle-time database maintenance.
+"""
+
+import pytest
+from PyQt6.QtWidgets import QApplication
+from benchmarks.synthetic import synthetic_dictionary
+from db import DictionaryDB
+from maintenance import TASKS, DatabaseMaintenance, MaintenanceScheduler
+
+
+@pytest.fixture(scope="session")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def fragmented(tmp_path) -> DictionaryDB:
+    db = DictionaryDB(str(tmp_path / "dictionary.db"))
+    rows = synthetic_dictionary(3_000, 0)
+    db.import_dictionary(rows)
+    db.import_dictionary(rows[:100], mode="replace")
+    assert db.conn.execute("PRAGMA freelist_count").fetchone()[0] > 0
+    return db
+
+
+def test_due_tasks_run_once_and_are_remembered(fragmented: DictionaryDB):
+    runner = DatabaseMaintenance(fragmented.path())
+    records = []
+    while (record := runner.run_next()) is not None:
+        records.append(record)
+    assert [r.task for r in records] == [task for task, _ in TASKS]
+    assert all(r.outcome == "ok" for r in records)
+    assert fragmented.conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    assert fragmented.conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] > 0
+    runner.close()
+
+    reopened = DatabaseMaintenance(fragmented.path())
+    assert reopened.due() == []
+    assert reopened.due(now=records[0].started + 7200) == ["optimize", "vacuum", "checkpoint"]
+
+
+def test_older_files_are_converted_in_the_background(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("CREATE TABLE contexts (id INTEGER PRIMARY KEY, name TEXT UNIQUE); PRAGMA user_version = 3;")
+    conn.close()
+    db = DictionaryDB(path)
+    assert db.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+
+    runner = DatabaseMaintenance(path)
+    assert runner.run_next().task == "optimize"
+    record = runner.run_next()
+    assert (record.task, record.outcome) == ("vacuum", "ok")
+    assert sqlite3.connect(path).execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    runner.close()
+
+
+def test_steps_stop_at_their_deadline(fragmented: DictionaryDB):
+    runner = DatabaseMaintenance(fragmented.path(), step_ms=0)
+    record = runner.run_next()
+    assert (record.task, record.outcome) == ("optimize", "interrupted")
+    assert runner.due()[0] == "optimize"  # retried later, with a larger budget
+    assert runner._budget_ms["optimize"] > 0
+
+
+def test_scheduler_runs_when_idle(app, qtbot, fragmented: DictionaryDB):
+    scheduler = MaintenanceScheduler(fragmented, idle_ms=10)
+    qtbot.waitUntil(lambda: len(scheduler.history) == len(TASKS), timeout=5000)
+    scheduler.user_active()
+    assert scheduler._idle_timer.isActive()
+    scheduler.shutdown()
+
+    assert MaintenanceScheduler(DictionaryDB(":memory:")).maintenance is None
@@ -0,0 +1,88 @@
+"""
+test_similarity.py
+
+Tests for edit distance, the similar-word index and duplicate clustering.
+"""
+
+import gc
+import random
+import weakref
+
+from db import DictionaryDB
+from similarity import SimilarWordIndex, find_duplicate_clusters, levenshtein
+
+
+def naive_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def random_words(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [''.join(rng.choice("aekrn") for _ in range(rng.randint(0, 9))) for _ in range(count)]
+
+
+def test_levenshtein_matches_dynamic_programming():
+    words = random_words(400)
+    for a, b in zip(words, reversed(words)):
+        assert levenshtein(a, b) == naive_distance(a, b)
+    assert levenshtein("kitten", "sitting") == 3
+
+
+def test_index_search_matches_brute_force():
+    words = sorted(set(random_words(1500, seed=1)) - {""})
+    index = SimilarWordIndex(words)
+    for query in random_words(60, seed=2):
+        for k in (1, 2):
+            expected = sorted((naive_distance(query, w), w) for w in words if naive_distance(query, w) <= k)
+            assert index.search(query, k) == expected
+
+
+def test_index_tracks_dictionary_changes():
+    db = DictionaryDB(":memory:")
+    db.add_entry("kaneran", "Species", "Noun", "A people.", "Species")
+    index = SimilarWordIndex.for_db(db)
+    assert SimilarWordIndex.for_db(db) is index
+
+    assert index.similar("Kanneran") == [(1, "kaneran")]
+    assert index.similar("kaneran") == []
+
+    db.add_entry("kaneren", "Species", "Noun", "Variant.", "Species")
+    assert [w for _, w in index.similar("kanneran")] == ["kaneran", "kaneren"]
+
+    db.delete_entry("kaneran")
+    assert "kaneran" not in index
+    assert index.similar("kanneran") == [(2, "kaneren")]
+
+    db.import_dictionary([{"word": "Vellis", "category": "Planet", "part_of_speech": "Noun",
+                           "definition": "A world.", "context_hint": "", "sense_number": 1}],
+                         mode="replace")
+    assert len(index) == 1 and index.similar("velis") == [(1, "vellis")]
+
+
+def test_shared_index_does_not_keep_its_database_alive():
+    db = DictionaryDB(":memory:")
+    index = weakref.ref(SimilarWordIndex.for_db(db))
+    db.conn.close()
+    del db
+    gc.collect()
+    assert index() is None
+
+
+def test_find_duplicate_clusters():
+    words = ["kaneran", "kanneran", "kaneren", "vellis", "velis", "aurora", "dragon"]
+    assert find_duplicate_clusters(words) == [["kaneran", "kaneren", "kanneran"], ["velis", "vellis"]]
+    assert find_duplicate_clusters(["aurora", "dragon"]) == []
+
+    words = sorted(set(random_words(800, seed=3)))
+    clusters = find_duplicate_clusters(words, max_distance=2)
+    grouped = {w: i for i, cluster in enumerate(clusters) for w in cluster}
+    for a in words:
+        for b in words:
+            if a < b and naive_distance(a, b) <= 2:
+                assert a in grouped and grouped[a] == grouped.get(b)
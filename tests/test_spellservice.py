@@ -0,0 +1,86 @@
+"""
+test_spellservice.py
+
+Tests for the process-wide spellcheck service shared by open editors.
+"""
+
+import gc
+import weakref
+
+import pytest
+from brains import BrainSet
+from PyQt6.QtWidgets import QApplication
+from db import DictionaryDB
+from spellservice import SpellCheckService
+from widgets import SpellCheckTextEdit
+
+
+@pytest.fixture(scope="session")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def db():
+    return DictionaryDB(":memory:")
+
+
+def test_editors_share_one_service(app, qtbot, db):
+    first, second = SpellCheckTextEdit(db), SpellCheckTextEdit(db)
+    qtbot.addWidget(first)
+    qtbot.addWidget(second)
+    assert first.service is second.service is SpellCheckService.for_db(db)
+    assert first.engine is second.engine and first.usage is second.usage
+    assert first.completions is second.completions and first.definitions is second.definitions
+    assert first.statistics is not second.statistics
+    assert first.service.editors == [first, second]
+
+
+def test_focused_editor_is_rechecked_first(app, qtbot, db):
+    editors = [SpellCheckTextEdit(db) for _ in range(3)]
+    for editor in editors:
+        qtbot.addWidget(editor)
+        editor.setPlainText("line\n" * 3)
+    service = editors[0].service
+    service.time_slice_ms = 0  # one block per slice
+    service.set_focused(editors[2])
+    for editor in editors:
+        service.schedule(editor)
+
+    order = []
+    while service.process_pending():
+        order.append([e._recheck_from for e in editors])
+    # Four blocks each: the focused editor finishes first, then the others alternate.
+    assert order[:4] == [[0, 0, 1], [0, 0, 2], [0, 0, 3], [0, 0, None]]
+    assert order[4:7] == [[1, 0, None], [1, 1, None], [2, 1, None]]
+    assert service.pending == 0
+
+
+def test_dictionary_changes_reach_every_editor(app, qtbot, db):
+    first, second = SpellCheckTextEdit(db), SpellCheckTextEdit(db)
+    qtbot.addWidget(first)
+    qtbot.addWidget(second)
+    qtbot.waitUntil(lambda: first.engine.ready, timeout=10000)
+    first.setPlainText("The kaneran fleet")
+    second.setPlainText("kaneran kaneran")
+    first.publish_statistics()
+    second.publish_statistics()
+    assert (first.statistics.unknown_count, second.statistics.unknown_count) == (1, 2)
+
+    db.add_entry("kaneran", "Species", "Noun", "An alien species.", "Species")
+    assert (first.statistics.unknown_count, second.statistics.unknown_count) == (0, 0)
+    assert "kaneran" in first.completions
+
+
+def test_service_is_released_with_its_database(app, qtbot):
+    db = DictionaryDB(":memory:")
+    service = SpellCheckService.for_db(db)
+    with pytest.raises(ValueError):
+        SpellCheckService.for_db(db, BrainSet(db))
+    assert SpellCheckService.for_db(db, service.brains) is service
+    qtbot.waitUntil(lambda: service.engine.ready, timeout=10000)
+
+    released = weakref.ref(service)
+    del service, db
+    gc.collect()
+    assert released() is None
@@ -0,0 +1,20 @@
+"""
+test_startup.py
+
+Tests for the cold-start measurement helpers.
+"""
+
+from startup import parse_importtime
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       807 |      14763 |   json.decoder
+import time:       816 |        816 |   json.encoder
+import time:       483 |      16062 | json
+"""
+
+
+def test_parse_importtime():
+    imports = parse_importtime(SAMPLE)
+    assert [i["module"] for i in imports] == ["json.decoder", "json.encoder", "json"]
+    assert [i["depth"] for i in imports] == [1, 1, 0]
+    assert imports[-1]["cumulative_us"] == 16062
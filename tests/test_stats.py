@@ -0,0 +1,55 @@
+"""
+test_stats.py
+
+Unit tests for tokenization and the incremental DocumentStatistics service.
+"""
+
+from spellcheck import SpellCheckEngine, tokenize
+from stats import BlockTally, DocumentStatistics
+
+
+class FakeChecker:
+    """Minimal stand-in for a base language lexicon."""
+
+    def __init__(self, words):
+        self.words = set(words)
+
+    def __contains__(self, word):
+        return word.lower() in self.words
+
+
+def make_engine():
+    return SpellCheckEngine(FakeChecker({"the", "ship", "landed", "on"}),
+                            {"kaneran": ("Species",), "vellis": ("Planet",)})
+
+
+def test_tokenize_keeps_offsets_and_apostrophes():
+    tokens = tokenize("The Kaneran's ship, landed.")
+    assert [t.word for t in tokens] == ["The", "Kaneran's", "ship", "landed"]
+    assert tokens[1].start == 4
+
+
+def test_block_tally_counts_unknown_and_categories():
+    tally = BlockTally.from_tokens(tokenize("The kaneran ship landed on Vellis near Zorp"), make_engine())
+    assert tally.total == 8
+    assert tally.unknown == 2  # near, zorp
+    assert tally.categories == {"Species": 1, "Planet": 1}
+
+
+def test_update_block_applies_deltas():
+    engine = make_engine()
+    stats = DocumentStatistics()
+    stats.update_block(1, BlockTally.from_tokens(tokenize("the ship the ship"), engine))
+    stats.update_block(2, BlockTally.from_tokens(tokenize("kaneran zorp"), engine))
+    assert stats.word_count == 6
+    assert stats.unique_word_count == 4
+    assert stats.unknown_count == 1
+
+    stats.update_block(2, BlockTally.from_tokens(tokenize("kaneran"), engine))
+    assert stats.word_count == 5
+    assert stats.unknown_count == 0
+    assert "zorp" not in stats.word_counts
+
+    stats.retain_blocks([2])
+    assert stats.word_count == 1
+    assert stats.category_counts == {"Species": 1}
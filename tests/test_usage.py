@@ -0,0 +1,106 @@
+"""
+test_usage.py
+
+Tests for the manuscript-adaptive word usage model and its effect on suggestions.
+"""
+
+import time
+from collections import Counter
+
+from db import DictionaryDB
+from spellcheck import SpellCheckEngine, tokenize
+from stats import BlockTally, DocumentStatistics
+from usage import UsageModel
+
+
+class FakeLexicon:
+    """Minimal frequency lexicon."""
+
+    letters = "abcdefghijklmnopqrstuvwxyz"
+
+    def __init__(self, frequencies):
+        self.frequencies = frequencies
+        self.total_frequency = sum(frequencies.values())
+
+    def __contains__(self, word):
+        return word in self.frequencies
+
+    def frequency(self, word):
+        return self.frequencies.get(word, 0)
+
+
+def tally(text: str, engine: SpellCheckEngine) -> BlockTally:
+    return BlockTally.from_tokens(tokenize(text), engine)
+
+
+def test_block_edits_update_counts_and_batch_writes(tmp_path):
+    db = DictionaryDB(str(tmp_path / "dict.db"))
+    usage = UsageModel(db)
+    engine = SpellCheckEngine(FakeLexicon({"the": 10}))
+    stats = DocumentStatistics(usage)
+
+    stats.update_block(1, tally("the barge the barge", engine))
+    stats.update_block(2, tally("a barge", engine))
+    assert usage.get("barge") == 3 and usage.total == 6
+    assert db.get_word_usage() == {}
+
+    assert usage.flush() == 3
+    assert db.get_word_usage() == {"the": 2, "barge": 3, "a": 1}
+    assert not usage.dirty
+
+    stats.update_block(1, tally("the barge the barge", engine))
+    assert not usage.dirty  # unchanged block text nets to no change
+
+    stats.update_block(1, tally("the bridge", engine))
+    stats.remove_block(2)
+    assert usage.get("barge") == 3  # removing text does not unlearn saved counts
+    assert usage.flush() == 1
+    learned = {"the": 2, "barge": 3, "a": 1, "bridge": 1}
+    assert db.get_word_usage() == learned
+    assert UsageModel(DictionaryDB(str(tmp_path / "dict.db"))).counts == learned
+
+
+def test_open_documents_add_to_lifetime_counts():
+    db = DictionaryDB(":memory:")
+    db.save_word_usage([("barge", 500)])
+    usage = UsageModel(db)
+    usage.apply({"barge": 3, "typo": 1})
+    assert usage.get("barge") == 503
+    usage.apply({"barge": -3, "typo": -1})  # text deleted again before saving
+    assert usage.get("barge") == 500 and "typo" not in usage.counts
+    usage.flush()
+    assert db.get_word_usage() == {"barge": 500}
+
+
+def test_suggestions_blend_base_custom_and_author_usage():
+    db = DictionaryDB(":memory:")
+    lexicon = FakeLexicon({"the": 100_000, "barge": 50, "barre": 10})
+    engine = SpellCheckEngine(lexicon, {"barze": ("Place",)})
+    assert engine.suggestions("barhe") == ["barze", "barge", "barre"]
+
+    usage = UsageModel(db)
+    usage.apply(Counter({"barre": 40, "ship": 60}))
+    engine.set_usage(usage)
+    assert engine.suggestions("barhe") == ["barre", "barze", "barge"]
+
+
+def test_distance_two_fallback_respects_a_time_budget():
+    engine = SpellCheckEngine(FakeLexicon({"barge": 5}))
+    assert engine.suggestions("bxrgx") == ["barge"]
+    start = time.perf_counter()
+    assert engine.suggestions("kanneranthos", budget=0.01) == []
+    assert time.perf_counter() - start < 0.1
+
+
+def test_reopening_a_document_only_learns_what_changed(tmp_path):
+    path = str(tmp_path / "dict.db")
+    engine = SpellCheckEngine(FakeLexicon({"the": 10}))
+    for text in ("the barge the barge", "the barge the barge", "the barge the barge a barge"):
+        usage = UsageModel(DictionaryDB(path))
+        stats = DocumentStatistics(usage)
+        stats.set_document("0001")
+        stats.update_block(1, tally(text, engine))
+        stats.set_document("0002")
+        stats.update_block(2, tally("a barge", engine))
+        usage.flush()
+    assert DictionaryDB(path).get_word_usage() == {"the": 2, "barge": 4, "a": 2}
@@ -0,0 +1,115 @@
+import subprocess
+import sys
+import pytest
+from widgets import SpellCheckTextEdit
+from db import DictionaryDB
+from PyQt6.QtWidgets import QApplication
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+@pytest.fixture
+def db():
+    return DictionaryDB(":memory:")
+
+
+def test_main_window_defers_heavy_imports():
+    code = ("import sys, main_window; "
+            "print(sorted(m for m in ('spellchecker', 'dialogs', 'managers') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_statistics_follow_edits(app, qtbot, db):
+    editor = SpellCheckTextEdit(db)
+    qtbot.addWidget(editor)
+    qtbot.waitUntil(lambda: editor.engine.ready, timeout=10000)
+
+    editor.setPlainText("The kaneran fleet\nlanded on Vellis")
+    editor.publish_statistics()
+    assert editor.statistics.word_count == 6
+    assert editor.statistics.unknown_count == 2
+
+    db.add_entry("kaneran", "Species", "Noun", "An alien species.", "Species")
+    assert editor.statistics.unknown_count == 1
+    assert editor.statistics.category_counts["Species"] == 1
+
+    cursor = editor.textCursor()
+    cursor.movePosition(cursor.MoveOperation.End)
+    cursor.movePosition(cursor.MoveOperation.StartOfBlock, cursor.MoveMode.KeepAnchor)
+    cursor.movePosition(cursor.MoveOperation.PreviousCharacter, cursor.MoveMode.KeepAnchor)
+    cursor.removeSelectedText()
+    editor.publish_statistics()
+    assert editor.statistics.word_count == 3
+    assert editor.statistics.unknown_count == 0
+
+
+def test_adding_a_word_accepts_its_forms(app, qtbot, db):
+    editor = SpellCheckTextEdit(db)
+    qtbot.addWidget(editor)
+    qtbot.waitUntil(lambda: editor.engine.ready, timeout=10000)
+
+    editor.setPlainText("Two Kanerans landed.\nThe kaneran's ship was Kaneran-built.")
+    editor.publish_statistics()
+    assert editor.statistics.unknown_count == 3
+
+    db.add_entry("kaneran", "Species", "Noun", "An alien species.", "Species")
+    assert editor.statistics.unknown_count == 0
+    assert editor.statistics.category_counts["Species"] == 3
+    assert editor.definitions.prefetch(["Kanerans"]) == 1
+    assert editor.definitions.get("kaneran’s")[0].definition == "An alien species."
+
+    db.add_entry("sky-tarrin", "Culture", "Noun", "A festival.", "Culture")
+    assert editor.engine.categories("tarrins") == ("Culture",)
+    assert editor.engine.categories("sky") == ()  # ordinary parts stay with the base lexicon
+
+
+def test_grammar_issues_are_underlined(app, qtbot, db):
+    editor = SpellCheckTextEdit(db)
+    qtbot.addWidget(editor)
+    editor.setPlainText("The ship landed on the the moon.")
+    formats = editor.document().firstBlock().layout().formats()
+    underlined = [(f.start, f.length) for f in formats if f.format == editor.highlighter.grammar_format]
+    assert underlined == [(len("The ship landed on the "), 3)]
+
+
+def test_visible_definitions_are_prefetched(app, qtbot, db):
+    db.add_entry("kaneran", "Species", "Noun", "An alien species.", "Species")
+    editor = SpellCheckTextEdit(db)
+    qtbot.addWidget(editor)
+    editor.resize(400, 200)
+    editor.show()
+    qtbot.waitExposed(editor)
+    editor.setPlainText("The kaneran fleet\n" + "filler line\n" * 200 + "vellis")
+    db.add_entry("vellis", "Planet", "Noun", "A world.", "Planet")
+
+    editor.prefetch_visible_definitions()
+    assert editor.definitions.get("kaneran")[0].definition == "An alien species."
+    assert editor.definitions.get("vellis") is None
+
+    editor.verticalScrollBar().setValue(editor.verticalScrollBar().maximum())
+    qtbot.waitUntil(lambda: editor.definitions.get("vellis") is not None, timeout=2000)
+
+
+def test_completer_offers_custom_words(app, qtbot, db):
+    db.add_entry("kaneran", "Species", "Noun", "An alien species.", "Species")
+    db.add_entry("kanerath", "Place", "Noun", "A city.", "Place")
+    editor = SpellCheckTextEdit(db)
+    qtbot.addWidget(editor)
+    editor.show()
+    qtbot.waitExposed(editor)
+    editor.setPlainText("kanerath kanerath ")
+    editor.moveCursor(editor.textCursor().MoveOperation.End)
+
+    qtbot.keyClicks(editor, "Kan")
+    assert editor.completion_model.stringList() == ["Kanerath", "Kaneran"]
+    assert editor.completer.popup().isVisible()
+
+    editor.insert_completion("Kaneran")
+    assert editor.toPlainText() == "kanerath kanerath Kaneran"
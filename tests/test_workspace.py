@@ -0,0 +1,152 @@
+"""
+test_workspace.py
+
+Tests for chaptered projects: lazy chapter loading and cache-backed project queries.
+"""
+
+import zipfile
+
+import pytest
+from db import DictionaryDB
+from project import CHAPTERS_FILE, ChapterRecord, ZipChapterStore, write_project
+from spellcheck import SpellCheckEngine
+from workspace import DBChapterStore, Workspace, copy_chapters
+
+CHAPTERS = [
+    ("The Landing", "The kaneran fleet landed.\nThe fleet waited."),
+    ("Vellis", "Vellis rose over the kaneran camp."),
+]
+
+
+class CountingStore:
+    """Wraps a chapter store and counts chapter reads."""
+
+    def __init__(self, store):
+        self.store = store
+        self.reads = []
+
+    def records(self):
+        return self.store.records()
+
+    def read(self, key):
+        self.reads.append(key)
+        return self.store.read(key)
+
+    def save(self, records, texts):
+        self.store.save(records, texts)
+
+
+@pytest.fixture
+def archive(tmp_path) -> str:
+    path = str(tmp_path / "novel.zip")
+    workspace = Workspace(ZipChapterStore(path))
+    for title, text in CHAPTERS:
+        workspace.add_chapter(title, text)
+    write_project(path, None, [{"word": "kaneran"}], None, chapters=workspace.iter_texts())
+    return path
+
+
+def test_queries_use_chapter_caches(archive):
+    store = CountingStore(ZipChapterStore(archive))
+    workspace = Workspace(store)
+    assert [c.title for c in workspace.chapters] == ["The Landing", "Vellis"]
+    assert workspace.word_counts()["kaneran"] == 2
+    assert workspace.occurrences("Fleet") == [("0001", 2)]
+    assert workspace.search("kan") == [("0001", {"kaneran": 1}), ("0002", {"kaneran": 1})]
+    engine = SpellCheckEngine({"the", "fleet", "landed", "waited", "rose", "over", "camp"})
+    assert workspace.unknown_counts(engine) == {"0001": 1, "0002": 2}
+    assert store.reads == []
+
+    assert workspace.text("0002") == CHAPTERS[1][1]
+    assert store.reads == ["0002"]
+
+
+def test_edits_refresh_only_that_chapter(archive):
+    workspace = Workspace(ZipChapterStore(archive))
+    workspace.set_text("0002", "Vellis set.")
+    workspace.save()
+
+    store = CountingStore(ZipChapterStore(archive))
+    reopened = Workspace(store)
+    assert reopened.record("0001").words is not None
+    assert reopened.occurrences("set") == [("0002", 1)]
+    assert store.reads == []
+    with zipfile.ZipFile(archive) as zipf:
+        assert "dictionary.json" in zipf.namelist()
+
+
+def test_stale_cache_is_rebuilt_from_text(archive, tmp_path):
+    changed = str(tmp_path / "changed.zip")
+    with zipfile.ZipFile(archive) as src, zipfile.ZipFile(changed, "w") as dst:
+        for name in src.namelist():
+            data = b"Edited outside." if name == "chapters/0001.txt" else src.read(name)
+            dst.writestr(name, data)
+    store = CountingStore(ZipChapterStore(changed))
+    workspace = Workspace(store)
+    assert workspace.record("0001").words is None
+    assert workspace.occurrences("outside") == [("0001", 1)]
+    assert store.reads == ["0001"]
+
+
+def test_single_text_project_is_one_chapter(tmp_path):
+    path = str(tmp_path / "old.zip")
+    write_project(path, "Just one text.")
+    workspace = Workspace(ZipChapterStore(path))
+    assert [c.title for c in workspace.chapters] == ["Manuscript"]
+    assert workspace.occurrences("text") == [("content", 1)]
+    workspace.rename_chapter("content", "Part One")
+    workspace.save()
+    with zipfile.ZipFile(path) as zipf:
+        assert CHAPTERS_FILE in zipf.namelist()
+    assert Workspace(ZipChapterStore(path)).text("content") == "Just one text."
+
+
+def test_chapters_in_database():
+    db = DictionaryDB(":memory:")
+    workspace = Workspace(DBChapterStore(db))
+    keys = [workspace.add_chapter(title, text) for title, text in CHAPTERS]
+    workspace.save()
+
+    store = CountingStore(DBChapterStore(db))
+    reopened = Workspace(store)
+    assert reopened.chapters == [ChapterRecord(k, c.title, c.digest, c.words)
+                                 for k, c in zip(keys, workspace.chapters)]
+    reopened.remove_chapter(keys[0])
+    reopened.set_text(keys[1], "Vellis.")
+    reopened.save()
+    assert [(c.key, c.words) for c in Workspace(DBChapterStore(db)).chapters] == [(keys[1], {"vellis": 1})]
+    assert store.reads == []
+
+
+def test_dictionary_changes_drop_affected_spellcheck_results(archive):
+    workspace = Workspace(ZipChapterStore(archive))
+    custom = {}
+    engine = SpellCheckEngine({"the", "fleet", "landed", "waited", "rose", "over", "camp"}, custom)
+    assert workspace.unknown_words("0001", engine) == {"kaneran": 1}
+    custom["kaneran"] = ("Species",)
+    workspace.dictionary_changed({"kaneran"})
+    assert workspace.unknown_words("0001", engine) == {}
+    assert workspace.unknown_words("0002", engine) == {"vellis": 1}
+
+    del custom["kaneran"]
+    workspace.dictionary_changed({"kaneran"})
+    assert workspace.unknown_words("0001", engine) == {"kaneran": 1}
+    assert workspace.unknown_counts(engine) == {"0001": 1, "0002": 2}
+
+
+def test_import_copies_chapters_into_the_database(archive):
+    with open(archive, "rb") as f:
+        original = f.read()
+    db = DictionaryDB(":memory:")
+    previous = Workspace(DBChapterStore(db))
+    previous.add_chapter("Old", "Replaced by the import.")
+    previous.save()
+    assert copy_chapters(ZipChapterStore(archive), DBChapterStore(db)) == 2
+
+    workspace = Workspace(DBChapterStore(db))
+    assert [c.title for c in workspace.chapters] == ["The Landing", "Vellis"]
+    workspace.set_text("0001", "Rewritten.")
+    workspace.save()
+    assert workspace.text("0002") == CHAPTERS[1][1]
+    with open(archive, "rb") as f:
+        assert f.read() == original
@@ -0,0 +1,133 @@
+"""
+usage.py
+
+Manuscript-adaptive word frequencies for the StoryKeeper application.
+
+The model learns how often the author uses each word. Block tallies report
+what they add and remove, so an edit only touches the words of the changed
+block. Counts start from the ``word_usage`` table. Each document also
+remembers, in ``word_usage_sources``, how many of every word it has already
+contributed; only occurrences beyond that are gains, so reopening an
+unchanged chapter teaches nothing new. Deleting text can take back gains
+that were not saved yet, but closing a document keeps them and no change
+ever lowers a stored count. Changed words are remembered and written
+back in one batched upsert when the editor's throttle timer fires, never
+per keystroke.
+"""
+
+from collections import Counter
+from typing import Dict, Mapping, Optional, Set, Tuple
+
+from db import DictionaryDB
+
+
+class UsageModel:
+    """Learned lowercase word counts, kept live from document edits and saved in batches."""
+
+    def __init__(self, db: DictionaryDB) -> None:
+        """
+        Load the learned counts.
+
+        Args:
+            db (DictionaryDB): Database holding the ``word_usage`` tables.
+        """
+        self.db = db
+        self._stored: Dict[str, int] = db.get_word_usage()
+        self.counts: Dict[str, int] = dict(self._stored)
+        self.total = sum(self.counts.values())
+        self._live: Dict[Optional[str], Counter] = {}           # document -> its current word counts
+        self._taught: Dict[Optional[str], Dict[str, int]] = {}  # document -> counts already in _stored
+        self._dirty: Set[Tuple[Optional[str], str]] = set()     # (document, word) with unsettled gains
+        self._unsaved: Set[str] = set()                          # settled words not written yet
+        self._unsaved_sources: Dict[Tuple[str, str], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def get(self, word: str, default: int = 0) -> int:
+        """Return the learned count of a lowercase word."""
+        return self.counts.get(word, default)
+
+    @property
+    def dirty(self) -> bool:
+        """True if some counts changed since the last flush."""
+        return bool(self._dirty or self._unsaved)
+
+    def _taught_by(self, document: Optional[str]) -> Dict[str, int]:
+        """What a document has contributed so far; unnamed documents are only tracked for the session."""
+        taught = self._taught.get(document)
+        if taught is None:
+            taught = self.db.get_document_usage(document) if document is not None else {}
+            self._taught[document] = taught
+        return taught
+
+    def apply(self, delta: Mapping[str, int], document: Optional[str] = None) -> None:
+        """
+        Record a change in an open document.
+
+        Args:
+            delta (Mapping): Lowercase word -> occurrences gained (negative when removed).
+            document (str): Key of the changed document (e.g. a chapter key),
+                or None for an unnamed one.
+        """
+        live = self._live.setdefault(document, Counter())
+        taught = self._taught_by(document)
+        for word, change in delta.items():
+            if not change:
+                continue
+            before = live[word]
+            after = before + change
+            if after:
+                live[word] = after
+            else:
+                del live[word]
+            seen = taught.get(word, 0)
+            gain = max(0, after - seen) - max(0, before - seen)
+            if gain:
+                self._set(word, self.counts.get(word, 0) + gain)
+                self._dirty.add((document, word))
+
+    def _set(self, word: str, count: int) -> None:
+        old = self.counts.get(word, 0)
+        if count:
+            self.counts[word] = count
+        else:
+            del self.counts[word]
+        self.total += count - old
+
+    def close(self, document: Optional[str]) -> None:
+        """Stop tracking a document that is no longer shown, keeping what it taught."""
+        self._settle({entry for entry in self._dirty if entry[0] == document})
+        self._live.pop(document, None)
+
+    def _settle(self, entries: Set[Tuple[Optional[str], str]]) -> None:
+        """Fold the gains of (document, word) pairs into the stored counts, to be written by flush."""
+        self._dirty -= entries
+        for document, word in entries:
+            taught = self._taught_by(document)
+            live = self._live.get(document, {}).get(word, 0)
+            gained = live - taught.get(word, 0)
+            if gained <= 0:
+                continue
+            # Settled gains become part of the stored count; later removals cannot take them back.
+            taught[word] = live
+            self._stored[word] = self._stored.get(word, 0) + gained
+            self._unsaved.add(word)
+            if document is not None:
+                self._unsaved_sources[document, word] = live
+
+    def flush(self) -> int:
+        """
+        Write every changed count to the database in one transaction.
+
+        Returns:
+            int: Number of words written.
+        """
+        self._settle(set(self._dirty))
+        if not self._unsaved:
+            return 0
+        words, self._unsaved = self._unsaved, set()
+        sources, self._unsaved_sources = self._unsaved_sources, {}
+        self.db.save_word_usage([(word, self._stored[word]) for word in words],
+                                [(document, word, count) for (document, word), count in sources.items()])
+        return len(words)
@@ -2,17 +2,34 @@
 widgets.py
 
 Contains custom reusable widgets for the StoryKeeper application,
-including the Sidebar and SpellCheckTextEdit with dictionary integration.
+including the Sidebar, SpellCheckTextEdit with dictionary integration
+and the developer PerformanceDock.
 """
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QTextEdit, QMenu
-from PyQt6.QtGui import QTextCharFormat, QColor
-from PyQt6.QtCore import QTimer, Qt
-from spellchecker import SpellChecker
-from typing import Set
+import logging
+import re
+import time
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QLabel, QPushButton, QTextEdit, QMenu, QDockWidget,
+    QTableWidget, QTableWidgetItem, QHeaderView, QToolTip, QCompleter, QListWidget, QListWidgetItem
+)
+from PyQt6.QtGui import QTextCharFormat, QColor, QSyntaxHighlighter, QTextBlockUserData
+from PyQt6.QtCore import QEvent, QPoint, QStringListModel, QTimer, Qt, pyqtSignal
+from typing import List, Optional, Set, Tuple
+import instrumentation
 from db import DictionaryDB
-from managers import ContextManager, DictionaryManager
-from dialogs import MultiPOSDialog
+from brains import BrainSet
+from completion import MIN_PREFIX, match_case
+from definitions import format_tooltip
+from spellcheck import MENU_BUDGET, SpellCheckEngine, Token, tokenize
+from spellservice import SpellCheckService
+from grammar import GrammarEngine
+from stats import BlockTally, DocumentStatistics
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_WORD = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*$")
+COMPLETER_KEYS = {Qt.Key.Key_Enter, Qt.Key.Key_Return, Qt.Key.Key_Escape, Qt.Key.Key_Tab, Qt.Key.Key_Backtab}
 
 
 class Sidebar(QWidget):
@@ -38,71 +55,321 @@ class Sidebar(QWidget):
 
     def open_dictionary_manager(self):
         """Open the dictionary manager dialog."""
-        self.manager = DictionaryManager(self.db)
+        from managers import DictionaryManager
+        with instrumentation.span("dialog.open", dialog="DictionaryManager"):
+            self.manager = DictionaryManager(self.db)
         self.manager.exec()
 
     def open_context_manager(self):
         """Open the context manager dialog."""
-        self.ctx_manager = ContextManager(self.db)
+        from managers import ContextManager
+        with instrumentation.span("dialog.open", dialog="ContextManager"):
+            self.ctx_manager = ContextManager(self.db)
         self.ctx_manager.exec()
 
 
+class ChapterPanel(QWidget):
+    """Lists the chapters of the project; selecting one asks the window to open it."""
+
+    chapter_selected = pyqtSignal(str)
+    add_requested = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        self.chapter_list = QListWidget()
+        self.chapter_list.itemActivated.connect(self._on_activated)
+        self.chapter_list.itemClicked.connect(self._on_activated)
+        layout.addWidget(self.chapter_list)
+        add_btn = QPushButton("Add Chapter")
+        add_btn.clicked.connect(self.add_requested)
+        layout.addWidget(add_btn)
+
+    def set_chapters(self, rows: List[Tuple[str, str]], current: Optional[str] = None):
+        """
+        Show the chapters.
+
+        Args:
+            rows: (chapter key, label) pairs in manuscript order.
+            current (str): Key of the open chapter, which gets selected.
+        """
+        self.chapter_list.blockSignals(True)
+        self.chapter_list.clear()
+        for key, label in rows:
+            item = QListWidgetItem(label)
+            item.setData(Qt.ItemDataRole.UserRole, key)
+            self.chapter_list.addItem(item)
+            if key == current:
+                self.chapter_list.setCurrentItem(item)
+        self.chapter_list.blockSignals(False)
+
+    def _on_activated(self, item: QListWidgetItem):
+        self.chapter_selected.emit(item.data(Qt.ItemDataRole.UserRole))
+
+
+class BlockData(QTextBlockUserData):
+    """Per-block spellcheck state attached to a QTextBlock."""
+
+    _next_key = 0
+
+    def __init__(self):
+        super().__init__()
+        BlockData._next_key += 1
+        self.key = BlockData._next_key
+        self.tokens: List[Token] = []
+
+
+class SpellCheckHighlighter(QSyntaxHighlighter):
+    """Underlines unknown words and grammar issues block by block and feeds the statistics service."""
+
+    def __init__(self, document, engine: SpellCheckEngine, statistics: DocumentStatistics,
+                 grammar: Optional[GrammarEngine] = None):
+        super().__init__(document)
+        self.engine = engine
+        self.statistics = statistics
+        self.grammar = grammar
+        self.misspelled_format = QTextCharFormat()
+        self.misspelled_format.setUnderlineColor(QColor("red"))
+        self.misspelled_format.setUnderlineStyle(QTextCharFormat.UnderlineStyle.SpellCheckUnderline)
+        self.grammar_format = QTextCharFormat()
+        self.grammar_format.setUnderlineColor(QColor("blue"))
+        self.grammar_format.setUnderlineStyle(QTextCharFormat.UnderlineStyle.DashUnderline)
+
+    def highlightBlock(self, text: str):
+        """Tokenize one block once, then reuse the tokens for underlines and statistics."""
+        data = self.currentBlockUserData()
+        if not isinstance(data, BlockData):
+            data = BlockData()
+            self.setCurrentBlockUserData(data)
+        with instrumentation.span("spellcheck.block"):
+            data.tokens = tokenize(text)
+            self.statistics.update_block(data.key, BlockTally.from_tokens(data.tokens, self.engine))
+            unknown = self.engine.unknown_tokens(data.tokens)
+        issues = ()
+        if self.grammar is not None:
+            with instrumentation.span("grammar.block"):
+                issues = self.grammar.check_block(text)
+        with instrumentation.span("highlight.apply"):
+            for issue in issues:
+                self.setFormat(issue.start, issue.length, self.grammar_format)
+            for token in unknown:
+                self.setFormat(token.start, len(token.word), self.misspelled_format)
+
+
 class SpellCheckTextEdit(QTextEdit):
-    """Custom QTextEdit with spellchecking and dictionary integration."""
+    """
+    Custom QTextEdit with spellchecking and dictionary integration.
+
+    The lexicon, caches and word indexes come from the process-wide
+    SpellCheckService; the editor only keeps per-document state.
+    """
+
+    statistics_changed = pyqtSignal(object)
 
-    def __init__(self, db: DictionaryDB):
+    def __init__(self, db: DictionaryDB, brains: Optional[BrainSet] = None,
+                 service: Optional[SpellCheckService] = None):
         super().__init__()
         self.db = db
-        self.spellchecker = SpellChecker()
+        self.service = service if service is not None else SpellCheckService.for_db(db, brains)
+        self.brains = self.service.brains
+        self.engine = self.service.engine
+        self.grammar = self.service.grammar
+        self.usage = self.service.usage
+        self.definitions = self.service.definitions
+        self.completions = self.service.completions
+        self.statistics = DocumentStatistics(self.usage)
+        self.highlighter = SpellCheckHighlighter(self.document(), self.engine, self.statistics, self.grammar)
+        self._recheck_from: Optional[int] = None
+        self.completion_model = QStringListModel(self)
+        self.completer = QCompleter(self.completion_model, self)
+        self.completer.setWidget(self)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.completer.activated.connect(self.insert_completion)
+        self._completion_prefix = ""
         self.debounce_timer = QTimer()
         self.debounce_timer.setSingleShot(True)
-        self.debounce_timer.timeout.connect(self.run_spellcheck)
+        self.debounce_timer.timeout.connect(self.publish_statistics)
         self.textChanged.connect(self.schedule_spellcheck)
+        self.prefetch_timer = QTimer()
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.timeout.connect(self.prefetch_visible_definitions)
+        self.verticalScrollBar().valueChanged.connect(self.schedule_prefetch)
+        self.service.register(self)
+
+    def focusInEvent(self, event):
+        """Let the service re-check this document before the others."""
+        self.service.set_focused(self)
+        super().focusInEvent(event)
 
     def schedule_spellcheck(self):
-        """Schedule spellcheck after a short debounce delay."""
+        """Schedule a statistics update after a short debounce delay."""
         self.debounce_timer.start(300)
 
     def run_spellcheck(self):
         """Run spellchecking on the entire document."""
         try:
-            cursor = self.textCursor()
-            cursor.select(cursor.SelectionType.Document)
-            text = cursor.selectedText()
-
-            # Reset formatting
-            cursor.setPosition(0)
-            cursor.movePosition(cursor.MoveOperation.End, cursor.MoveMode.KeepAnchor)
-            cursor.setCharFormat(QTextCharFormat())
+            with instrumentation.span("spellcheck.document", blocks=self.document().blockCount()):
+                self.highlighter.rehighlight()
+            self.publish_statistics()
+        except Exception:
+            instrumentation.count("spellcheck.errors")
+            logger.exception("Spellcheck failed")
 
-            if not text.strip():
-                return
+    def restart_recheck(self):
+        """Start a time-sliced whole-document re-check from the first block."""
+        self._recheck_from = 0
 
-            words = [w.strip(".,!?;:") for w in text.split() if w.isalpha()]
-            if not words:
-                return
+    def recheck_step(self, deadline: float) -> bool:
+        """
+        Re-check blocks from where the last step stopped until ``deadline``
+        (a ``time.perf_counter`` value); at least one block is always checked.
 
-            custom_words: Set[str] = set(w.lower() for w in self.db.get_words_list())
-            misspelled = self.spellchecker.unknown(words)
+        Returns:
+            bool: True once the document is finished.
+        """
+        if self._recheck_from is None:
+            return True
+        block = self.document().findBlockByNumber(self._recheck_from)
+        while block.isValid():
+            self.highlighter.rehighlightBlock(block)
+            block = block.next()
+            if time.perf_counter() >= deadline:
+                break
+        if block.isValid():
+            self._recheck_from = block.blockNumber()
+            return False
+        self._recheck_from = None
+        self.publish_statistics()
+        return True
 
-            for word in misspelled:
-                if word.lower() not in custom_words:
-                    self.highlight_word(word)
+    @instrumentation.timed("highlight.word")
+    def highlight_word(self, word: str):
+        """Re-check only the blocks that contain the given word."""
+        self.highlight_blocks({word.lower()})
 
-        except Exception as e:
-            print(f"Spellcheck error: {e}")
+    def highlight_blocks(self, words: Set[str]):
+        """Re-check, in one pass, the blocks containing any of the given lowercase words."""
+        block = self.document().begin()
+        while block.isValid():
+            data = block.userData()
+            if isinstance(data, BlockData) and any(t.word.lower() in words for t in data.tokens):
+                self.highlighter.rehighlightBlock(block)
+            block = block.next()
 
-    def highlight_word(self, word: str):
-        """Highlight misspelled words."""
-        format_red = QTextCharFormat()
-        format_red.setUnderlineColor(QColor("red"))
-        format_red.setUnderlineStyle(QTextCharFormat.UnderlineStyle.SpellCheckUnderline)
+    def highlight_words(self, words: Set[str]):
+        """Re-check the text affected by a dictionary change and publish the new totals."""
+        self.highlight_blocks(words)
+        self.publish_statistics()
 
+    def publish_statistics(self):
+        """Drop tallies of deleted blocks and broadcast the current totals."""
         doc = self.document()
-        cursor = doc.find(word, 0)
-        while cursor and not cursor.isNull():
-            cursor.mergeCharFormat(format_red)
-            cursor = doc.find(word, cursor.position())
+        if len(self.statistics) > doc.blockCount():
+            keys = []
+            block = doc.begin()
+            while block.isValid():
+                data = block.userData()
+                if isinstance(data, BlockData):
+                    keys.append(data.key)
+                block = block.next()
+            self.statistics.retain_blocks(keys)
+        self.statistics_changed.emit(self.statistics)
+        self.schedule_prefetch()
+        self.service.usage_changed()
+
+    def set_document(self, key: Optional[str]):
+        """Name the document about to be shown, so usage learning knows what it already taught."""
+        self.statistics.set_document(key)
+
+    def save_usage(self):
+        """Write learned word counts to the database (normally throttled by the service)."""
+        self.service.save_usage()
+
+    def schedule_prefetch(self):
+        """Prefetch definitions shortly after scrolling or editing settles."""
+        self.prefetch_timer.start(50)
+
+    def visible_blocks(self):
+        """Yield the text blocks currently shown in the viewport."""
+        viewport = self.viewport()
+        block = self.cursorForPosition(QPoint(0, 0)).block()
+        last = self.cursorForPosition(QPoint(viewport.width() - 1, viewport.height() - 1)).block()
+        while block.isValid() and block.blockNumber() <= last.blockNumber():
+            yield block
+            block = block.next()
+
+    def prefetch_visible_definitions(self):
+        """Batch-load definitions for the custom words on screen so hovering never queries SQLite."""
+        with instrumentation.span("definitions.prefetch"):
+            words = set()
+            for block in self.visible_blocks():
+                data = block.userData()
+                if isinstance(data, BlockData):
+                    words.update(t.word for t in data.tokens)
+            self.definitions.prefetch(words)
+
+    def resizeEvent(self, event):
+        """Prefetch definitions for blocks revealed by a resize."""
+        super().resizeEvent(event)
+        self.schedule_prefetch()
+
+    def viewportEvent(self, event):
+        """Show cached definitions of custom words as hover tooltips."""
+        if event.type() == QEvent.Type.ToolTip:
+            cursor = self.cursorForPosition(event.pos())
+            cursor.select(cursor.SelectionType.WordUnderCursor)
+            word = cursor.selectedText()
+            senses = self.definitions.get(word) if word else None
+            if senses:
+                QToolTip.showText(event.globalPos(), format_tooltip(word, senses), self.viewport())
+            else:
+                QToolTip.hideText()
+                event.ignore()
+            return True
+        return super().viewportEvent(event)
+
+    def keyPressEvent(self, event):
+        """Let the completer popup handle its keys, then refresh completions for the typed prefix."""
+        if self.completer.popup().isVisible() and event.key() in COMPLETER_KEYS:
+            event.ignore()
+            return
+        super().keyPressEvent(event)
+        if event.text():
+            self.update_completions()
+
+    def completion_prefix(self) -> str:
+        """Return the part of the word that ends at the text cursor."""
+        cursor = self.textCursor()
+        before = cursor.block().text()[:cursor.positionInBlock()]
+        match = PARTIAL_WORD.search(before)
+        return match.group(0) if match else ""
+
+    def update_completions(self):
+        """Show ranked custom-word completions for the word being typed."""
+        popup = self.completer.popup()
+        prefix = self.completion_prefix()
+        matches = []
+        if len(prefix) >= MIN_PREFIX:
+            with instrumentation.span("completion.lookup"):
+                matches = [m for m in self.completions.complete(prefix, self.statistics.word_counts)
+                           if m != prefix]
+        if not matches:
+            popup.hide()
+            return
+        self._completion_prefix = prefix
+        self.completion_model.setStringList(matches)
+        popup.setCurrentIndex(self.completion_model.index(0, 0))
+        rect = self.cursorRect()
+        rect.setWidth(popup.sizeHintForColumn(0) + popup.verticalScrollBar().sizeHint().width())
+        self.completer.complete(rect)
+
+    def insert_completion(self, completion: str):
+        """Replace the typed prefix with the chosen completion."""
+        cursor = self.textCursor()
+        cursor.movePosition(cursor.MoveOperation.Left, cursor.MoveMode.KeepAnchor,
+                            len(self._completion_prefix))
+        cursor.insertText(completion)
+        self.setTextCursor(cursor)
 
     def contextMenuEvent(self, event):
         """Add context menu option to add words to dictionary with multiple meanings."""
@@ -112,18 +379,83 @@ class SpellCheckTextEdit(QTextEdit):
 
         menu = QMenu(self)
         if selected_word and selected_word.isalpha():
-            custom_words = set(self.db.get_words_list())
-            if selected_word.lower() not in custom_words:
-                add_action = menu.addAction(f"Add '{selected_word}' to Dictionary")
+            if not self.engine.is_custom(selected_word):
+                replacements = []
+                if not self.engine.is_known(selected_word):
+                    for suggestion in self.engine.suggestions(selected_word, budget=MENU_BUDGET):
+                        replacements.append(menu.addAction(match_case(selected_word, suggestion)))
+                    if replacements:
+                        menu.addSeparator()
+                target = f"World '{self.brains.active[0]}'" if self.brains.active else "Dictionary"
+                add_action = menu.addAction(f"Add '{selected_word}' to {target}")
                 action = menu.exec(event.globalPos())
+                if action in replacements:
+                    cursor.insertText(action.text())
+                    return
                 if action == add_action:
-                    dialog = MultiPOSDialog(selected_word, self.db, self)
+                    from dialogs import MultiPOSDialog
+                    with instrumentation.span("dialog.open", dialog="MultiPOSDialog"):
+                        dialog = MultiPOSDialog(selected_word, self.db, self)
                     if dialog.exec():
-                        self.db.add_multiple_entries(
+                        self.brains.target().add_multiple_entries(
                             selected_word,
                             dialog.category_input.text(),
                             dialog.entries
                         )
-                        self.run_spellcheck()
                         return
         super().contextMenuEvent(event)
+
+
+class PerformanceDock(QDockWidget):
+    """Developer overlay listing rolling p50/p95 latencies of instrumented hot paths."""
+
+    COLUMNS = ["Span", "Count", "p50 ms", "p95 ms", "Max ms"]
+
+    def __init__(self, parent=None):
+        super().__init__("Performance", parent)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.verticalHeader().setVisible(False)
+        self.counters_label = QLabel()
+        self.counters_label.setWordWrap(True)
+
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.addWidget(self.table)
+        layout.addWidget(self.counters_label)
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        layout.addWidget(reset_btn)
+        self.setWidget(container)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self.on_visibility_changed)
+
+    def on_visibility_changed(self, visible: bool):
+        """Collect data only while the overlay is shown (unless a trace is being recorded)."""
+        if visible:
+            instrumentation.enable()
+            self.refresh_timer.start(1000)
+            self.refresh()
+        else:
+            self.refresh_timer.stop()
+            if not instrumentation.TRACE_ENV_ACTIVE:
+                instrumentation.disable()
+
+    def refresh(self):
+        """Redraw the latency table from the current snapshot."""
+        rows = instrumentation.snapshot()
+        self.table.setRowCount(len(rows))
+        for row, (name, count, p50, p95, worst) in enumerate(rows):
+            values = [name, str(count), f"{p50:.2f}", f"{p95:.2f}", f"{worst:.2f}"]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+        counters = instrumentation.counters()
+        self.counters_label.setText(", ".join(f"{k}: {v}" for k, v in sorted(counters.items())))
+
+    def reset(self):
+        """Clear collected samples."""
+        instrumentation.reset()
+        self.refresh()
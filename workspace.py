@@ -0,0 +1,279 @@
+"""
+workspace.py
+
+Chapter-based manuscripts for the StoryKeeper application.
+
+A Workspace lists a project's chapters without loading their text. Chapters
+live in the dictionary database (DBChapterStore) or as members of a project
+archive (project.ZipChapterStore), and a chapter's text is only read when it
+is opened or its cache must be rebuilt. Imported archives are copied into
+the database (copy_chapters), so the app never writes to an import source.
+Every chapter carries cached word counts keyed by the checksum of its text.
+Project-wide word counts, search, occurrences and spellcheck totals are
+computed from those caches, so they never open every chapter. Unknown-word
+results are memoized per chapter and dropped when the checksum or the
+dictionary changes.
+"""
+
+from collections import Counter
+from typing import Dict, Iterator, List, Mapping, Optional, Protocol, Set, Tuple
+
+from db import DictionaryDB
+from inflections import InflectionIndex
+from project import ChapterRecord, text_digest
+from spellcheck import SpellCheckEngine, tokenize
+
+
+class ChapterStore(Protocol):
+    """Where a workspace keeps its chapters."""
+
+    def records(self) -> List[ChapterRecord]: ...
+
+    def read(self, key: str) -> str: ...
+
+    def save(self, records: List[ChapterRecord], texts: Mapping[str, str]) -> None: ...
+
+
+class DBChapterStore:
+    """Chapters stored in the ``chapters`` table of a dictionary database."""
+
+    def __init__(self, db: DictionaryDB) -> None:
+        self.db = db
+
+    def records(self) -> List[ChapterRecord]:
+        return [ChapterRecord(*row) for row in self.db.get_chapters()]
+
+    def read(self, key: str) -> str:
+        return self.db.get_chapter_text(key)
+
+    def save(self, records: List[ChapterRecord], texts: Mapping[str, str]) -> None:
+        self.db.save_chapters([tuple(record) for record in records], texts)
+
+
+class _StoreTexts(Mapping):
+    """Chapter texts of a store, each read only when it is looked up."""
+
+    def __init__(self, store: ChapterStore, keys: List[str]) -> None:
+        self.store = store
+        self.keys = keys
+
+    def __getitem__(self, key: str) -> str:
+        if key not in self.keys:
+            raise KeyError(key)
+        return self.store.read(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+def copy_chapters(source: ChapterStore, target: ChapterStore) -> int:
+    """
+    Replace the chapters of ``target`` with those of ``source``, reading one chapter at a time.
+
+    Returns:
+        int: Number of chapters copied.
+    """
+    records = source.records()
+    target.save(records, _StoreTexts(source, [record.key for record in records]))
+    return len(records)
+
+
+def count_words(text: str) -> Dict[str, int]:
+    """Count lowercase words the way the editor's block tallies do."""
+    return dict(Counter(token.word.lower() for token in tokenize(text)))
+
+
+class Workspace:
+    """The chapters of one project, with per-chapter caches for project-wide queries."""
+
+    def __init__(self, store: ChapterStore) -> None:
+        """
+        List the chapters of a store; no chapter text is read.
+
+        Args:
+            store (ChapterStore): DBChapterStore or project.ZipChapterStore.
+        """
+        self.store = store
+        self._records: List[ChapterRecord] = store.records()
+        self._texts: Dict[str, str] = {}         # added or edited chapters not yet saved
+        self._cached: Set[str] = set()           # chapters whose word cache changed since the last save
+        self._unknown: Dict[str, Tuple[str, Dict[str, int]]] = {}
+        self._changed = False
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def chapters(self) -> List[ChapterRecord]:
+        """Chapters in manuscript order."""
+        return list(self._records)
+
+    @property
+    def dirty(self) -> bool:
+        """True if the workspace has changes that are not saved to its store."""
+        return self._changed or bool(self._texts) or bool(self._cached)
+
+    def _index(self, key: str) -> int:
+        for i, record in enumerate(self._records):
+            if record.key == key:
+                return i
+        raise KeyError(key)
+
+    def record(self, key: str) -> ChapterRecord:
+        """Return the listing of one chapter."""
+        return self._records[self._index(key)]
+
+    # ---------------- Editing ---------------- #
+
+    def text(self, key: str) -> str:
+        """Return a chapter's text, reading it from the store unless it has unsaved edits."""
+        if key in self._texts:
+            return self._texts[key]
+        self._index(key)
+        return self.store.read(key)
+
+    def set_text(self, key: str, text: str) -> None:
+        """Record the edited text of a chapter and refresh its word cache."""
+        i = self._index(key)
+        digest = text_digest(text)
+        if digest == self._records[i].digest and key not in self._texts:
+            return
+        self._records[i] = self._records[i]._replace(digest=digest, words=count_words(text))
+        self._texts[key] = text
+        self._cached.add(key)
+
+    def add_chapter(self, title: str, text: str = "") -> str:
+        """Append a chapter and return its key."""
+        used = {record.key for record in self._records}
+        number = len(self._records) + 1
+        while f"{number:04d}" in used:
+            number += 1
+        key = f"{number:04d}"
+        self._records.append(ChapterRecord(key, title, text_digest(text), count_words(text)))
+        self._texts[key] = text
+        self._cached.add(key)
+        return key
+
+    def rename_chapter(self, key: str, title: str) -> None:
+        """Change the title of a chapter."""
+        i = self._index(key)
+        self._records[i] = self._records[i]._replace(title=title)
+        self._changed = True
+
+    def remove_chapter(self, key: str) -> None:
+        """Delete a chapter from the project."""
+        del self._records[self._index(key)]
+        self._texts.pop(key, None)
+        self._cached.discard(key)
+        self._unknown.pop(key, None)
+        self._changed = True
+
+    def save(self) -> None:
+        """Write edited chapters, titles, order and refreshed caches to the store."""
+        if not self.dirty:
+            return
+        # Unchanged caches are sent as None so the store keeps what it has.
+        records = [record if record.key in self._cached else record._replace(words=None)
+                   for record in self._records]
+        self.store.save(records, self._texts)
+        self._texts.clear()
+        self._cached.clear()
+        self._changed = False
+
+    def iter_texts(self) -> Iterator[Tuple[ChapterRecord, str]]:
+        """Yield (record, text) for every chapter, reading one chapter at a time."""
+        for record in list(self._records):
+            text = self.text(record.key)
+            if record.words is None:
+                self._store_words(record.key, count_words(text))
+            yield self.record(record.key), text
+
+    # ---------------- Project-wide queries ---------------- #
+
+    def words(self, key: str) -> Dict[str, int]:
+        """Return a chapter's lowercase word counts, paging its text in only if the cache is stale."""
+        record = self.record(key)
+        if record.words is None:
+            self._store_words(key, count_words(self.text(key)))
+            record = self.record(key)
+        return record.words
+
+    def _store_words(self, key: str, words: Dict[str, int]) -> None:
+        i = self._index(key)
+        self._records[i] = self._records[i]._replace(words=words)
+        self._cached.add(key)
+
+    def word_counts(self) -> Counter:
+        """Lowercase word counts over the whole project."""
+        totals: Counter = Counter()
+        for record in self._records:
+            totals.update(self.words(record.key))
+        return totals
+
+    def occurrences(self, word: str, inflections: Optional[InflectionIndex] = None) -> List[Tuple[str, int]]:
+        """
+        Return (chapter key, count) for every chapter using a word (case-insensitive).
+
+        Args:
+            word (str): Word to look up.
+            inflections (InflectionIndex): When given, a custom word's inflected
+                and possessive forms count as uses of its dictionary word.
+        """
+        key = word.lower()
+        lemma = inflections.lemma(key) if inflections is not None else None
+        forms = inflections.forms(lemma) if lemma is not None else (key,)
+        found = []
+        for record in self._records:
+            words = self.words(record.key)
+            count = sum(words.get(form, 0) for form in forms)
+            if count:
+                found.append((record.key, count))
+        return found
+
+    def search(self, prefix: str) -> List[Tuple[str, Dict[str, int]]]:
+        """
+        Find the words starting with ``prefix`` (case-insensitive) in every chapter.
+
+        Returns:
+            list: (chapter key, {matching word: count}) for chapters with matches.
+        """
+        key = prefix.lower()
+        found = []
+        for record in self._records:
+            matches = {w: c for w, c in self.words(record.key).items() if w.startswith(key)}
+            if matches:
+                found.append((record.key, matches))
+        return found
+
+    def unknown_words(self, key: str, engine: SpellCheckEngine) -> Dict[str, int]:
+        """Return a chapter's misspelled words with their counts, memoized until the text or dictionary changes."""
+        record = self.record(key)
+        memo = self._unknown.get(key)
+        if memo is None or memo[0] != record.digest:
+            words = self.words(key)
+            memo = (self.record(key).digest,
+                    {w: c for w, c in words.items() if not engine.is_known(w)})
+            self._unknown[key] = memo
+        return memo[1]
+
+    def unknown_counts(self, engine: SpellCheckEngine) -> Dict[str, int]:
+        """Number of misspelled words in each chapter."""
+        return {record.key: sum(self.unknown_words(record.key, engine).values())
+                for record in self._records}
+
+    def dictionary_changed(self, words: Optional[Set[str]]) -> None:
+        """Drop memoized spellcheck results affected by a dictionary change (all when None)."""
+        if words is None:
+            self._unknown.clear()
+            return
+        # Check the chapter's whole vocabulary: a deleted word was known, so no memo lists it.
+        for key in list(self._unknown):
+            cached = self.record(key).words
+            if cached is None or not words.isdisjoint(cached):
+                del self._unknown[key]